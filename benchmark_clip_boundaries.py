@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local clip-boundary detector (clip_boundaries) against the
+clips already in the database, i.e. the model's answers.
+
+For every mention with a model clip, the detector proposes boundaries; a
+proposal agrees when both its start and end lie within --tolerance seconds
+of the stored ones. For each confidence threshold the table shows how many
+mentions extract_clips.py --local would take locally (= model calls
+replaced), how many of those agree and their mean overlap (intersection
+over union) with the stored clip. Clips that came from the detector itself
+(clip_source "local") are left out.
+
+Usage: python3 benchmark_clip_boundaries.py [--db PATH] [--tolerance S] [--thresholds 0.2 0.4 ...]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from clip_boundaries import BoundaryDetector
+from extract_clips import DB_PATH, LOCAL_MIN_CONFIDENCE, load_transcript
+
+
+def overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> float:
+    """Intersection over union of two time ranges."""
+    inter = max(0, min(a_end, b_end) - max(a_start, b_start))
+    union = max(a_end, b_end) - min(a_start, b_start)
+    return inter / union if union else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark local clip boundaries against stored clips')
+    parser.add_argument('--db', type=Path, default=DB_PATH, help='Study bible database')
+    parser.add_argument('--tolerance', type=float, default=15.0,
+                        help='Seconds start and end may differ and still agree (default: 15)')
+    parser.add_argument('--thresholds', type=float, nargs='+',
+                        default=[0.0, 0.2, LOCAL_MIN_CONFIDENCE, 0.6, 0.8],
+                        help='Confidence thresholds to report')
+    args = parser.parse_args()
+
+    with open(args.db, encoding='utf-8') as f:
+        db = json.load(f)
+
+    # One row per distinct stored clip: (confidence, agrees, overlap)
+    rows = {}
+    detectors = {}
+    no_proposal = 0
+    start = time.perf_counter()
+    for section in db.get('verses', {}).values():
+        for verse_ref, videos in section.items():
+            for video in videos:
+                vid_id = video.get('video_id', '')
+                for mention in video.get('mentions', []):
+                    if mention.get('clip_start_ms') is None or mention.get('clip_source') == 'local':
+                        continue
+                    key = (vid_id, verse_ref, mention.get('timestamp_ms', 0))
+                    if key in rows:
+                        continue
+                    if vid_id not in detectors:
+                        detectors[vid_id] = BoundaryDetector(load_transcript(vid_id))
+                    proposal = detectors[vid_id].propose(mention.get('timestamp_ms', 0))
+                    if proposal is None:
+                        no_proposal += 1
+                        continue
+                    tolerance_ms = args.tolerance * 1000
+                    agrees = (abs(proposal['clip_start_ms'] - mention['clip_start_ms']) <= tolerance_ms
+                              and abs(proposal['clip_end_ms'] - mention['clip_end_ms']) <= tolerance_ms)
+                    rows[key] = (proposal['confidence'], agrees,
+                                 overlap(proposal['clip_start_ms'], proposal['clip_end_ms'],
+                                         mention['clip_start_ms'], mention['clip_end_ms']))
+    elapsed = time.perf_counter() - start
+
+    if not rows:
+        print(f'❌ Keine Clips in {args.db} — erst extract_clips.py laufen lassen.')
+        return
+
+    print(f"📐 {len(rows)} stored clips in {len(detectors)} videos "
+          f"({no_proposal} without a proposal), detector {elapsed * 1000:.0f} ms total")
+    print(f"  {'min conf':>8s} {'local':>6s} {'replaced':>9s} {'agree':>6s} {'agree%':>7s} {'mean IoU':>8s}")
+    for threshold in sorted(args.thresholds):
+        taken = [row for row in rows.values() if row[0] >= threshold]
+        agree = sum(1 for row in taken if row[1])
+        iou = sum(row[2] for row in taken) / len(taken) if taken else 0.0
+        print(f"  {threshold:8.2f} {len(taken):6d} {len(taken) / len(rows):8.0%} "
+              f"{agree:6d} {agree / len(taken) if taken else 0.0:6.0%} {iou:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
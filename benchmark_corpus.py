@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of loading the synthesis corpus, eager vs. lazy:
+
+  eager  json.load every *_parsed.json / *_enhanced.json and keep the dicts
+         (what synthesize_all_verses used to do)
+  lazy   VideoCorpus + VerseCorpus, then assemble the synthesis input of
+         every verse — including the legacy fallback, which fetches raw
+         segments through the LRU transcript cache
+
+The corpus is scaled up by linking each video file into a temp directory
+N times under different names. Every run is a fresh subprocess; peak RSS is
+ru_maxrss minus the resident size after imports.
+
+Usage: python3 benchmark_corpus.py [--scale 1 4 16]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rebuild_database import VerseCorpus
+from video_corpus import VideoCorpus
+
+DATA_DIR = Path('study_bible_data')
+
+
+def rss_bytes() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def build_corpus(target: Path, scale: int) -> int:
+    """Link the data files into target, each video file `scale` times; returns the video count."""
+    videos = 0
+    for source in sorted(DATA_DIR.glob('*_segments.bin')):
+        os.symlink(source.resolve(), target / source.name)
+    for source in sorted(DATA_DIR.glob('*_parsed.json')) + sorted(DATA_DIR.glob('*_enhanced.json')):
+        for copy in range(scale):
+            os.symlink(source.resolve(), target / f"c{copy}_{source.name}")
+        videos += scale
+    return videos
+
+
+def child(mode: str, data_dir: str):
+    data_dir = Path(data_dir)
+    base = rss_bytes()
+    start = time.perf_counter()
+    if mode == 'eager':
+        videos = []
+        for path in sorted(data_dir.glob('*_parsed.json')) + sorted(data_dir.glob('*_enhanced.json')):
+            with open(path, encoding='utf-8') as f:
+                videos.append(json.load(f))
+        passages = 0
+    else:
+        corpus = VerseCorpus(VideoCorpus(data_dir), {})
+        passages = sum(1 for verse_ref, videos in corpus.by_verse.items() for video in videos
+                       if corpus.passage(verse_ref, video))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({'peak': peak - base, 'time': elapsed, 'passages': passages}))
+
+
+def spawn(mode: str, data_dir: Path) -> dict:
+    out = subprocess.run([sys.executable, __file__, '--child', mode, str(data_dir)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark corpus loading memory')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16],
+                        help='Copies of each video file')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"  {'videos':>7s} {'eager':>10s} {'lazy':>10s} {'eager':>9s} {'lazy':>9s} passages")
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            videos = build_corpus(Path(tmp), scale)
+            eager, lazy = spawn('eager', Path(tmp)), spawn('lazy', Path(tmp))
+        print(f"  {videos:7d} {eager['peak'] / 1e6:8.1f}MB {lazy['peak'] / 1e6:8.1f}MB "
+              f"{eager['time'] * 1000:7.0f}ms {lazy['time'] * 1000:7.0f}ms {lazy['passages']:8d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass matcher in extract_study_bible_data against the
+original per-pattern loops (one re.finditer/re.search per pattern and line).
+
+Uses the segment texts of study_bible_data/*_study_data.json as corpus and
+checks that both paths find exactly the same verses, topics and terms — and
+that they still agree with the segments stored in those files.
+
+Usage: python3 benchmark_matcher.py [--repeat N]
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from extract_study_bible_data import (
+    VERSE_PATTERNS, TOPICS, THEOLOGICAL_TERMS, match_line,
+)
+
+DATA_DIR = Path('study_bible_data')
+
+
+def legacy_match_line(line: str):
+    """The per-pattern loops process_transcript used before compile_matcher()."""
+    verses = []
+    for pattern, book in VERSE_PATTERNS:
+        for match in re.finditer(pattern, line, re.IGNORECASE):
+            chapter = int(match.group(1))
+            verse = int(match.group(2)) if match.group(2) else None
+            verses.append((book, chapter, verse))
+    topics = [topic for pattern, topic in TOPICS
+              if re.search(pattern, line, re.IGNORECASE)]
+    terms = [term for pattern, term in THEOLOGICAL_TERMS
+             if re.search(pattern, line, re.IGNORECASE)]
+    return verses, topics, terms
+
+
+def segment_fields(verses, topics, terms):
+    """Render matcher output the way process_transcript stores it on a segment."""
+    refs = [f"{book} {chapter}" + (f":{verse}" if verse else "")
+            for book, chapter, verse in verses]
+    return refs, topics, terms
+
+
+def time_pass(fn, lines, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark verse/topic/term matching')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timing runs per implementation (best is reported)')
+    args = parser.parse_args()
+
+    segments = []
+    for path in sorted(DATA_DIR.glob('*_study_data.json')):
+        with open(path, encoding='utf-8') as f:
+            segments.extend(json.load(f).get('segments', []))
+    lines = [seg['text'] for seg in segments]
+    if not lines:
+        print('❌ Keine study_data Dateien gefunden.')
+        return
+
+    print(f"📚 {len(lines)} transcript lines, "
+          f"{len(VERSE_PATTERNS) + len(TOPICS) + len(THEOLOGICAL_TERMS)} patterns")
+
+    mismatches = 0
+    stale = 0
+    for seg in segments:
+        new = match_line(seg['text'])
+        if new != legacy_match_line(seg['text']):
+            mismatches += 1
+        stored = (seg.get('verses', []), seg.get('topics', []), seg.get('terms', []))
+        if segment_fields(*new) != stored:
+            stale += 1
+
+    legacy_s = time_pass(legacy_match_line, lines, args.repeat)
+    single_s = time_pass(match_line, lines, args.repeat)
+
+    print(f"  per-pattern loops: {legacy_s * 1000:8.1f} ms")
+    print(f"  single-pass:       {single_s * 1000:8.1f} ms")
+    print(f"  speedup:           {legacy_s / single_s:8.1f}x")
+    print(f"  mismatches vs per-pattern loops: {mismatches}")
+    print(f"  mismatches vs stored segments:   {stale}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark the mmapped segment store against json.load of *_study_data.json.
+
+Each path runs in a fresh subprocess and does three things:
+
+  load     open every video's transcript and keep it (time, resident memory)
+  opening  first 20 segment texts per video, re-opened as
+           get_transcript_opening does
+  windows  the ±3 min window around every verse mention in the database,
+           materialized as segment dicts (extract_clips' access pattern)
+
+Resident memory is read from /proc/self/statm before and after `load`. Both
+paths must produce the same openings and windows.
+
+Run `python3 segment_store.py` first to write the stores.
+
+Usage: python3 benchmark_segment_store.py [--repeat N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from segment_store import open_store
+from transcript import Transcript
+
+DATA_DIR = Path('study_bible_data')
+DB_PATH = Path('video-study-bible-mvp/public/study_bible_data/study_bible_database.json')
+WINDOW_MS = 180_000
+
+
+def rss_bytes() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def mentions_by_video() -> dict:
+    with open(DB_PATH, encoding='utf-8') as f:
+        db = json.load(f)
+    mentions = {}
+    for section in db.get('verses', {}).values():
+        for videos in section.values():
+            for video in videos:
+                for mention in video.get('mentions', []):
+                    mentions.setdefault(video.get('video_id', ''), []).append(
+                        mention.get('timestamp_ms', 0))
+    return mentions
+
+
+def open_transcript(mode: str, video_id: str) -> Transcript:
+    if mode == 'store':
+        return Transcript.from_store(open_store(DATA_DIR, video_id))
+    return Transcript.load(DATA_DIR / f"{video_id}_study_data.json")
+
+
+def child(mode: str, mentions_file: str):
+    with open(mentions_file, encoding='utf-8') as f:
+        mentions = json.load(f)
+    video_ids = sorted(p.name[:-len('_study_data.json')] for p in DATA_DIR.glob('*_study_data.json'))
+    result = {}
+
+    rss = rss_bytes()
+    start = time.perf_counter()
+    transcripts = {video_id: open_transcript(mode, video_id) for video_id in video_ids}
+    result['load'] = time.perf_counter() - start
+    result['rss'] = rss_bytes() - rss
+
+    digest = hashlib.sha256()
+    start = time.perf_counter()
+    for video_id in video_ids:
+        if mode == 'store':
+            store = open_store(DATA_DIR, video_id)
+            texts = [store.text(i) for i in range(min(20, len(store)))]
+        else:
+            texts = [seg['text'] for seg in open_transcript(mode, video_id).after(0, 20)]
+        digest.update(' '.join(texts).encode('utf-8'))
+    result['opening'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for video_id, centers in sorted(mentions.items()):
+        transcript = transcripts.get(video_id)
+        if transcript is None:
+            continue
+        for center in centers:
+            for seg in transcript.window(center, WINDOW_MS):
+                digest.update(f"{seg['start']}|{seg['text']}|{seg['topics']}\n".encode('utf-8'))
+    result['windows'] = time.perf_counter() - start
+    result['digest'] = digest.hexdigest()
+    result['videos'] = len(transcripts)
+    print(json.dumps(result))
+
+
+def spawn(mode: str, mentions_file: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, '--child', mode, mentions_file],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark segment store vs. JSON loading')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per path (best of each measurement is reported)')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'MENTIONS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    json_bytes = sum(p.stat().st_size for p in DATA_DIR.glob('*_study_data.json'))
+    store_bytes = sum(p.stat().st_size for p in DATA_DIR.glob('*_segments.bin'))
+    if not store_bytes:
+        print('❌ Keine Segment-Stores. Erst python3 segment_store.py ausführen.')
+        return
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(mentions_by_video(), f)
+    try:
+        results = {mode: [spawn(mode, f.name) for _ in range(args.repeat)]
+                   for mode in ('json', 'store')}
+    finally:
+        os.unlink(f.name)
+
+    best = {mode: {key: min(run[key] for run in runs)
+                   for key in ('load', 'rss', 'opening', 'windows')}
+            for mode, runs in results.items()}
+    print(f"📦 {results['json'][0]['videos']} videos · *_study_data.json {json_bytes / 1e6:.1f} MB "
+          f"· *_segments.bin {store_bytes / 1e6:.1f} MB")
+    print(f"  {'':8s} {'json':>10s} {'store':>10s}")
+    for key, label in (('load', 'load'), ('opening', 'opening'), ('windows', 'windows')):
+        print(f"  {label:8s} {best['json'][key] * 1000:8.1f}ms {best['store'][key] * 1000:8.1f}ms "
+              f"({best['json'][key] / best['store'][key]:.1f}x)")
+    print(f"  {'RSS':8s} {best['json']['rss'] / 1e6:8.1f}MB {best['store']['rss'] / 1e6:8.1f}MB")
+    same = len({run['digest'] for runs in results.values() for run in runs}) == 1
+    print(f"  identische Ergebnisse: {'ja' if same else 'NEIN'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark Transcript's bisect queries against the linear scans they replace:
+
+  window  extract_clips.segments_window (filter every segment per mention)
+  after   rebuild_database's `next(idx for idx, s in enumerate(segments)
+          if s['start'] >= ts)` lookup
+
+Every verse mention in the database is one query against its video's
+segments (from study_bible_data/*_study_data.json); both paths must return
+exactly the same segments.
+
+Usage: python3 benchmark_transcript.py [--repeat N]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from transcript import Transcript
+
+DATA_DIR = Path('study_bible_data')
+DB_PATH = Path('video-study-bible-mvp/public/study_bible_data/study_bible_database.json')
+WINDOW_MS = 180_000
+
+
+def legacy_window(segments: list, center_ms: int) -> list:
+    return [s for s in segments if abs(s['start_ms'] - center_ms) <= WINDOW_MS]
+
+
+def legacy_after(segments: list, ts: str):
+    return next((idx for idx, s in enumerate(segments) if s.get('start', '') >= ts), None)
+
+
+def load_queries():
+    """(video_id, timestamp, timestamp_ms) for every mention in the database."""
+    with open(DB_PATH, encoding='utf-8') as f:
+        db = json.load(f)
+    queries = []
+    for section in db.get('verses', {}).values():
+        for videos in section.values():
+            for video in videos:
+                for mention in video.get('mentions', []):
+                    queries.append((video.get('video_id', ''), mention.get('timestamp', ''),
+                                    mention.get('timestamp_ms', 0)))
+    return queries
+
+
+def time_pass(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transcript time queries')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timing runs per implementation (best is reported)')
+    args = parser.parse_args()
+
+    segments = {}
+    for path in sorted(DATA_DIR.glob('*_study_data.json')):
+        with open(path, encoding='utf-8') as f:
+            segments[path.name[:-len('_study_data.json')]] = json.load(f).get('segments', [])
+    queries = [q for q in load_queries() if segments.get(q[0])]
+    if not queries:
+        print('❌ Keine Erwähnungen mit study_data gefunden.')
+        return
+
+    start = time.perf_counter()
+    transcripts = {vid: Transcript(segs) for vid, segs in segments.items()}
+    build_s = time.perf_counter() - start
+
+    mismatches = 0
+    for vid, ts, ts_ms in queries:
+        segs, transcript = segments[vid], transcripts[vid]
+        if legacy_window(segs, ts_ms) != transcript.window(ts_ms, WINDOW_MS):
+            mismatches += 1
+        if legacy_after(segs, ts) != transcript.index_after(ts):
+            mismatches += 1
+
+    def scan_window():
+        for vid, _, ts_ms in queries:
+            legacy_window(segments[vid], ts_ms)
+
+    def bisect_window():
+        for vid, _, ts_ms in queries:
+            transcripts[vid].window(ts_ms, WINDOW_MS)
+
+    def scan_after():
+        for vid, ts, _ in queries:
+            legacy_after(segments[vid], ts)
+
+    def bisect_after():
+        for vid, ts, _ in queries:
+            transcripts[vid].index_after(ts)
+
+    n_segments = sum(len(segs) for segs in segments.values())
+    print(f"📚 {len(queries)} mentions, {len(segments)} videos, {n_segments} segments "
+          f"(index build {build_s * 1000:.1f} ms)")
+    for name, scan, bisect in (('window', scan_window, bisect_window),
+                               ('after', scan_after, bisect_after)):
+        scan_s = time_pass(scan, args.repeat)
+        bisect_s = time_pass(bisect, args.repeat)
+        print(f"  {name:6s} scan:   {scan_s / len(queries) * 1e6:8.1f} µs/query")
+        print(f"  {name:6s} bisect: {bisect_s / len(queries) * 1e6:8.1f} µs/query "
+              f"({scan_s / bisect_s:.0f}x)")
+    print(f"  mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Bible reference parsing and a range-aware reference index.
+
+References are packed into integers as BBCCCVVV (book · chapter · verse), so
+"Genesis 1:3" is 1_001_003 and comparisons follow canonical order. A whole
+chapter spans verse 0–999, a whole book chapter 0–999, which lets
+"Genesis 1", "1. Mose 1,1-5" and "Genesis 1:31-2:2" all be stored as
+(start_id, end_id) intervals.
+
+Used instead of string tests like ref.startswith('Genesis 1'), which also
+matched Genesis 10–19.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAX_CHAPTER = 999
+MAX_VERSE = 999
+
+# Canonical book order with German and English names. The first English name
+# is the canonical label (matches the labels in extract_study_bible_data).
+BOOKS = [
+    ('Genesis', ['1. Mose', 'Genesis']),
+    ('Exodus', ['2. Mose', 'Exodus']),
+    ('Leviticus', ['3. Mose', 'Levitikus', 'Leviticus']),
+    ('Numbers', ['4. Mose', 'Numeri', 'Numbers']),
+    ('Deuteronomy', ['5. Mose', 'Deuteronomium', 'Deuteronomy']),
+    ('Joshua', ['Josua', 'Joshua']),
+    ('Judges', ['Richter', 'Judges']),
+    ('Ruth', ['Rut', 'Ruth']),
+    ('1 Samuel', ['1. Samuel']),
+    ('2 Samuel', ['2. Samuel']),
+    ('1 Kings', ['1. Könige', '1. Kings']),
+    ('2 Kings', ['2. Könige', '2. Kings']),
+    ('1 Chronicles', ['1. Chronik', '1. Chronicles']),
+    ('2 Chronicles', ['2. Chronik', '2. Chronicles']),
+    ('Ezra', ['Esra', 'Ezra']),
+    ('Nehemiah', ['Nehemia', 'Nehemiah']),
+    ('Esther', ['Ester', 'Esther']),
+    ('Job', ['Hiob', 'Ijob', 'Job']),
+    ('Psalm', ['Psalmen', 'Psalm', 'Psalms']),
+    ('Proverbs', ['Sprüche', 'Sprichwörter', 'Proverbs']),
+    ('Ecclesiastes', ['Prediger', 'Kohelet', 'Ecclesiastes']),
+    ('Song of Songs', ['Hoheslied', 'Hohelied', 'Song of Songs', 'Song of Solomon']),
+    ('Isaiah', ['Jesaja', 'Isaiah']),
+    ('Jeremiah', ['Jeremia', 'Jeremiah']),
+    ('Lamentations', ['Klagelieder', 'Lamentations']),
+    ('Ezekiel', ['Hesekiel', 'Ezechiel', 'Ezekiel']),
+    ('Daniel', ['Daniel']),
+    ('Hosea', ['Hosea']),
+    ('Joel', ['Joel']),
+    ('Amos', ['Amos']),
+    ('Obadiah', ['Obadja', 'Obadiah']),
+    ('Jonah', ['Jona', 'Jonah']),
+    ('Micah', ['Micha', 'Micah']),
+    ('Nahum', ['Nahum']),
+    ('Habakkuk', ['Habakuk', 'Habakkuk']),
+    ('Zephaniah', ['Zefanja', 'Zephanja', 'Zephaniah']),
+    ('Haggai', ['Haggai']),
+    ('Zechariah', ['Sacharja', 'Zechariah']),
+    ('Malachi', ['Maleachi', 'Malachi']),
+    ('Matthew', ['Matthäus', 'Matthew']),
+    ('Mark', ['Markus', 'Mark']),
+    ('Luke', ['Lukas', 'Luke']),
+    ('John', ['Johannes', 'John']),
+    ('Acts', ['Apostelgeschichte', 'Acts']),
+    ('Romans', ['Römer', 'Romans']),
+    ('1 Corinthians', ['1. Korinther', '1. Corinthians']),
+    ('2 Corinthians', ['2. Korinther', '2. Corinthians']),
+    ('Galatians', ['Galater', 'Galatians']),
+    ('Ephesians', ['Epheser', 'Ephesians']),
+    ('Philippians', ['Philipper', 'Philippians']),
+    ('Colossians', ['Kolosser', 'Colossians']),
+    ('1 Thessalonians', ['1. Thessalonicher', '1. Thessalonians']),
+    ('2 Thessalonians', ['2. Thessalonicher', '2. Thessalonians']),
+    ('1 Timothy', ['1. Timotheus', '1. Timothy']),
+    ('2 Timothy', ['2. Timotheus', '2. Timothy']),
+    ('Titus', ['Titus']),
+    ('Philemon', ['Philemon']),
+    ('Hebrews', ['Hebräer', 'Hebrews']),
+    ('James', ['Jakobus', 'James']),
+    ('1 Peter', ['1. Petrus', '1. Peter']),
+    ('2 Peter', ['2. Petrus', '2. Peter']),
+    ('1 John', ['1. Johannes', '1. John']),
+    ('2 John', ['2. Johannes', '2. John']),
+    ('3 John', ['3. Johannes', '3. John']),
+    ('Jude', ['Judas', 'Jude']),
+    ('Revelation', ['Offenbarung', 'Revelation']),
+]
+
+BOOK_IDS = {label: idx + 1 for idx, (label, _) in enumerate(BOOKS)}
+
+
+def _name_pattern(name: str) -> str:
+    """'1. Mose' also matches '1.Mose', '1 Mose' and '1Mose'."""
+    number = re.match(r'(\d)\.\s*(.+)', name)
+    if number:
+        return rf'{number.group(1)}\.?\s*{re.escape(number.group(2))}'
+    return re.escape(name).replace(r'\ ', r'\s+')
+
+
+def _compile_book_regex() -> Tuple[re.Pattern, Dict[str, int]]:
+    group_books = {}
+    alternatives = []
+    names = [(name, idx + 1) for idx, (_, aliases) in enumerate(BOOKS) for name in aliases]
+    # Longest names first so "1. Johannes" wins over "Johannes"
+    for n, (name, book) in enumerate(sorted(names, key=lambda x: len(x[0]), reverse=True)):
+        group_books[f'b{n}'] = book
+        alternatives.append(f'(?P<b{n}>{_name_pattern(name)})')
+    regex = re.compile(r'(?<![\w.])(?:' + '|'.join(alternatives) + r')(?!\w)', re.IGNORECASE)
+    return regex, group_books
+
+
+BOOK_RE, _GROUP_BOOKS = _compile_book_regex()
+
+# One reference item after normalization, e.g. "1:3-5", "1:31-2:2", "19-20", "v3-5"
+ITEM_RE = re.compile(r'(?<![\d:])(v)?(\d+)(?::(\d+))?(?:-(\d+)(?::(\d+))?)?')
+
+
+def pack(book: int, chapter: int, verse: int) -> int:
+    """Pack a reference into its BBCCCVVV integer ID."""
+    return book * 1_000_000 + chapter * 1_000 + verse
+
+
+def unpack(ref_id: int) -> Tuple[int, int, int]:
+    """Inverse of pack(): (book, chapter, verse)."""
+    return ref_id // 1_000_000, (ref_id // 1_000) % 1_000, ref_id % 1_000
+
+
+def book_span(book: int) -> Tuple[int, int]:
+    return pack(book, 0, 0), pack(book, MAX_CHAPTER, MAX_VERSE)
+
+
+def chapter_span(book: int, chapter: int) -> Tuple[int, int]:
+    return pack(book, chapter, 0), pack(book, chapter, MAX_VERSE)
+
+
+def format_id(ref_id: int) -> str:
+    """Render an ID as "Genesis 1:3" (or "Genesis 1" for a chapter start)."""
+    book, chapter, verse = unpack(ref_id)
+    label = BOOKS[book - 1][0]
+    if verse in (0, MAX_VERSE):
+        return f"{label} {chapter}"
+    return f"{label} {chapter}:{verse}"
+
+
+VERSE_WORD = r'(?:Verse?n?|Vv?\.)\s*'
+# ", 3" after a chapter:verse item (or a verse already marked "v") is another verse
+VERSE_LIST_RE = re.compile(rf'((?:\d:|\bv)\d+(?:-\d+)?)\s*,\s*(?:{VERSE_WORD})?(\d+)(?![\d:])',
+                           re.IGNORECASE)
+
+
+# German cross-chapter range "1,1-2,3" (the second comma without a space)
+CROSS_CHAPTER_RE = re.compile(r'(?<![\d:,])(\d+)\s*,\s*(\d+)-(\d+),(\d+)')
+# German dot list "1:26.27" (after the comma rewrite): another verse of the chapter
+VERSE_DOT_RE = re.compile(r'((?:\d:|\bv)\d+(?:-\d+)?)\.(\d+)')
+
+
+def _verse_lists(t: str) -> str:
+    """"1:1, 3, 5-7" -> "1:1, v3, v5-7" (repeated, each pass extends the list by one)."""
+    while True:
+        listed = VERSE_LIST_RE.sub(r'\1, v\2', t)
+        if listed == t:
+            return t
+        t = listed
+
+
+def _normalize_tail(tail: str) -> str:
+    """Rewrite German/English number notation into the ITEM_RE grammar."""
+    t = re.sub(r'\bKapitel\s*', '', tail, flags=re.IGNORECASE)
+    # Verse parts: "4b" -> "4"
+    t = re.sub(r'(\d)[abc]\b', r'\1', t)
+    t = re.sub(r'\s*(?:-|–|—|\bbis\b|\bto\b)\s*', '-', t, flags=re.IGNORECASE)
+    t = re.sub(r'(\d)\s*:\s*(?=\d)', r'\1:', t)
+    t = CROSS_CHAPTER_RE.sub(r'\1:\2-\3:\4', t)
+    t = _verse_lists(t)
+    # "1,1" / "1, Vers 3" / "1 Vers 3" -> "1:1" / "1:3", unless the number
+    # before the comma already ends a chapter:verse item or range
+    t = re.sub(rf'(?<![\d:,-])(\d+)\s*(?:,\s*(?:{VERSE_WORD})?|\s+{VERSE_WORD})(?=\d)', r'\1:', t,
+               flags=re.IGNORECASE)
+    while VERSE_DOT_RE.search(t):
+        t = VERSE_DOT_RE.sub(r'\1, v\2', t)
+    t = _verse_lists(t)
+    # Standalone "Vers 3" refers to the current chapter
+    t = re.sub(rf'\b{VERSE_WORD}(?=\d)', 'v', t, flags=re.IGNORECASE)
+    return t
+
+
+def _parse_tail(tail: str, book: Optional[int], chapter: Optional[int],
+                ranges: List[Tuple[int, int]]) -> Optional[int]:
+    """Parse the numbers following a book name; returns the last chapter seen."""
+    for m in ITEM_RE.finditer(_normalize_tail(tail)):
+        verse_only, a, b, c, d = m.groups()
+        a = int(a)
+        if book is None:
+            continue
+        if verse_only:
+            if chapter is None:
+                continue
+            end = int(c) if c else a
+            ranges.append((pack(book, chapter, a), pack(book, chapter, end)))
+        elif b is not None:
+            chapter = a
+            start = pack(book, a, int(b))
+            if d is not None:            # 1:31-2:2
+                chapter = int(c)
+                end = pack(book, chapter, int(d))
+            elif c is not None:          # 1:3-5
+                end = pack(book, a, int(c))
+            else:                        # 1:3
+                end = start
+            ranges.append((start, end))
+        else:
+            chapter = a
+            if d is not None:            # 1-2:3
+                chapter = int(c)
+                ranges.append((pack(book, a, 0), pack(book, chapter, int(d))))
+            else:                        # 1 / 19-20
+                if c is not None:
+                    chapter = int(c)
+                ranges.append((pack(book, a, 0), pack(book, chapter, MAX_VERSE)))
+    return chapter
+
+
+# What may surround a book name that stands for the whole book: list
+# separators, "und"/"and", or the start/end of the reference
+ALONE_BEFORE_RE = re.compile(r'(?:^|[,;/\-–—]|\bund|\band|\bsowie)\s*$', re.IGNORECASE)
+ALONE_AFTER_RE = re.compile(r'\s*(?:$|[,;/\-–—:]|und\b|and\b|sowie\b)', re.IGNORECASE)
+
+
+def _stands_alone(text: str, m: re.Match) -> bool:
+    """True if a book name without a chapter is a list item of its own, not a word in a sentence."""
+    return (ALONE_BEFORE_RE.search(text[:m.start()]) is not None
+            and ALONE_AFTER_RE.match(text, m.end()) is not None)
+
+
+def parse_reference(text: str,
+                    context: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+    """
+    Parse a German or English reference string into (start_id, end_id) ranges.
+
+    Handles "Genesis 1:3", "1. Mose 1,1-5", "Genesis 1:31-2:2", "1. Mose 1,1-2,3",
+    "Genesis 1-11", "1. Mose 1, Vers 3 bis 5", "1. Mose 1,26.27", lists like
+    "Genesis 1:3-5 und 1:14-19" and several books in one string.
+    Parenthesized remarks are ignored. A book name on its own ("Genesis",
+    "Genesis 1 und Offenbarung") covers the whole book; one without a
+    chapter inside a sentence ("Der Prediger sagt") is no reference.
+    "Vers 3 bis 5" without a book needs a (book, chapter) context.
+    """
+    text = re.sub(r'\([^)]*\)', ' ', text or '')
+    ranges: List[Tuple[int, int]] = []
+
+    matches = list(BOOK_RE.finditer(text))
+    book, chapter = context if context else (None, None)
+    head_end = matches[0].start() if matches else len(text)
+    _parse_tail(text[:head_end], book, chapter, ranges)
+
+    for n, m in enumerate(matches):
+        book = _GROUP_BOOKS[m.lastgroup]
+        tail = text[m.end():matches[n + 1].start() if n + 1 < len(matches) else len(text)]
+        before = len(ranges)
+        _parse_tail(tail, book, None, ranges)
+        if len(ranges) == before and _stands_alone(text, m):
+            ranges.append(book_span(book))
+    return ranges
+
+
+class ReferenceIndex:
+    """
+    Static interval index over packed reference ranges.
+
+    Intervals are sorted by start and stored as an implicit balanced tree
+    where every node keeps the largest end of its subtree, so stabbing and
+    overlap queries skip whole subtrees and cost O(log n) per reported hit.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, int, Any]]):
+        self._items = sorted(items, key=lambda x: (x[0], x[1]))
+        self._starts = [start for start, _, _ in self._items]
+        self._max_end = [0] * len(self._items)
+        self._build(0, len(self._items))
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str]) -> 'ReferenceIndex':
+        """Index verse keys (e.g. db['verses']['all'] keys) by their parsed ranges."""
+        return cls((start, end, key) for key in keys
+                   for start, end in parse_reference(key))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _build(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self._items[mid][1],
+                                 self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_end[mid]
+
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        """Payloads of all intervals that share at least one ID with [start, end]."""
+        found: List[int] = []
+        stack = [(0, len(self._items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                continue
+            stack.append((lo, mid))
+            # Everything right of mid starts later still
+            if self._starts[mid] > end:
+                continue
+            if self._items[mid][1] >= start:
+                found.append(mid)
+            stack.append((mid + 1, hi))
+        return [self._items[idx][2] for idx in sorted(found)]
+
+    def covering(self, ref_id: int) -> List[Any]:
+        """Payloads of all intervals that contain a single verse ID."""
+        return self.overlapping(ref_id, ref_id)
+
+    def keys_in(self, start: int, end: int) -> set:
+        return set(self.overlapping(start, end))
+
+
+def is_single_verse(ref: str) -> bool:
+    """True if every range in the reference is exactly one verse."""
+    ranges = parse_reference(ref)
+    return bool(ranges) and all(start == end for start, end in ranges)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Local clip boundaries for a verse mention, without a model call.
+
+Segments carry only start times, so the pause before a segment is the gap
+to the previous start minus the time its words take at the video's median
+speaking rate. Topic shifts come from TextTiling (Hearst 1997): every gap
+between segments compares the vocabulary of the BLOCK_SEGMENTS before and
+after it (cosine over crudely stemmed content words); the depth of a
+similarity valley marks a shift. Both signals become percentile ranks within
+the video and are averaged into one boundary score per segment start.
+
+A clip then starts at the best-scoring boundary in the START_RANGE_MS before
+the mention and ends at the best one in the END_RANGE_MS after it. An
+edge's confidence is how clearly its boundary beats the runner-up in its
+range, (best - second) / (1 - second), so 1 means nothing else there looks
+like a boundary; a range with no runner-up, or one where only the video's
+start is left, gives 0. The clip's confidence is the weaker edge's.
+extract_clips.py --local takes clips at or above a threshold from here and
+sends only the rest to the model; benchmark_clip_boundaries.py measures how
+often they agree with the clips already in the database.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from math import sqrt
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+from transcript import Transcript
+
+BLOCK_SEGMENTS = 6                   # segments compared on each side of a gap
+PAUSE_WEIGHT = 0.5                   # share of the pause signal in a boundary score
+START_RANGE_MS = (90_000, 0)         # clip start: up to 90 s before the mention, at the latest at it
+END_RANGE_MS = (20_000, 180_000)     # clip end: 20 s to 3 min after the mention
+STEM_CHARS = 6                       # words are compared by their first few letters
+
+STOPWORDS = frozenset('''
+aber alle allem allen aller alles also auch auf aus bei beim bin bis bist dann das dass dem den
+denn der des dich die dies diese diesem diesen dieser dieses dir doch dort durch ein eine einem
+einen einer eines euch euer eure fur für hab habe haben hat hatte hier ich ihm ihn ihnen ihr
+ihre ist jetzt kann kein keine man mich mir mit muss nach nicht noch nun nur oder ohne sehr sein
+seine sich sie sind so und uns unser unsere von vor war waren was weil wenn wer wie wir wird
+wo zu zum zur über ganz gibt immer mal schon sagen sagt wirklich eben einfach gerade
+'''.split())
+
+
+def content_words(text: str) -> List[str]:
+    """Lowercased words of 3+ letters minus stopwords, cut to STEM_CHARS letters."""
+    return [word[:STEM_CHARS] for word in re.findall(r'[a-zäöüß]+', text.lower())
+            if len(word) >= 3 and word not in STOPWORDS]
+
+
+def cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[word] for word, count in a.items() if word in b)
+    return dot / sqrt(sum(c * c for c in a.values()) * sum(c * c for c in b.values()))
+
+
+def depth_scores(similarity: List[float]) -> List[float]:
+    """TextTiling depth of every gap: how far it lies below the peaks to its left and right."""
+    depths = []
+    for i, value in enumerate(similarity):
+        left = right = value
+        for j in range(i - 1, -1, -1):
+            if similarity[j] < left:
+                break
+            left = similarity[j]
+        for j in range(i + 1, len(similarity)):
+            if similarity[j] < right:
+                break
+            right = similarity[j]
+        depths.append((left - value) + (right - value))
+    return depths
+
+
+def percentile_ranks(values: List[float]) -> List[float]:
+    """Share of values strictly below each value, in [0, 1)."""
+    ordered = sorted(values)
+    return [bisect_left(ordered, value) / len(ordered) for value in values]
+
+
+class BoundaryDetector:
+    """Boundary scores of one transcript, computed once, and clip proposals from them."""
+
+    def __init__(self, transcript: Transcript):
+        self.starts = list(transcript.starts)
+        n = len(self.starts)
+        texts = [transcript.segments[i]['text'] for i in range(n)]
+        words = [content_words(text) for text in texts]
+        lengths = [max(1, len(text.split())) for text in texts]
+
+        # Pause before segment i: the gap not explained by segment i-1's words
+        rates = [(self.starts[i] - self.starts[i - 1]) / lengths[i - 1] for i in range(1, n)]
+        ms_per_word = median(rates) if rates else 0.0
+        pauses = [0.0] + [max(0.0, self.starts[i] - self.starts[i - 1] - lengths[i - 1] * ms_per_word)
+                          for i in range(1, n)]
+
+        # Lexical cohesion across the gap before segment i
+        similarity = [1.0] + [cosine(Counter(w for seg in words[max(0, i - BLOCK_SEGMENTS):i] for w in seg),
+                                     Counter(w for seg in words[i:i + BLOCK_SEGMENTS] for w in seg))
+                              for i in range(1, n)]
+        depths = depth_scores(similarity) if n else []
+
+        pause_rank, depth_rank = percentile_ranks(pauses), percentile_ranks(depths)
+        # scores[i]: how likely a new passage begins with segment i
+        self.scores = [PAUSE_WEIGHT * p + (1 - PAUSE_WEIGHT) * d
+                       for p, d in zip(pause_rank, depth_rank)]
+
+    def best_boundary(self, lo_ms: int, hi_ms: int) -> Optional[Tuple[int, float]]:
+        """(segment index, confidence) of the best boundary starting in [lo_ms, hi_ms].
+
+        Segment 0 has no gap before it to score, so it is never ranked; a
+        winner without rivals has nothing to beat and gets confidence 0.
+        """
+        lo, hi = max(1, bisect_left(self.starts, lo_ms)), bisect_right(self.starts, hi_ms)
+        if lo >= hi:
+            return None
+        best = max(range(lo, hi), key=lambda i: self.scores[i])
+        # Runner-up: best boundary that is not a direct neighbour of the winner
+        rivals = [self.scores[i] for i in range(lo, hi) if abs(i - best) > 1]
+        if not rivals:
+            return best, 0.0
+        score, runner_up = self.scores[best], max(rivals)
+        # Share of the headroom above the runner-up that the winner takes
+        return best, (score - runner_up) / (1 - runner_up) if runner_up < 1 else 0.0
+
+    def propose(self, timestamp_ms: int) -> Optional[Dict]:
+        """{clip_start_ms, clip_end_ms, confidence} around a mention, or None without segments."""
+        start = self.best_boundary(timestamp_ms - START_RANGE_MS[0], timestamp_ms - START_RANGE_MS[1])
+        if start is None:
+            # Nothing scored in range (mention near the video's start): open
+            # with the video, unconfidently, so --local leaves it to the model
+            if not self.starts:
+                return None
+            start = (0, 0.0)
+        end = self.best_boundary(timestamp_ms + END_RANGE_MS[0], timestamp_ms + END_RANGE_MS[1])
+        if end is None:
+            return None
+        return {
+            'clip_start_ms': self.starts[start[0]],
+            'clip_end_ms': self.starts[end[0]],
+            'confidence': round(min(start[1], end[1]), 3),
+        }
@@ -5,33 +5,71 @@ For each verse mention in the database, use Claude to:
  - Generate a hook title (German, ~6 words)
  - Generate a 1-sentence description
 
-Updates study_bible_database.json in-place.
+Updates study_bible_database.json in-place. Pending mentions run
+concurrently (--workers); the database is saved atomically every
+--checkpoint-every clips or --checkpoint-interval seconds, so an interrupted
+run keeps what it found and the next one only sends the rest.
+
+Mentions are grouped per video before anything is sent: the same mention
+listed under several sections or entries is asked for once, and mentions a
+few seconds apart share one request over a common transcript window that
+returns a clip for each of them (--no-cluster: one request per mention).
+Members a cluster answer leaves out or gets wrong are asked for singly.
+
+With --local, clip_boundaries proposes boundaries from pauses and topic
+shifts first; mentions whose proposal reaches --min-confidence take it
+(clip_source "local", no title/description — the app falls back to the
+video title and context) and only the rest are sent to the model.
 """
 
+import argparse
+import asyncio
 import json
 import os
 import re
 import sys
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import anthropic
 
+import fake_anthropic
+from clip_boundaries import BoundaryDetector
+from llm_batch import POLL_INTERVAL, batch_custom_id, run_batch
+from llm_cache import cache_key, default_cache, request_kwargs
+from llm_limiter import AdaptiveLimiter, estimate_tokens, retry_delay
+from segment_store import open_store
+from transcript import Transcript
+from work_scheduler import WorkScheduler
+
 DB_PATH = Path('video-study-bible-mvp/public/study_bible_data/study_bible_database.json')
 DATA_DIR = Path('study_bible_data')
 WINDOW_MS = 180_000   # ±3 minutes around mention timestamp
-
-
-def load_segments(video_id: str) -> list:
+CLIP_MODEL = 'claude-haiku-4-5-20251001'
+CLIP_MAX_TOKENS = 300
+BATCH_STATE = Path('.clips_batch_state.json')
+WORKERS = 8
+CHECKPOINT_EVERY = 50         # completed mentions between database saves
+CHECKPOINT_INTERVAL = 30.0    # seconds between database saves
+CLUSTER_GAP_MS = 60_000       # mentions of a video closer than this share a request...
+CLUSTER_SPAN_MS = 180_000     # ...as long as first and last are at most this far apart
+CLUSTER_MAX = 8               # and there are no more than this many
+LOCAL_MIN_CONFIDENCE = 0.4    # --local: proposals at least this confident skip the model
+
+
+def load_transcript(video_id: str) -> Transcript:
+    store = open_store(DATA_DIR, video_id)
+    if store is not None:
+        return Transcript.from_store(store)
     for pattern in [f'{video_id}_parsed.json', f'{video_id}_study_data.json']:
         p = DATA_DIR / pattern
         if p.exists():
-            with open(p) as f:
-                return json.load(f).get('segments', [])
-    return []
+            return Transcript.load(p)
+    return Transcript([])
 
 
-def segments_window(segments: list, center_ms: int) -> list:
-    return [s for s in segments
-            if abs(s['start_ms'] - center_ms) <= WINDOW_MS]
+def segments_window(transcript: Transcript, center_ms: int) -> list:
+    return transcript.window(center_ms, WINDOW_MS)
 
 
 def ms_to_ts(ms: int) -> str:
@@ -39,11 +77,12 @@ def ms_to_ts(ms: int) -> str:
     return f'{s//3600:02d}:{(s%3600)//60:02d}:{s%60:02d}'
 
 
-def extract_clip(client, verse_ref: str, mention: dict, segments: list) -> dict:
+def build_clip_prompt(verse_ref: str, mention: dict, transcript: Transcript) -> Optional[str]:
+    """Prompt for one mention, or None when no segments fall in its window."""
     center_ms = mention.get('timestamp_ms', 0)
-    window = segments_window(segments, center_ms)
+    window = segments_window(transcript, center_ms)
     if not window:
-        return {}
+        return None
 
     seg_text = '\n'.join(
         f'[{s["start"]}|{s["start_ms"]}ms] {s["text"]}' for s in window
@@ -71,88 +110,472 @@ Antworte NUR mit gültigem JSON:
   "clip_title": "<Hook-Titel>",
   "clip_description": "<Beschreibung>"
 }}"""
+    return prompt
 
+
+def validate_clip(result: dict) -> dict:
+    """result if its boundaries are plausible, else {}."""
+    # Validate: start < end, both within reasonable range
+    s, e = result.get('clip_start_ms', 0), result.get('clip_end_ms', 0)
+    if not isinstance(s, int) or not isinstance(e, int) or s >= e or e - s > 600_000 or s < 0:
+        return {}
+    return result
+
+
+def strip_fences(text: str) -> str:
+    return re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip(), flags=re.MULTILINE).strip()
+
+
+def parse_answer(text: str) -> dict:
+    """The JSON object of a clip or cluster answer; ValueError if it is truncated or not one."""
+    answer = json.loads(strip_fences(text))
+    if not isinstance(answer, dict):
+        raise ValueError('answer is not a JSON object')
+    return answer
+
+
+def parse_clip(text: str) -> dict:
+    """The clip JSON from a model answer; {} if its boundaries are implausible."""
+    return validate_clip(parse_answer(text))
+
+
+def parse_cluster(text: str, n: int) -> Dict[int, dict]:
+    """Member index -> clip from a cluster answer; implausible or missing members are left out."""
+    clips = {}
+    items = parse_answer(text).get('clips', [])
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.get('nr')) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < n and idx not in clips and validate_clip(item):
+            clips[idx] = item
+    return clips
+
+
+async def request_clip_text(client: anthropic.AsyncAnthropic, limiter: AdaptiveLimiter,
+                            prompt: str, max_tokens: int = CLIP_MAX_TOKENS,
+                            max_attempts: int = 6) -> Optional[str]:
+    """
+    Model answer for a clip prompt: retries 429s through the shared limiter;
+    None on error. Only an answer parse_answer() accepts is cached; a
+    malformed one is returned uncached, so the next run asks again.
+    """
+    cache = default_cache()
+    key = cache_key(CLIP_MODEL, max_tokens, prompt)
+
+    # Cache hits never take a slot from the limiter
+    text = cache.get(key, validate=parse_answer)
+    for attempt in range(max_attempts):
+        if text is not None:
+            break
+        async with limiter:
+            try:
+                message = await client.messages.create(
+                    **request_kwargs(CLIP_MODEL, max_tokens, prompt))
+            except anthropic.RateLimitError as e:
+                limiter.on_rate_limit(retry_delay(e, attempt))
+                continue
+            except Exception as ex:
+                print(f'      ⚠ AI error: {ex}')
+                return None
+
+        limiter.on_success()
+        cache.record_usage('clips', message)
+        text = message.content[0].text
+        try:
+            parse_answer(text)
+        except ValueError:
+            break
+        cache.put(key, text)
+
+    if text is None:
+        print(f'      ⚠ AI error: rate limited {max_attempts}x, giving up')
+    return text
+
+
+async def extract_clip_async(client: anthropic.AsyncAnthropic, limiter: AdaptiveLimiter,
+                             prompt: str) -> dict:
+    """Clip boundaries for a built prompt via request_clip_text(); {} on error or an unusable answer."""
+    text = await request_clip_text(client, limiter, prompt)
+    if text is None:
+        return {}
     try:
-        msg = client.messages.create(
-            model='claude-haiku-4-5-20251001',
-            max_tokens=300,
-            temperature=0,
-            messages=[{'role': 'user', 'content': prompt}]
-        )
-        text = msg.content[0].text.strip()
-        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text, flags=re.MULTILINE).strip()
-        result = json.loads(text)
-
-        # Validate: start < end, both within reasonable range
-        s, e = result.get('clip_start_ms', 0), result.get('clip_end_ms', 0)
-        if s >= e or e - s > 600_000 or s < 0:
-            return {}
-        return result
+        return parse_clip(text)
     except Exception as ex:
         print(f'      ⚠ AI error: {ex}')
         return {}
 
 
-def main():
-    api_key = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('ANTHROPIC_API_KEY')
-    if not api_key:
-        print('Usage: python3 extract_clips.py <api_key>')
-        sys.exit(1)
+async def extract_cluster_async(client: anthropic.AsyncAnthropic, limiter: AdaptiveLimiter,
+                                prompt: str, n: int) -> Dict[int, dict]:
+    """Clips for the n members of a cluster prompt, by member index."""
+    text = await request_clip_text(client, limiter, prompt, cluster_max_tokens(n))
+    if text is None:
+        return {}
+    try:
+        return parse_cluster(text, n)
+    except Exception as ex:
+        print(f'      ⚠ AI error: {ex}')
+        return {}
 
-    client = anthropic.Anthropic(api_key=api_key)
 
-    with open(DB_PATH) as f:
-        db = json.load(f)
-
-    # Collect unique (video_id, mention_idx) combos to process
-    # Process in-place: iterate over all video entries
-    total_mentions = 0
-    enriched = 0
-    skipped = 0
+def mention_key(verse_ref: str, mention: dict) -> tuple:
+    """Everything build_clip_prompt reads from a mention: equal keys mean the same request."""
+    return (verse_ref, mention.get('timestamp', '?'), mention.get('timestamp_ms', 0),
+            mention.get('context', '')[:200], mention.get('category', '?'))
 
-    # Cache segments per video_id to avoid re-loading
-    seg_cache: dict = {}
 
+def pending_members(db: dict, seg_cache: dict) -> Tuple[Dict[str, List[dict]], int, int]:
+    """
+    Mentions still without a clip, per video: (video_id -> members, mentions
+    seen, mentions already done). A member is one distinct request; its
+    `targets` are every mention dict (across sections and entries) it fills.
+    """
+    members: Dict[str, Dict[tuple, dict]] = {}
+    total = skipped = 0
     for section_name, section in db.get('verses', {}).items():
         for verse_ref, videos in section.items():
             for video in videos:
                 vid_id = video.get('video_id', '')
                 if vid_id not in seg_cache:
-                    seg_cache[vid_id] = load_segments(vid_id)
-                segments = seg_cache[vid_id]
-
-                mentions = video.get('mentions', [])
-                if not mentions or not segments:
+                    seg_cache[vid_id] = load_transcript(vid_id)
+                if not video.get('mentions') or not seg_cache[vid_id]:
                     continue
-
-                print(f'\n  [{video.get("display_title","?")}] → {verse_ref}')
-                for mention in mentions:
-                    total_mentions += 1
+                for mention in video['mentions']:
+                    total += 1
                     # Skip if already done
                     if mention.get('clip_start_ms') is not None:
                         skipped += 1
                         continue
+                    member = members.setdefault(vid_id, {}).setdefault(
+                        mention_key(verse_ref, mention),
+                        {'verse_ref': verse_ref, 'mention': mention, 'targets': [],
+                         'label': video.get('display_title', '?')})
+                    member['targets'].append(mention)
+    return {vid: list(by_key.values()) for vid, by_key in members.items()}, total, skipped
+
+
+def cluster_members(members: List[dict]) -> List[List[dict]]:
+    """
+    Interval-merge one video's members by mention time: each joins the
+    previous cluster if it is at most CLUSTER_GAP_MS after that cluster's
+    last mention, within CLUSTER_SPAN_MS of its first and the cluster has
+    room; otherwise it starts a new one.
+    """
+    clusters: List[List[dict]] = []
+    for member in sorted(members, key=lambda m: (m['mention'].get('timestamp_ms', 0), m['verse_ref'])):
+        t = member['mention'].get('timestamp_ms', 0)
+        if clusters:
+            cluster = clusters[-1]
+            if (t - cluster[-1]['mention'].get('timestamp_ms', 0) <= CLUSTER_GAP_MS
+                    and t - cluster[0]['mention'].get('timestamp_ms', 0) <= CLUSTER_SPAN_MS
+                    and len(cluster) < CLUSTER_MAX):
+                cluster.append(member)
+                continue
+        clusters.append([member])
+    return clusters
+
+
+def cluster_max_tokens(n: int) -> int:
+    return CLIP_MAX_TOKENS * n
+
+
+def build_cluster_prompt(members: List[dict], transcript: Transcript) -> Optional[str]:
+    """One prompt for several mentions of a video over a window covering all of them."""
+    first = members[0]['mention'].get('timestamp_ms', 0)
+    last = members[-1]['mention'].get('timestamp_ms', 0)
+    window = transcript.window((first + last) // 2, (last - first + 1) // 2 + WINDOW_MS)
+    if not window:
+        return None
+
+    seg_text = '\n'.join(
+        f'[{s["start"]}|{s["start_ms"]}ms] {s["text"]}' for s in window
+    )
+    spots = '\n'.join(
+        f'{nr}. BIBELVERS: {m["verse_ref"]} — LEHRSTELLE: {m["mention"].get("timestamp", "?")} — '
+        f'„{m["mention"].get("context", "")[:200]}" — KATEGORIE: {m["mention"].get("category", "?")}'
+        for nr, m in enumerate(members, 1)
+    )
+
+    prompt = f"""Du analysierst ein deutsches christliches Lehrvideo-Transkript.
+
+In diesem Ausschnitt liegen {len(members)} bekannte Lehrstellen. Finde für JEDE einen eigenen Clip.
 
-                    result = extract_clip(client, verse_ref, mention, segments)
-                    if result:
-                        mention['clip_start_ms'] = result['clip_start_ms']
-                        mention['clip_end_ms']   = result['clip_end_ms']
-                        mention['clip_title']     = result.get('clip_title', '')
-                        mention['clip_description'] = result.get('clip_description', '')
-                        dur = (result['clip_end_ms'] - result['clip_start_ms']) // 1000
-                        print(f'    ✅ {mention["timestamp"]} → '
-                              f'{ms_to_ts(result["clip_start_ms"])}–{ms_to_ts(result["clip_end_ms"])} '
-                              f'({dur}s) — {result.get("clip_title","?")}')
-                        enriched += 1
-                    else:
-                        print(f'    ⚠  {mention["timestamp"]} — no clip extracted')
-
-    with open(DB_PATH, 'w', encoding='utf-8') as f:
+LEHRSTELLEN:
+{spots}
+
+TRANSKRIPT-AUSSCHNITT (Format: [HH:MM:SS|ms] Text):
+{seg_text}
+
+Aufgabe für jede Lehrstelle:
+1. Finde den besten START-Zeitpunkt für einen Clip zu ihrem Vers (inkl. Einleitung/Setup, typisch 20–60 Sek. vor der Hauptaussage). Wähle einen Zeitpunkt aus dem Transkript.
+2. Finde den END-Zeitpunkt (wenn der Sprecher zum nächsten Thema übergeht). Wähle einen Zeitpunkt aus dem Transkript.
+3. Schreibe einen prägnanten deutschen Hook-Titel (max. 7 Wörter, keine Anführungszeichen).
+4. Schreibe eine deutsche Beschreibung (1 Satz, max. 20 Wörter), was der Zuschauer in diesem Clip lernt.
+
+Antworte NUR mit gültigem JSON, ein Eintrag pro Lehrstelle:
+{{
+  "clips": [
+    {{
+      "nr": <Nummer der Lehrstelle>,
+      "clip_start_ms": <Ganzzahl, ms aus dem Transkript>,
+      "clip_end_ms": <Ganzzahl, ms aus dem Transkript>,
+      "clip_title": "<Hook-Titel>",
+      "clip_description": "<Beschreibung>"
+    }}
+  ]
+}}"""
+    return prompt
+
+
+def resolve_locally(by_video: Dict[str, List[dict]], seg_cache: dict,
+                    min_confidence: float) -> List[Tuple[dict, dict]]:
+    """
+    Take the members whose local proposal reaches min_confidence out of
+    by_video; returns them with their clip.
+    """
+    resolved = []
+    for vid_id, members in by_video.items():
+        detector = BoundaryDetector(seg_cache[vid_id])
+        remaining = []
+        for member in members:
+            proposal = detector.propose(member['mention'].get('timestamp_ms', 0))
+            if proposal and proposal['confidence'] >= min_confidence:
+                resolved.append((member, proposal))
+            else:
+                remaining.append(member)
+        members[:] = remaining
+    return resolved
+
+
+def plan_requests(db: dict, seg_cache: dict, cluster: bool = True,
+                  min_confidence: Optional[float] = None
+                  ) -> Tuple[List[dict], List[Tuple[dict, dict]], dict]:
+    """
+    The requests main() sends for all pending mentions, as
+    {video_id, members, prompt, max_tokens} (prompt None: empty window), the
+    members resolved locally (only with min_confidence) and counts for the
+    report. A single-member request uses build_clip_prompt, so it is the
+    same request as without clustering.
+    """
+    by_video, total, skipped = pending_members(db, seg_cache)
+    pending = sum(len(m['targets']) for members in by_video.values() for m in members)
+    distinct = sum(len(members) for members in by_video.values())
+    local = resolve_locally(by_video, seg_cache, min_confidence) if min_confidence is not None else []
+    requests = []
+    for vid_id, members in by_video.items():
+        transcript = seg_cache[vid_id]
+        for group in (cluster_members(members) if cluster else [[m] for m in members]):
+            if len(group) == 1:
+                prompt = build_clip_prompt(group[0]['verse_ref'], group[0]['mention'], transcript)
+                max_tokens = CLIP_MAX_TOKENS
+            else:
+                prompt = build_cluster_prompt(group, transcript)
+                max_tokens = cluster_max_tokens(len(group))
+            requests.append({'video_id': vid_id, 'members': group,
+                             'prompt': prompt, 'max_tokens': max_tokens})
+    stats = {
+        'total': total,
+        'skipped': skipped,
+        'pending': pending,
+        'distinct': distinct,
+        'local': len(local),
+        'requests': sum(1 for r in requests if r['prompt'] is not None),
+    }
+    return requests, local, stats
+
+
+def collect_batch_requests(planned: List[dict]) -> list:
+    """One message-batch request per planned clip request."""
+    requests = []
+    for request in planned:
+        if request['prompt'] is None:
+            continue
+        key = cache_key(CLIP_MODEL, request['max_tokens'], request['prompt'])
+        first_ms = request['members'][0]['mention'].get('timestamp_ms', 0)
+        requests.append({
+            'custom_id': batch_custom_id(request['video_id'], first_ms, key[:12]),
+            'key': key,
+            'params': request_kwargs(CLIP_MODEL, request['max_tokens'], request['prompt']),
+        })
+    return requests
+
+
+def save_db(db: dict, path: Path = DB_PATH):
+    """Write the database atomically (temp file + rename), so a crash never leaves half a file."""
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
         json.dump(db, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """Saves the database every `every` completed mentions or `interval` seconds."""
+
+    def __init__(self, db: dict, every: int = CHECKPOINT_EVERY,
+                 interval: float = CHECKPOINT_INTERVAL, path: Path = DB_PATH):
+        self.db = db
+        self.every = max(1, every)
+        self.interval = interval
+        self.path = path
+        self.pending = 0
+        self.saves = 0
+        self._last_save = time.monotonic()
+
+    def tick(self):
+        self.pending += 1
+        if self.pending >= self.every or time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        save_db(self.db, self.path)
+        self.pending = 0
+        self.saves += 1
+        self._last_save = time.monotonic()
 
-    print(f'\n✅ Done: {enriched}/{total_mentions} mentions enriched '
-          f'({skipped} already had clips)')
-    print(f'💾 Saved to {DB_PATH}')
+
+def apply_clip(mention: dict, result: dict):
+    mention['clip_start_ms'] = result['clip_start_ms']
+    mention['clip_end_ms']   = result['clip_end_ms']
+    mention['clip_title']     = result.get('clip_title', '')
+    mention['clip_description'] = result.get('clip_description', '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clip-Grenzen, Titel und Beschreibungen per KI')
+    parser.add_argument('api_key', nargs='?', default=os.environ.get('ANTHROPIC_API_KEY'),
+                        help='Anthropic API key (default: $ANTHROPIC_API_KEY)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Submit all pending mentions as message batches first')
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help=f'Seconds between batch status checks (default: {POLL_INTERVAL:.0f})')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'Clip requests in flight at once (default: {WORKERS})')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f'Save the database after this many new clips (default: {CHECKPOINT_EVERY})')
+    parser.add_argument('--checkpoint-interval', type=float, default=CHECKPOINT_INTERVAL,
+                        help=f'... or after this many seconds (default: {CHECKPOINT_INTERVAL:.0f})')
+    parser.add_argument('--no-cluster', action='store_true',
+                        help='One request per mention instead of one per cluster of nearby mentions')
+    parser.add_argument('--local', action='store_true',
+                        help='Take confident clip boundaries from clip_boundaries instead of the model')
+    parser.add_argument('--min-confidence', type=float, default=LOCAL_MIN_CONFIDENCE,
+                        help=f'--local: minimum confidence of a local clip (default: {LOCAL_MIN_CONFIDENCE})')
+    parser.add_argument('--fake', action='store_true',
+                        help='Use the local stand-in client (fake_anthropic), no API requests')
+    args = parser.parse_args()
+
+    if not args.api_key and not args.fake:
+        print('Usage: python3 extract_clips.py <api_key> [--batch]')
+        sys.exit(1)
+
+    client = fake_anthropic.FakeAnthropic() if args.fake else anthropic.Anthropic(api_key=args.api_key)
+    async_client = (fake_anthropic.AsyncFakeAnthropic() if args.fake
+                    else anthropic.AsyncAnthropic(api_key=args.api_key, max_retries=0))
+
+    with open(DB_PATH) as f:
+        db = json.load(f)
+
+    # Cache transcripts per video_id to avoid re-loading
+    seg_cache: dict = {}
+
+    planned, local, counts = plan_requests(db, seg_cache, cluster=not args.no_cluster,
+                                           min_confidence=args.min_confidence if args.local else None)
+    print(f"🧮 {counts['pending']} Mentions offen ({counts['skipped']} haben schon Clips), "
+          f"{counts['distinct']} verschieden → {counts['requests']} Anfragen "
+          f"({counts['pending'] - counts['requests']} gespart ggü. einer pro Mention)")
+    if args.local:
+        print(f"📐 {counts['local']} Mentions lokal abgegrenzt "
+              f"(Konfidenz ≥ {args.min_confidence}), ohne KI-Anfrage")
+
+    if args.batch:
+        requests = collect_batch_requests(planned)
+        batch_counts = run_batch(client, requests, BATCH_STATE, 'clips', args.poll_interval,
+                                 validate=parse_answer)
+        print(f"📦 {batch_counts['succeeded']} Anfragen per Batch, {batch_counts['cached']} aus dem Cache, "
+              f"{batch_counts['duplicates']} doppelt, "
+              f"{batch_counts['failed']} fehlgeschlagen (werden direkt angefragt)")
+
+    # One scheduler job per video, one task per planned request
+    scheduler = WorkScheduler(args.workers, unit='Anfragen')
+    limiter = AdaptiveLimiter(args.workers)
+    checkpoint = Checkpoint(db, args.checkpoint_every, args.checkpoint_interval)
+    stats = {'enriched': 0, 'singles': 0}
+
+    def report(member: dict, result: dict):
+        mention = member['mention']
+        if not result:
+            print(f'    ⚠  [{member["label"]}] {member["verse_ref"]} {mention["timestamp"]} '
+                  f'— no clip extracted')
+            return
+        for target in member['targets']:
+            apply_clip(target, result)
+        dur = (result['clip_end_ms'] - result['clip_start_ms']) // 1000
+        title = (f'lokal, Konfidenz {result["confidence"]:.2f}' if 'confidence' in result
+                 else result.get('clip_title', '?'))
+        print(f'    ✅ [{member["label"]}] {member["verse_ref"]} {mention["timestamp"]} → '
+              f'{ms_to_ts(result["clip_start_ms"])}–{ms_to_ts(result["clip_end_ms"])} '
+              f'({dur}s) — {title}')
+        stats['enriched'] += len(member['targets'])
+        checkpoint.tick()
+
+    for member, result in local:
+        report(member, result)
+        for target in member['targets']:
+            target['clip_source'] = 'local'
+
+    def request_task(request: dict):
+        async def run():
+            members = request['members']
+            if len(members) == 1:
+                clips = {0: await extract_clip_async(async_client, limiter, request['prompt'])}
+            else:
+                clips = await extract_cluster_async(async_client, limiter, request['prompt'],
+                                                    len(members))
+                # Members the cluster answer missed: ask for them one by one
+                transcript = seg_cache[request['video_id']]
+                for idx, member in enumerate(members):
+                    if idx in clips:
+                        continue
+                    prompt = build_clip_prompt(member['verse_ref'], member['mention'], transcript)
+                    if prompt is not None:
+                        stats['singles'] += 1
+                        clips[idx] = await extract_clip_async(async_client, limiter, prompt)
+            for idx, member in enumerate(members):
+                report(member, clips.get(idx, {}))
+            return clips
+        return run
+
+    tasks_by_video: Dict[str, list] = {}
+    for request in planned:
+        if request['prompt'] is None:
+            for member in request['members']:
+                report(member, {})
+            continue
+        tasks_by_video.setdefault(request['video_id'], []).append(
+            (estimate_tokens(request['prompt']), request_task(request)))
+    for vid_id, tasks in tasks_by_video.items():
+        scheduler.add(vid_id, tasks, lambda results: None)
+
+    print(f"🎬 {counts['requests']} Anfragen — {args.workers} parallel")
+    try:
+        progress = asyncio.run(scheduler.run())
+        print(progress.line())
+    finally:
+        # Also on errors and Ctrl-C: keep every clip found so far
+        checkpoint.save()
+
+    print(f'\n✅ Done: {stats["enriched"]}/{counts["total"]} mentions enriched '
+          f'({counts["skipped"]} already had clips)')
+    if stats['singles']:
+        print(f'↩️  {stats["singles"]} Mentions nach unvollständiger Cluster-Antwort einzeln angefragt')
+    print(f'💾 Saved to {DB_PATH} ({checkpoint.saves} checkpoints)')
+    if limiter.rate_limited:
+        print(f'⏳ {limiter.rate_limited}x rate-limited, limit now {limiter.limit}')
+    print(default_cache().report())
 
 
 if __name__ == '__main__':
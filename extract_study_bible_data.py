@@ -18,10 +18,18 @@ EXTRACTION MODES:
 import json
 import re
 import os
+import hashlib
 from pathlib import Path
 from collections import defaultdict
 from typing import List, Dict, Tuple, Optional
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bible_refs import BOOK_IDS, ReferenceIndex, chapter_span
+from segment_store import store_path, write_store
+
+# Focus chapter of the MVP as a packed (start_id, end_id) range
+GENESIS_1 = chapter_span(BOOK_IDS['Genesis'], 1)
 
 # Bible reference patterns (German)
 VERSE_PATTERNS = [
@@ -74,6 +82,59 @@ TOPICS = [
     (r'[Ee]rlösung|[Rr]edemption', 'redemption'),
 ]
 
+# Lowercase literals that must appear in a line before the corresponding
+# pattern above can match. The matcher scans for all of them at once and only
+# runs the full regex for labels whose anchor was seen. Keep in sync with the
+# pattern tables — compile_matcher() refuses to build without an entry.
+MATCH_ANCHORS = {
+    # Verses
+    'Genesis': ('mose', 'genesis'),
+    'Psalm': ('psalm',),
+    'Exodus': ('mose', 'exodus'),
+    'Matthew': ('matthäus', 'matthew'),
+    'John': ('johannes', 'john'),
+    'Romans': ('römer', 'romans'),
+    '1 Corinthians': ('korinther', 'corinthians'),
+    '2 Corinthians': ('korinther', 'corinthians'),
+    'Galatians': ('galater', 'galatians'),
+    'Ephesians': ('epheser', 'ephesians'),
+    'Philippians': ('philipper', 'philippians'),
+    'Colossians': ('kolosser', 'colossians'),
+    'Hebrews': ('hebräer', 'hebrews'),
+    'James': ('jakobus', 'james'),
+    '1 Peter': ('petrus', 'peter'),
+    'Revelation': ('offenbarung', 'revelation'),
+    'Luke': ('lukas', 'luke'),
+    # Theological terms
+    'tohu_wabohu': ('wabohu',),
+    'rakia': ('rakia',),
+    'bara': ('bara',),
+    'elohim': ('elohim',),
+    'image_of_god': ('ebenbild',),
+    'trinity': ('dreieinig',),
+    # Topics
+    'creation': ('schöpfung', 'creation'),
+    'light': ('licht',),
+    'water': ('wasser',),
+    'atmosphere': ('atmosphäre',),
+    'time': ('zeit',),
+    'space': ('raum',),
+    'plants': ('pflanze',),
+    'animals': ('tier',),
+    'humanity': ('mensch',),
+    'marriage': ('ehe', 'marriage'),
+    'sabbath': ('sabbat',),
+    'sin': ('sünde',),
+    'redemption': ('erlösung', 'redemption'),
+}
+
+# Bump whenever process_transcript's output changes, so the manifest
+# invalidates every cached *_study_data.json on the next run
+EXTRACTOR_VERSION = 1
+MANIFEST_NAME = 'extract_manifest.json'
+
+TIMESTAMP_RE = re.compile(r'\[(\d{2}:\d{2}:\d{2})\]\s*(.*)')
+
 
 def parse_timestamp(ts_str: str) -> int:
     """Convert timestamp string to milliseconds."""
@@ -82,16 +143,81 @@ def parse_timestamp(ts_str: str) -> int:
     return (hours * 3600 + minutes * 60 + seconds) * 1000
 
 
+def compile_matcher() -> Dict:
+    """
+    Compile VERSE_PATTERNS, TOPICS and THEOLOGICAL_TERMS into one matcher.
+
+    A single alternation of every anchor literal is run over the casefolded
+    line; only the patterns whose anchor was seen are confirmed with their
+    own precompiled regex. One combined regex of the full patterns would be
+    slower: Python's re tries every alternative at every offset under
+    IGNORECASE.
+    """
+    entries = []  # (kind, compiled pattern, label) in table order
+    for kind, table in (('verse', VERSE_PATTERNS), ('topic', TOPICS),
+                        ('term', THEOLOGICAL_TERMS)):
+        for pattern, label in table:
+            if label not in MATCH_ANCHORS:
+                raise ValueError(f"No MATCH_ANCHORS entry for {label!r}")
+            entries.append((kind, re.compile(pattern, re.IGNORECASE), label))
+
+    anchor_entries = defaultdict(set)  # anchor -> {entry index}
+    for idx, (_, _, label) in enumerate(entries):
+        for anchor in MATCH_ANCHORS[label]:
+            anchor_entries[anchor.casefold()].add(idx)
+
+    # An anchor hit also implies every shorter anchor contained in it, which
+    # the prefilter would not report separately at the same offset
+    for anchor in anchor_entries:
+        for other in anchor_entries:
+            if other != anchor and other in anchor:
+                anchor_entries[anchor] |= anchor_entries[other]
+
+    anchors = sorted(anchor_entries, key=len, reverse=True)
+    return {
+        'prefilter': re.compile('|'.join(re.escape(a) for a in anchors)),
+        'anchor_entries': dict(anchor_entries),
+        'entries': entries,
+    }
+
+
+MATCHER = compile_matcher()
+
+
+def match_line(line: str, matcher: Dict = MATCHER) -> Tuple[List[Tuple[str, int, Optional[int]]], List[str], List[str]]:
+    """
+    Find all verse references, topics and theological terms in a line.
+
+    Returns (verses, topics, terms) in the same order the per-pattern loops
+    produced them: grouped by table order, verses by position within a book.
+    """
+    candidates = set()
+    anchor_entries = matcher['anchor_entries']
+    prefilter = matcher['prefilter']
+    folded = line.casefold()
+    # Restart one character after each hit so overlapping anchors are found
+    hit = prefilter.search(folded)
+    while hit:
+        candidates |= anchor_entries[hit.group()]
+        hit = prefilter.search(folded, hit.start() + 1)
+
+    verses, topics, terms = [], [], []
+    entries = matcher['entries']
+    for idx in sorted(candidates):
+        kind, regex, label = entries[idx]
+        if kind == 'verse':
+            for match in regex.finditer(line):
+                chapter = int(match.group(1))
+                verse = int(match.group(2)) if match.group(2) else None
+                verses.append((label, chapter, verse))
+        elif regex.search(line):
+            (topics if kind == 'topic' else terms).append(label)
+    return verses, topics, terms
+
+
 def extract_verses_from_line(line: str) -> List[Tuple[str, int, int]]:
     """Extract verse references from a line."""
-    verses = []
-    for pattern, book in VERSE_PATTERNS:
-        matches = re.finditer(pattern, line, re.IGNORECASE)
-        for match in matches:
-            chapter = int(match.group(1))
-            verse = int(match.group(2)) if match.group(2) else None
-            verses.append((book, chapter, verse))
-    return verses
+    return match_line(line)[0]
 
 
 def process_transcript(txt_path: Path, json_path: Path) -> Dict:
@@ -125,7 +251,7 @@ def process_transcript(txt_path: Path, json_path: Path) -> Dict:
     # Process each line
     for i, line in enumerate(lines):
         # Extract timestamp
-        ts_match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*(.*)', line)
+        ts_match = TIMESTAMP_RE.match(line)
         if not ts_match:
             continue
 
@@ -143,8 +269,8 @@ def process_transcript(txt_path: Path, json_path: Path) -> Dict:
             'terms': [],
         }
 
-        # Extract verse references
-        verses = extract_verses_from_line(text)
+        # Extract verse references, topics and terms in one pass
+        verses, topics, terms = match_line(text)
         for book, chapter, verse in verses:
             verse_ref = f"{book} {chapter}" + (f":{verse}" if verse else "")
             segment['verses'].append(verse_ref)
@@ -158,7 +284,7 @@ def process_transcript(txt_path: Path, json_path: Path) -> Dict:
             commentary_text = text
             for j in range(i+1, min(i+5, len(lines))):
                 next_line = lines[j]
-                next_ts_match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*(.*)', next_line)
+                next_ts_match = TIMESTAMP_RE.match(next_line)
                 if next_ts_match:
                     commentary_text += " " + next_ts_match.group(2).strip()
 
@@ -168,25 +294,21 @@ def process_transcript(txt_path: Path, json_path: Path) -> Dict:
                 'text': commentary_text[:500]  # Limit length
             })
 
-        # Extract topics
-        for pattern, topic in TOPICS:
-            if re.search(pattern, text, re.IGNORECASE):
-                segment['topics'].append(topic)
-                result['topics'][topic].append({
-                    'timestamp': timestamp,
-                    'timestamp_ms': timestamp_ms,
-                    'text': text[:200]
-                })
+        for topic in topics:
+            segment['topics'].append(topic)
+            result['topics'][topic].append({
+                'timestamp': timestamp,
+                'timestamp_ms': timestamp_ms,
+                'text': text[:200]
+            })
 
-        # Extract theological terms
-        for pattern, term in THEOLOGICAL_TERMS:
-            if re.search(pattern, text, re.IGNORECASE):
-                segment['terms'].append(term)
-                result['terms'][term].append({
-                    'timestamp': timestamp,
-                    'timestamp_ms': timestamp_ms,
-                    'text': text[:200]
-                })
+        for term in terms:
+            segment['terms'].append(term)
+            result['terms'][term].append({
+                'timestamp': timestamp,
+                'timestamp_ms': timestamp_ms,
+                'text': text[:200]
+            })
 
         # Detect questions
         if '?' in text and len(text.split()) > 5:
@@ -244,6 +366,107 @@ def build_topic_index(all_videos: List[Dict]) -> Dict:
     return dict(topic_index)
 
 
+def summarize_video(video_data: Dict) -> Dict:
+    """
+    Slim per-video summary: everything build_verse_index, build_topic_index
+    and main() need, without the segments and commentary excerpts.
+    """
+    return {
+        'video_id': video_data['video_id'],
+        'video_file': video_data['video_file'],
+        'title': video_data['title'],
+        'language': video_data['language'],
+        'total_segments': len(video_data['segments']),
+        'verse_mentions': video_data['verse_mentions'],
+        'topics': {
+            topic: [{'timestamp': occ['timestamp']} for occ in occurrences]
+            for topic, occurrences in video_data['topics'].items()
+        },
+    }
+
+
+def extract_video(txt_file: Path, output_dir: Path, mode: str = 'basic') -> Dict:
+    """
+    Process one transcript, write its *_study_data.json and return the summary.
+
+    Runs in pool workers with --workers, so the full video data never has to
+    travel back to (or stay resident in) the parent process.
+    """
+    video_data = process_transcript(txt_file, txt_file.with_suffix('.json'))
+
+    # Optional AI enhancement
+    video_data = enhance_with_ai(video_data, mode)
+
+    # Save individual video data
+    output_file = output_dir / f"{video_data['video_id']}_study_data.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(video_data, f, indent=2, ensure_ascii=False)
+    write_store(video_data['segments'], store_path(output_dir, video_data['video_id']))
+
+    return summarize_video(video_data)
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """SHA-256 of a file's bytes, or None if it does not exist."""
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> Dict:
+    """
+    Load the extraction manifest: per transcript the hashes of its .txt and
+    metadata .json, the mode, the output files they produced and the slim
+    summary of the result.
+    """
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('extractor_version') == EXTRACTOR_VERSION:
+                return manifest
+            print("  ♻️  Extractor version changed — reprocessing everything")
+        except (json.JSONDecodeError, OSError):
+            print("  ⚠️  Unreadable manifest — reprocessing everything")
+    return {'extractor_version': EXTRACTOR_VERSION, 'videos': {}}
+
+
+def save_manifest(manifest_path: Path, manifest: Dict):
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def input_fingerprint(txt_file: Path, mode: str) -> Dict:
+    return {
+        'txt_sha256': file_digest(txt_file),
+        'json_sha256': file_digest(txt_file.with_suffix('.json')),
+        'mode': mode,
+        'output': f"{txt_file.stem}_study_data.json",
+        'store': store_path(Path(), txt_file.stem).name,
+    }
+
+
+def load_cached_summary(output_dir: Path, entry: Optional[Dict], fingerprint: Dict) -> Optional[Dict]:
+    """
+    The summary recorded for unchanged inputs, or None if the video must be
+    processed again: inputs changed, no summary recorded, or an output file
+    is missing or the segment store is older than its *_study_data.json.
+    """
+    if not entry or any(entry.get(key) != value for key, value in fingerprint.items()):
+        return None
+    output_file = output_dir / entry['output']
+    store_file = output_dir / entry['store']
+    if not output_file.exists() or not store_file.exists():
+        return None
+    if store_file.stat().st_mtime < output_file.stat().st_mtime:
+        return None
+    return entry.get('summary')
+
+
 def enhance_with_ai(video_data: Dict, mode: str = 'basic') -> Dict:
     """
     Enhance extraction with AI for implicit references and better context.
@@ -270,6 +493,10 @@ def main():
     parser = argparse.ArgumentParser(description='Extract study Bible data from transcripts')
     parser.add_argument('--mode', choices=['basic', 'enhanced'], default='basic',
                        help='Extraction mode: basic (regex only) or enhanced (with AI)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Process transcripts in N worker processes (default: 1)')
+    parser.add_argument('--force', action='store_true',
+                       help='Ignore the manifest and reprocess every transcript')
     args = parser.parse_args()
 
     # Setup paths
@@ -281,25 +508,45 @@ def main():
     if args.mode == 'enhanced':
         print("  🤖 AI enhancement enabled (requires API key)")
 
-    # Process all transcripts
-    all_videos = []
-    for txt_file in sorted(transcript_dir.glob('*.txt')):
-        json_file = txt_file.with_suffix('.json')
-
-        print(f"  📹 Processing {txt_file.name}...")
-        video_data = process_transcript(txt_file, json_file)
-
-        # Optional AI enhancement
-        video_data = enhance_with_ai(video_data, args.mode)
-
-        # Save individual video data
-        output_file = output_dir / f"{video_data['video_id']}_study_data.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(video_data, f, indent=2, ensure_ascii=False)
-
-        all_videos.append(video_data)
-
-    print(f"\n✅ Processed {len(all_videos)} videos")
+    # Skip transcripts whose inputs are unchanged since the last run
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path) if not args.force else \
+        {'extractor_version': EXTRACTOR_VERSION, 'videos': {}}
+    txt_files = sorted(transcript_dir.glob('*.txt'))
+    fingerprints = [input_fingerprint(txt_file, args.mode) for txt_file in txt_files]
+
+    # Process all transcripts — only slim summaries are kept in memory
+    summaries = [None] * len(txt_files)
+    pending = []
+    for idx, (txt_file, fingerprint) in enumerate(zip(txt_files, fingerprints)):
+        summaries[idx] = load_cached_summary(output_dir, manifest['videos'].get(txt_file.name), fingerprint)
+        if summaries[idx] is None:
+            pending.append(idx)
+
+    print(f"  ♻️  {len(txt_files) - len(pending)} unchanged, {len(pending)} to process")
+
+    if args.workers > 1 and len(pending) > 1:
+        print(f"  ⚙️  Using {args.workers} worker processes")
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(extract_video, txt_files[idx], output_dir, args.mode): idx
+                       for idx in pending}
+            for future in as_completed(futures):
+                idx = futures[future]
+                summaries[idx] = future.result()
+                print(f"  📹 Processed {txt_files[idx].name}")
+    else:
+        for idx in pending:
+            print(f"  📹 Processing {txt_files[idx].name}...")
+            summaries[idx] = extract_video(txt_files[idx], output_dir, args.mode)
+
+    # Input order, not completion order, so the database is deterministic
+    all_videos = summaries
+
+    manifest['videos'] = {txt_file.name: {**fingerprint, 'summary': summary}
+                          for txt_file, fingerprint, summary in zip(txt_files, fingerprints, summaries)}
+    save_manifest(manifest_path, manifest)
+
+    print(f"\n✅ Processed {len(pending)} videos ({len(all_videos)} total)")
 
     # Build indices
     print("\n🏗️  Building indices...")
@@ -307,8 +554,10 @@ def main():
     verse_index = build_verse_index(all_videos)
     topic_index = build_topic_index(all_videos)
 
-    # Filter Genesis 1 specific data
-    genesis1_verses = {k: v for k, v in verse_index.items() if k.startswith('Genesis 1')}
+    # Filter Genesis 1 specific data (range-aware, so Genesis 10-19 stay out)
+    reference_index = ReferenceIndex.from_keys(verse_index)
+    genesis1_refs = reference_index.keys_in(*GENESIS_1)
+    genesis1_verses = {k: v for k, v in verse_index.items() if k in genesis1_refs}
 
     print(f"  📖 Found {len(genesis1_verses)} Genesis 1 verse references")
     print(f"  🏷️  Found {len(topic_index)} unique topics")
@@ -318,21 +567,21 @@ def main():
     for video in all_videos:
         verses = list(video['verse_mentions'].keys())
         # If video mentions Genesis 1, track what other verses it references
-        genesis1_verses_in_video = [v for v in verses if v.startswith('Genesis 1')]
-        other_verses = [v for v in verses if not v.startswith('Genesis 1')]
+        genesis1_verses_in_video = [v for v in verses if v in genesis1_refs]
+        other_verses = [v for v in verses if v not in genesis1_refs]
 
         for gen_verse in genesis1_verses_in_video:
             cross_refs[gen_verse].update(other_verses)
 
-    # Convert sets to lists for JSON
-    cross_refs = {k: list(v) for k, v in cross_refs.items()}
+    # Convert sets to sorted lists for JSON (set order varies between runs)
+    cross_refs = {k: sorted(v) for k, v in cross_refs.items()}
 
     # Compile final database
     database = {
         'metadata': {
             'total_videos': len(all_videos),
             'genesis1_videos': len([v for v in all_videos if any(
-                ref.startswith('Genesis 1') for ref in v['verse_mentions'].keys()
+                ref in genesis1_refs for ref in v['verse_mentions'].keys()
             )]),
             'generated_at': 'DATE_PLACEHOLDER',
             'focus_chapter': 'Genesis 1'
@@ -349,9 +598,9 @@ def main():
                 'video_file': v['video_file'],
                 'title': v['title'],
                 'language': v['language'],
-                'total_segments': len(v['segments']),
+                'total_segments': v['total_segments'],
                 'verse_count': len(v['verse_mentions']),
-                'genesis1_coverage': [k for k in v['verse_mentions'].keys() if k.startswith('Genesis 1')]
+                'genesis1_coverage': [k for k in v['verse_mentions'].keys() if k in genesis1_refs]
             }
             for v in all_videos
         ]
@@ -366,7 +615,7 @@ def main():
     # Print summary
     print("\n📊 Summary:")
     print(f"  Total videos: {len(all_videos)}")
-    print(f"  Videos mentioning Genesis 1: {len([v for v in all_videos if any(ref.startswith('Genesis 1') for ref in v['verse_mentions'].keys())])}")
+    print(f"  Videos mentioning Genesis 1: {database['metadata']['genesis1_videos']}")
     print(f"  Total verse references: {len(verse_index)}")
     print(f"  Genesis 1 verse references: {len(genesis1_verses)}")
     print(f"  Topics identified: {len(topic_index)}")
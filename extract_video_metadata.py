@@ -3,29 +3,52 @@
 Extract speaker name and series info for each video using Claude AI.
 Reads transcript openings, asks Claude to identify speaker + series.
 Updates study_bible_database.json with 'speaker' and 'series' fields.
+
+The openings of up to --videos-per-request videos share one request that
+answers with a JSON array keyed by the number each video has in the prompt.
+Every entry is validated on its own; videos whose entry is missing or
+malformed are re-queued into the next round, whose requests hold half as
+many videos (so a cached bad answer is never just fetched again). After
+METADATA_ROUNDS rounds, or once halving no longer changes the request size,
+the rest is asked for singly with the per-video prompt, whose answer is
+validated the same way. --videos-per-request 1 sends one request per video.
 """
 
+import argparse
 import json
 import re
 import os
 import sys
 import glob
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import anthropic
 
+import fake_anthropic
+from llm_cache import default_cache
+from segment_store import open_store
+from transcript import Transcript
+
 DB_PATH = Path('video-study-bible-mvp/public/study_bible_data/study_bible_database.json')
 DATA_DIR = Path('study_bible_data')
+METADATA_MODEL = 'claude-haiku-4-5-20251001'
+METADATA_MAX_TOKENS = 200         # per video, single and batched
+VIDEOS_PER_REQUEST = 25
+METADATA_ROUNDS = 3               # batched rounds before leftovers are asked for singly
+METADATA_FIELDS = ('speaker', 'series', 'episode', 'organization')
 
 
 def get_transcript_opening(video_id: str, max_chars: int = 600) -> str:
     """Get the opening of the transcript for a video."""
+    store = open_store(DATA_DIR, video_id)
+    if store is not None:
+        text = ' '.join(store.text(i) for i in range(min(20, len(store))))
+        return text[:max_chars]
     for pattern in [f'{video_id}_parsed.json', f'{video_id}_enhanced.json', f'{video_id}_study_data.json']:
         path = DATA_DIR / pattern
         if path.exists():
-            with open(path) as f:
-                d = json.load(f)
-            segs = d.get('segments', [])
-            text = ' '.join(s.get('text', '') for s in segs[:20])
+            opening = Transcript.load(path).after(0, 20)
+            text = ' '.join(s.get('text', '') for s in opening)
             return text[:max_chars]
     return ''
 
@@ -54,28 +77,159 @@ Antworte NUR mit JSON, kein anderer Text:
 Falls du dir nicht sicher bist, setze null. Keine Vermutungen."""
 
     try:
-        msg = client.messages.create(
-            model='claude-haiku-4-5-20251001',
-            max_tokens=200,
-            temperature=0,
-            messages=[{'role': 'user', 'content': prompt}]
-        )
-        text = msg.content[0].text.strip()
-        # Strip markdown code blocks if present
-        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text, flags=re.MULTILINE).strip()
-        return json.loads(text)
+        text = default_cache().create(client, model=METADATA_MODEL,
+                                      max_tokens=METADATA_MAX_TOKENS, prompt=prompt,
+                                      stage='metadata', validate=parse_metadata)
+        return parse_metadata(text)
+    except Exception as e:
+        print(f'    AI error: {e}')
+        return {}
+
+
+def build_batch_prompt(items: List[Tuple[str, str]]) -> str:
+    """One prompt for several (display_title, opening) pairs, numbered from 1."""
+    videos = '\n\n'.join(
+        f'VIDEO {nr}\nVideotitel: {display_title}\nTranscript-Anfang: {opening}'
+        for nr, (display_title, opening) in enumerate(items, 1)
+    )
+    return f"""Du analysierst {len(items)} deutsche christliche Lehrvideos.
+
+{videos}
+
+Bitte identifiziere für JEDES Video:
+1. Den Namen des Sprechers/Predigers (falls genannt oder erkennbar)
+2. Den Namen der Sendungsreihe/Serie (falls erkennbar)
+3. Die Episodennummer (falls vorhanden)
+4. Den Namen der Gemeinde/Organisation (falls genannt)
+
+Antworte NUR mit einem JSON-Array, ein Eintrag pro Video, kein anderer Text:
+[
+  {{
+    "nr": <Nummer des Videos>,
+    "speaker": "Name des Sprechers oder null",
+    "series": "Name der Serie oder null",
+    "episode": "Episodennummer oder null",
+    "organization": "Gemeinde/Organisation oder null"
+  }}
+]
+
+Falls du dir nicht sicher bist, setze null. Keine Vermutungen."""
+
+
+def validate_metadata(entry) -> Optional[dict]:
+    """The four fields of one answer entry (null, a string or an episode number), else None."""
+    if not isinstance(entry, dict) or any(field not in entry for field in METADATA_FIELDS):
+        return None
+    meta = {}
+    for field in METADATA_FIELDS:
+        value = entry[field]
+        if isinstance(value, str):
+            value = value.strip()
+            if value.lower() in ('', 'null', 'none'):
+                value = None
+        elif value is not None and not (field == 'episode' and type(value) is int):
+            return None
+        meta[field] = value
+    return meta
+
+
+def parse_metadata(text: str) -> dict:
+    """The metadata of a single-video answer; ValueError if it is malformed."""
+    # Strip markdown code blocks if present
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip(), flags=re.MULTILINE).strip()
+    meta = validate_metadata(json.loads(text))
+    if meta is None:
+        raise ValueError(f'invalid metadata: {text[:80]}')
+    return meta
+
+
+def parse_batch(text: str, n: int) -> Dict[int, dict]:
+    """Item index -> metadata for every valid entry of a batched answer."""
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip(), flags=re.MULTILINE).strip()
+    entries = json.loads(text)
+    if not isinstance(entries, list):
+        raise ValueError('answer is not a JSON array')
+    results = {}
+    for entry in entries:
+        try:
+            idx = int(entry.get('nr')) - 1
+        except (AttributeError, TypeError, ValueError):
+            continue
+        meta = validate_metadata(entry)
+        if 0 <= idx < n and idx not in results and meta is not None:
+            results[idx] = meta
+    return results
+
+
+def extract_metadata_batch(client: anthropic.Anthropic, items: List[Tuple[str, str]]) -> Dict[int, dict]:
+    """Metadata for several (display_title, opening) pairs in one request; invalid entries left out."""
+    try:
+        text = default_cache().create(client, model=METADATA_MODEL,
+                                      max_tokens=METADATA_MAX_TOKENS * len(items),
+                                      prompt=build_batch_prompt(items), stage='metadata',
+                                      validate=lambda answer: parse_batch(answer, len(items)))
+        return parse_batch(text, len(items))
     except Exception as e:
         print(f'    AI error: {e}')
         return {}
 
 
+def extract_metadata_batched(client: anthropic.Anthropic, videos: List[Tuple[str, str, str]],
+                             per_request: int = VIDEOS_PER_REQUEST,
+                             rounds: int = METADATA_ROUNDS) -> Tuple[Dict[str, dict], Dict[str, int]]:
+    """
+    Metadata per video_id for (video_id, display_title, opening) triples,
+    per_request videos per request. Videos without a valid entry go back in
+    the queue for the next round, with half as many videos per request;
+    whatever is left after `rounds` rounds, or after a round of single-video
+    requests (halving would just repeat it), is asked for singly.
+    Returns the metadata and request counts.
+    """
+    metadata: Dict[str, dict] = {}
+    counts = {'batched': 0, 'requeued': 0, 'single': 0}
+    queue = list(videos)
+    size = max(1, per_request)
+    for _ in range(rounds):
+        if not queue:
+            break
+        retry = []
+        for start in range(0, len(queue), size):
+            chunk = queue[start:start + size]
+            results = extract_metadata_batch(client, [(title, opening) for _, title, opening in chunk])
+            counts['batched'] += 1
+            for idx, (vid_id, title, opening) in enumerate(chunk):
+                if idx in results:
+                    metadata[vid_id] = results[idx]
+                else:
+                    retry.append((vid_id, title, opening))
+        counts['requeued'] += len(retry)
+        queue = retry
+        if size == 1:
+            break
+        size //= 2
+
+    for vid_id, title, opening in queue:
+        metadata[vid_id] = extract_metadata_with_ai(client, vid_id, title, opening)
+        counts['single'] += 1
+    return metadata, counts
+
+
 def main():
-    api_key = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('ANTHROPIC_API_KEY')
-    if not api_key:
-        print('Usage: python3 extract_video_metadata.py [api_key]')
+    parser = argparse.ArgumentParser(description='Sprecher/Serie pro Video per KI')
+    parser.add_argument('api_key', nargs='?', default=os.environ.get('ANTHROPIC_API_KEY'),
+                        help='Anthropic API key (default: $ANTHROPIC_API_KEY)')
+    parser.add_argument('--videos-per-request', type=int, default=VIDEOS_PER_REQUEST,
+                        help=f'Video openings packed into one request (default: {VIDEOS_PER_REQUEST}; '
+                             f'1 = one request per video)')
+    parser.add_argument('--fake', action='store_true',
+                        help='Use the local stand-in client (fake_anthropic), no API requests')
+    args = parser.parse_args()
+
+    if not args.api_key and not args.fake:
+        print('Usage: python3 extract_video_metadata.py [api_key] [--videos-per-request N]')
         sys.exit(1)
 
-    client = anthropic.Anthropic(api_key=api_key)
+    client = fake_anthropic.FakeAnthropic() if args.fake else anthropic.Anthropic(api_key=args.api_key)
 
     with open(DB_PATH) as f:
         db = json.load(f)
@@ -95,19 +249,29 @@ def main():
 
     # Extract metadata for each unique video
     metadata_by_id = {}
+    pending = []
     for video in all_videos:
         vid_id = video['video_id']
-        display_title = video.get('display_title', vid_id)
-        print(f'  [{vid_id[:40]}]')
-
         opening = get_transcript_opening(vid_id)
         if not opening:
+            print(f'  [{vid_id[:40]}]')
             print(f'    No transcript found, skipping')
             metadata_by_id[vid_id] = {}
             continue
+        pending.append((vid_id, video.get('display_title', vid_id), opening))
 
-        meta = extract_metadata_with_ai(client, vid_id, display_title, opening)
-        metadata_by_id[vid_id] = meta
+    if args.videos_per_request > 1:
+        found, counts = extract_metadata_batched(client, pending, args.videos_per_request)
+        metadata_by_id.update(found)
+        print(f"📦 {len(pending)} Videos in {counts['batched']} Anfragen "
+              f"({counts['requeued']} erneut eingereiht, {counts['single']} einzeln angefragt)")
+    else:
+        for vid_id, display_title, opening in pending:
+            metadata_by_id[vid_id] = extract_metadata_with_ai(client, vid_id, display_title, opening)
+
+    for vid_id, _, _ in pending:
+        meta = metadata_by_id[vid_id]
+        print(f'  [{vid_id[:40]}]')
         print(f'    speaker={meta.get("speaker")!r}, series={meta.get("series")!r}, org={meta.get("organization")!r}')
 
     print(f'\nUpdating database...')
@@ -134,6 +298,7 @@ def main():
 
     print(f'✅ Done — {patched} video entries updated')
     print(f'💾 Saved to {DB_PATH}')
+    print(default_cache().report())
 
 
 if __name__ == '__main__':
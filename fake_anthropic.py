@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the anthropic client the AI stages use.
+
+FakeAnthropic / AsyncFakeAnthropic expose messages.create with the same
+keyword arguments as the real clients, record every request in `.requests`
+and answer with canned JSON, so prompt structure, caching and concurrency
+can be exercised without network access or API costs.
+
+Usage reporting mimics provider-side prompt caching: a system block marked
+with cache_control is written to the cache on first sight and read from it
+afterwards — but only if it reaches `min_cacheable_tokens`, as with the real
+API (1024 tokens for Sonnet, 2048 for Haiku).
+
+messages.batches is a fake batch server: submitted batches are kept as JSON
+files in `batch_dir` (so a new process can resume polling them), report
+"ended" once `batch_latency` seconds have passed and then yield one result
+per request; `batch_error_rate` of them come back as errored. Defaults for
+the directory and latency come from FAKE_BATCH_DIR / FAKE_BATCH_LATENCY.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def default_response(request: Dict) -> str:
+    """Empty but well-formed answer for whichever stage sent the request."""
+    system = ''.join(block.get('text', '') for block in request.get('system', []))
+    if '"sections"' in system:
+        return '{"sections": []}'
+    return '{}'
+
+
+class Usage:
+    def __init__(self, input_tokens: int, output_tokens: int,
+                 cache_creation_input_tokens: int = 0, cache_read_input_tokens: int = 0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_creation_input_tokens = cache_creation_input_tokens
+        self.cache_read_input_tokens = cache_read_input_tokens
+
+
+class TextBlock:
+    type = 'text'
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Message:
+    def __init__(self, text: str, usage: Usage, model: str):
+        self.content = [TextBlock(text)]
+        self.usage = usage
+        self.model = model
+        self.stop_reason = 'end_turn'
+
+
+class RequestCounts:
+    def __init__(self, processing: int, succeeded: int, errored: int):
+        self.processing = processing
+        self.succeeded = succeeded
+        self.errored = errored
+        self.canceled = 0
+        self.expired = 0
+
+
+class MessageBatch:
+    def __init__(self, batch_id: str, processing_status: str, request_counts: RequestCounts):
+        self.id = batch_id
+        self.processing_status = processing_status
+        self.request_counts = request_counts
+
+
+class BatchResult:
+    def __init__(self, result_type: str, message: Optional[Message] = None):
+        self.type = result_type
+        self.message = message
+
+
+class BatchResponse:
+    def __init__(self, custom_id: str, result: BatchResult):
+        self.custom_id = custom_id
+        self.result = result
+
+
+class _Batches:
+    def __init__(self, client: 'FakeAnthropic'):
+        self._client = client
+
+    def _path(self, batch_id: str) -> Path:
+        return self._client.batch_dir / f"{batch_id}.json"
+
+    def _load(self, batch_id: str) -> Dict:
+        with open(self._path(batch_id), encoding='utf-8') as f:
+            return json.load(f)
+
+    def _status(self, batch: Dict) -> MessageBatch:
+        ended = time.time() - batch['created_at'] >= self._client.batch_latency
+        total = len(batch['requests'])
+        errored = len(batch['errored']) if ended else 0
+        return MessageBatch(batch['id'], 'ended' if ended else 'in_progress',
+                            RequestCounts(0 if ended else total,
+                                          total - errored if ended else 0, errored))
+
+    def create(self, requests: List[Dict]) -> MessageBatch:
+        client = self._client
+        client.batch_dir.mkdir(parents=True, exist_ok=True)
+        batch = {
+            'id': f"msgbatch_fake_{uuid.uuid4().hex[:16]}",
+            'created_at': time.time(),
+            'requests': requests,
+            'errored': [r['custom_id'] for r in requests
+                        if random.random() < client.batch_error_rate],
+        }
+        with open(self._path(batch['id']), 'w', encoding='utf-8') as f:
+            json.dump(batch, f, ensure_ascii=False)
+        client.batches_created.append(batch['id'])
+        return self._status(batch)
+
+    def retrieve(self, batch_id: str) -> MessageBatch:
+        return self._status(self._load(batch_id))
+
+    def results(self, batch_id: str):
+        batch = self._load(batch_id)
+        if self._status(batch).processing_status != 'ended':
+            raise RuntimeError(f"batch {batch_id} has not ended")
+        errored = set(batch['errored'])
+        for request in batch['requests']:
+            if request['custom_id'] in errored:
+                yield BatchResponse(request['custom_id'], BatchResult('errored'))
+            else:
+                message = self._client._respond(request['params'])
+                yield BatchResponse(request['custom_id'], BatchResult('succeeded', message))
+
+
+class _Messages:
+    def __init__(self, client: 'FakeAnthropic'):
+        self._client = client
+        self.batches = _Batches(client)
+
+    def create(self, **kwargs) -> Message:
+        return self._client._respond(kwargs)
+
+
+class _AsyncMessages(_Messages):
+    async def create(self, **kwargs) -> Message:
+        await asyncio.sleep(self._client.latency)
+        return self._client._respond(kwargs)
+
+
+class FakeAnthropic:
+    """Synchronous stand-in for anthropic.Anthropic."""
+
+    def __init__(self, responder: Optional[Callable[[Dict], str]] = None,
+                 min_cacheable_tokens: int = 1024, latency: float = 0.0,
+                 batch_dir: Path = Path(os.environ.get('FAKE_BATCH_DIR', '.fake_batches')),
+                 batch_latency: float = float(os.environ.get('FAKE_BATCH_LATENCY', '0')),
+                 batch_error_rate: float = 0.0, **_ignored):
+        self.responder = responder or default_response
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.latency = latency
+        self.batch_dir = Path(batch_dir)
+        self.batch_latency = batch_latency
+        self.batch_error_rate = batch_error_rate
+        self.batches_created: List[str] = []
+        self.requests: List[Dict] = []
+        self._cached_prefixes = set()
+        self.messages = _Messages(self)
+
+    def _usage(self, request: Dict, text: str) -> Usage:
+        uncached = sum(estimate_tokens(m['content']) for m in request['messages'])
+        created = read = 0
+        for block in request.get('system', []):
+            tokens = estimate_tokens(block['text'])
+            if 'cache_control' not in block or tokens < self.min_cacheable_tokens:
+                uncached += tokens
+            elif block['text'] in self._cached_prefixes:
+                read += tokens
+            else:
+                self._cached_prefixes.add(block['text'])
+                created += tokens
+        return Usage(uncached, estimate_tokens(text), created, read)
+
+    def _respond(self, request: Dict) -> Message:
+        self.requests.append(request)
+        text = self.responder(request)
+        return Message(text, self._usage(request, text), request['model'])
+
+
+class AsyncFakeAnthropic(FakeAnthropic):
+    """Asynchronous stand-in for anthropic.AsyncAnthropic."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.messages = _AsyncMessages(self)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Keyframe index per video, so clips start where the player can seek exactly.
+
+A browser seeking an mp4 to clip_start_ms has to decode from the preceding
+sync sample (keyframe) on; the gap costs start-up time and the player
+overshoots or lands early. This module reads the sample tables of each local
+mp4 in pure Python — no ffprobe — and keeps for every keyframe of the video
+track its presentation time and the byte offset of its sample:
+
+  moov/trak (handler "vide") /mdia/mdhd   timescale
+                           /minf/stbl   stss  sync samples (absent: all are)
+                                        stts  decode-time deltas
+                                        ctts  composition offsets (optional)
+                                        stsc, stsz, stco/co64  sample → byte offset
+  moov/trak/edts/elst                   media time of the first edit
+
+Only the moov box is read (it may come after mdat; the file is skipped over
+box by box). <video>_keyframes.bin stores the index compactly:
+
+  header    magic, version, keyframe count
+  time_ms   uint32[N]   presentation time, rounded down
+  offset    uint64[N]   byte offset of the keyframe sample in the mp4
+
+and is rebuilt when the mp4 is newer. The command annotates every clip in
+the database with the keyframe at or before its start (clip_keyframe_ms,
+clip_keyframe_offset); --snap also moves clip_start_ms onto it.
+
+Usage: python3 keyframe_index.py [--video-dir DIR] [--data-dir DIR] [--snap] [--force]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DB_PATH = Path('video-study-bible-mvp/public/study_bible_data/study_bible_database.json')
+DATA_DIR = Path('study_bible_data')
+VIDEO_DIR = Path('video-study-bible-mvp/public/bibelthek_videos/videos')
+MAGIC = b'KEY1'
+HEADER = struct.Struct('<4sHHI')   # magic, version, reserved, keyframe count
+VERSION = 1
+SUFFIX = '_keyframes.bin'
+
+if sys.byteorder != 'little':
+    raise ImportError('keyframe_index writes little-endian arrays directly')
+
+Box = Tuple[bytes, int, int]   # type, payload start, payload end
+
+
+def iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Box]:
+    """The boxes directly inside data[start:end]."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size, = struct.unpack_from('>Q', data, pos + 8)
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise ValueError(f'broken {kind!r} box at {pos}')
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def find_box(data: bytes, path: str, start: int = 0, end: Optional[int] = None) -> Optional[Box]:
+    """First box along a slash-separated path of box types, e.g. 'mdia/minf/stbl'."""
+    box = None
+    for kind in path.split('/'):
+        box = next((b for b in iter_boxes(data, start, end) if b[0] == kind.encode()), None)
+        if box is None:
+            return None
+        start, end = box[1], box[2]
+    return box
+
+
+def read_moov(path: Path) -> bytes:
+    """The payload of an mp4's moov box, skipping every other top-level box."""
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        pos = 0
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            size, kind = struct.unpack('>I4s', f.read(8))
+            header = 8
+            if size == 1:
+                size, = struct.unpack('>Q', f.read(8))
+                header = 16
+            elif size == 0:
+                size = file_size - pos
+            if size < header:
+                break
+            if kind == b'moov':
+                f.seek(pos + header)
+                return f.read(size - header)
+            pos += size
+    raise ValueError(f'{path}: no moov box')
+
+
+def full_box(data: bytes, box: Box) -> Tuple[int, int]:
+    """(version, payload start after version/flags) of a full box."""
+    return data[box[1]], box[1] + 4
+
+
+def read_table(data: bytes, box: Optional[Box], fmt: str) -> List[tuple]:
+    """Entries of a counted sample table (stts, ctts, stsc, stss, stco, co64)."""
+    if box is None:
+        return []
+    _, pos = full_box(data, box)
+    count, = struct.unpack_from('>I', data, pos)
+    entry = struct.Struct('>' + fmt)
+    return list(entry.iter_unpack(data[pos + 4:pos + 4 + count * entry.size]))
+
+
+def video_track(moov: bytes) -> Optional[Box]:
+    for trak in iter_boxes(moov):
+        if trak[0] != b'trak':
+            continue
+        hdlr = find_box(moov, 'mdia/hdlr', trak[1], trak[2])
+        if hdlr and moov[hdlr[1] + 8:hdlr[1] + 12] == b'vide':
+            return trak
+    return None
+
+
+def scan_keyframes(path: Path) -> List[Tuple[int, int]]:
+    """(presentation ms, byte offset) of every sync sample of the video track, in order."""
+    moov = read_moov(path)
+    trak = video_track(moov)
+    if trak is None:
+        raise ValueError(f'{path}: no video track')
+    mdhd = find_box(moov, 'mdia/mdhd', trak[1], trak[2])
+    stbl = find_box(moov, 'mdia/minf/stbl', trak[1], trak[2])
+    if mdhd is None or stbl is None:
+        raise ValueError(f'{path}: video track without mdhd/stbl')
+    version, pos = full_box(moov, mdhd)
+    timescale, = struct.unpack_from('>I', moov, pos + (16 if version == 1 else 8))
+
+    tables = {kind: (kind, start, end) for kind, start, end in iter_boxes(moov, stbl[1], stbl[2])}
+    if b'stsz' not in tables:
+        raise ValueError(f'{path}: no sample sizes (stsz)')
+    stts = read_table(moov, tables.get(b'stts'), 'II')
+    ctts_box = tables.get(b'ctts')
+    ctts = read_table(moov, ctts_box, 'Ii' if ctts_box and full_box(moov, ctts_box)[0] == 1 else 'II')
+    stsc = read_table(moov, tables.get(b'stsc'), 'III')
+    chunk_offsets = [o for o, in (read_table(moov, tables[b'co64'], 'Q') if b'co64' in tables
+                                  else read_table(moov, tables.get(b'stco'), 'I'))]
+    _, pos = full_box(moov, tables[b'stsz'])
+    uniform_size, sample_count = struct.unpack_from('>II', moov, pos)
+    sizes = (array('I', [uniform_size]) * sample_count if uniform_size
+             else array('I', struct.unpack_from(f'>{sample_count}I', moov, pos + 8)))
+    # No stss: every sample is a sync sample
+    sync = ({n for n, in read_table(moov, tables[b'stss'], 'I')} if b'stss' in tables
+            else set(range(1, sample_count + 1)))
+
+    # Presentation starts at the first edit's media time (e.g. the ctts shift)
+    media_start = 0
+    elst = find_box(moov, 'edts/elst', trak[1], trak[2])
+    if elst:
+        version, pos = full_box(moov, elst)
+        for _ in range(struct.unpack_from('>I', moov, pos)[0]):
+            if version == 1:
+                media_time = struct.unpack_from('>q', moov, pos + 12)[0]
+                pos += 20
+            else:
+                media_time = struct.unpack_from('>i', moov, pos + 8)[0]
+                pos += 12
+            if media_time >= 0:   # -1 marks an empty edit
+                media_start = media_time
+                break
+
+    def expand(runs):
+        for count, value in runs:
+            for _ in range(count):
+                yield value
+
+    deltas, offsets = expand(stts), expand(ctts)
+    keyframes = []
+    sample = 1
+    decode_time = 0
+    for i, (first_chunk, per_chunk, _) in enumerate(stsc):
+        last_chunk = stsc[i + 1][0] - 1 if i + 1 < len(stsc) else len(chunk_offsets)
+        for chunk in range(first_chunk, last_chunk + 1):
+            offset = chunk_offsets[chunk - 1]
+            for _ in range(per_chunk):
+                if sample > sample_count:
+                    break
+                composition = next(offsets, 0)
+                if sample in sync:
+                    pts = max(0, decode_time + composition - media_start)
+                    keyframes.append((pts * 1000 // timescale, offset))
+                offset += sizes[sample - 1]
+                decode_time += next(deltas, 0)
+                sample += 1
+    keyframes.sort()
+    return keyframes
+
+
+def index_path(data_dir: Path, video_id: str) -> Path:
+    return data_dir / f"{video_id}{SUFFIX}"
+
+
+def write_index(keyframes: List[Tuple[int, int]], path: Path):
+    """Write the keyframe index; atomic via a temp file."""
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(keyframes)))
+        f.write(array('I', (ms for ms, _ in keyframes)).tobytes())
+        f.write(array('Q', (offset for _, offset in keyframes)).tobytes())
+    os.replace(tmp, path)
+
+
+class KeyframeIndex:
+    """Keyframe times and byte offsets of one video, with lookups by clip start."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        data = self.path.read_bytes()
+        magic, version, _, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: not a version {VERSION} keyframe index")
+        pos = HEADER.size
+        self.time_ms = array('I', data[pos:pos + 4 * count])
+        self.offsets = array('Q', data[pos + 4 * count:pos + 12 * count])
+
+    def __len__(self) -> int:
+        return len(self.time_ms)
+
+    def before(self, ms: int) -> Optional[Tuple[int, int]]:
+        """(time ms, byte offset) of the last keyframe at or before ms."""
+        idx = bisect_right(self.time_ms, ms) - 1
+        return (self.time_ms[idx], self.offsets[idx]) if idx >= 0 else None
+
+
+def open_index(data_dir: Path, video_id: str, video_path: Path,
+               force: bool = False) -> Optional[KeyframeIndex]:
+    """The video's keyframe index, (re)built from the mp4 when missing or older; None without mp4."""
+    path = index_path(data_dir, video_id)
+    if not video_path.exists():
+        return KeyframeIndex(path) if path.exists() else None
+    if force or not path.exists() or video_path.stat().st_mtime > path.stat().st_mtime:
+        write_index(scan_keyframes(video_path), path)
+    return KeyframeIndex(path)
+
+
+def annotate_clips(db: Dict, indexes: Dict[str, KeyframeIndex], snap: bool = False) -> int:
+    """Add the preceding keyframe to every clip of an indexed video; returns clips annotated."""
+    annotated = 0
+    for section in db.get('verses', {}).values():
+        for videos in section.values():
+            for video in videos:
+                index = indexes.get(video.get('video_id', ''))
+                if index is None:
+                    continue
+                for mention in video.get('mentions', []):
+                    start = mention.get('clip_start_ms')
+                    keyframe = index.before(start) if start is not None else None
+                    if keyframe is None:
+                        continue
+                    mention['clip_keyframe_ms'], mention['clip_keyframe_offset'] = keyframe
+                    if snap:
+                        mention['clip_start_ms'] = keyframe[0]
+                    annotated += 1
+    return annotated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keyframe indexes for the videos, keyframes for every clip')
+    parser.add_argument('--video-dir', type=Path, default=VIDEO_DIR, help='Directory with the mp4 files')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='Where the indexes are kept')
+    parser.add_argument('--snap', action='store_true',
+                        help='Move clip_start_ms onto the keyframe instead of only annotating it')
+    parser.add_argument('--force', action='store_true', help='Rebuild indexes that are up to date')
+    args = parser.parse_args()
+
+    with open(DB_PATH, encoding='utf-8') as f:
+        db = json.load(f)
+
+    indexes = {}
+    videos = {video['video_id']: video.get('video_file') or f"{video['video_id']}.mp4"
+              for section in db.get('verses', {}).values()
+              for entries in section.values() for video in entries if video.get('video_id')}
+    for video_id, video_file in sorted(videos.items()):
+        try:
+            index = open_index(args.data_dir, video_id, args.video_dir / video_file, args.force)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"   ⚠️  {video_file}: {e}")
+            continue
+        if index is not None:
+            indexes[video_id] = index
+    print(f"🎞️  {len(indexes)}/{len(videos)} Videos indiziert "
+          f"({sum(len(index) for index in indexes.values())} Keyframes)")
+
+    annotated = annotate_clips(db, indexes, args.snap)
+    tmp = DB_PATH.with_name(DB_PATH.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(db, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, DB_PATH)
+    print(f"✅ {annotated} Clips {'auf Keyframes verschoben' if args.snap else 'mit Keyframe annotiert'}")
+
+
+if __name__ == '__main__':
+    main()
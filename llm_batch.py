@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Message-batches submission for bulk LLM work (back-catalogue onboarding).
+
+A stage collects every request it would send interactively as
+{'custom_id', 'key', 'params'} — custom_id names the chunk or mention, key is
+the llm_cache key and params the messages.create arguments. run_batch()
+submits those not yet in the response cache through client.messages.batches,
+polls until the batch has ended and stores each succeeded result that
+passes the stage's `validate` in the response cache under its key. The stage
+then runs as usual and finds every answer in the cache, so results land on
+the right chunk or mention without further API calls; failed or unusable
+entries simply fall back to an interactive call.
+
+The batch ids and their custom_id → key mapping are written to a state file
+right after submission. An interrupted run picks them up again and resumes
+polling instead of submitting (and paying for) the same requests twice.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from llm_cache import default_cache
+
+MAX_BATCH_REQUESTS = 100_000   # API limit per batch
+POLL_INTERVAL = 30.0           # seconds between status checks
+
+
+def batch_custom_id(*parts) -> str:
+    """custom_id from readable parts, within the API's [A-Za-z0-9_-]{1,64}."""
+    label = '-'.join(str(part) for part in parts)
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '_', label)
+    if len(slug) > 64:
+        digest = hashlib.sha256(label.encode('utf-8')).hexdigest()[:8]
+        slug = f"{slug[:55]}-{digest}"
+    return slug
+
+
+def load_state(state_path: Path) -> Dict:
+    if state_path.exists():
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+    return {'batches': []}
+
+
+def save_state(state: Dict, state_path: Path):
+    tmp = state_path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, state_path)
+
+
+def collect_results(client, batch_id: str, ids: Dict[str, str], stage: str,
+                    validate: Optional[Callable[[str], object]] = None) -> List[str]:
+    """
+    Store the usable results of an ended batch in the cache; return the
+    custom_ids that errored or whose answer `validate` rejected.
+    """
+    cache = default_cache()
+    failed = []
+    for entry in client.messages.batches.results(batch_id):
+        key = ids.get(entry.custom_id)
+        if key is None:
+            continue
+        if entry.result.type != 'succeeded':
+            failed.append(entry.custom_id)
+            continue
+        message = entry.result.message
+        cache.record_usage(stage, message)
+        text = message.content[0].text
+        if validate is not None:
+            try:
+                validate(text)
+            except Exception:
+                failed.append(entry.custom_id)
+                continue
+        cache.put(key, text)
+    return failed
+
+
+def run_batch(client, requests: List[Dict], state_path: Path, stage: str,
+              poll_interval: float = POLL_INTERVAL,
+              validate: Optional[Callable[[str], object]] = None) -> Dict[str, int]:
+    """
+    Submit all uncached requests as message batches, wait for them and fill
+    the response cache with the answers `validate` accepts. Returns counts:
+    cached, duplicates, submitted, succeeded, failed.
+    """
+    cache = default_cache()
+    state = load_state(state_path)
+    # Identical prompts (the same mention under several verse keys) go out once
+    unique = {}
+    for r in requests:
+        unique.setdefault(r['key'], r)
+    pending = {r['custom_id']: r for r in unique.values() if not cache.has(r['key'])}
+    counts = {'cached': len(unique) - len(pending), 'duplicates': len(requests) - len(unique),
+              'submitted': 0, 'succeeded': 0, 'failed': 0}
+
+    # Requests of an interrupted run are already on their way
+    for batch in state['batches']:
+        for custom_id in batch['ids']:
+            pending.pop(custom_id, None)
+    if state['batches']:
+        print(f"📦 Setze {len(state['batches'])} laufende Batches fort")
+
+    todo = list(pending.values())
+    for start in range(0, len(todo), MAX_BATCH_REQUESTS):
+        part = todo[start:start + MAX_BATCH_REQUESTS]
+        batch = client.messages.batches.create(
+            requests=[{'custom_id': r['custom_id'], 'params': r['params']} for r in part])
+        state['batches'].append({'id': batch.id,
+                                 'ids': {r['custom_id']: r['key'] for r in part}})
+        save_state(state, state_path)
+        counts['submitted'] += len(part)
+        print(f"📦 Batch {batch.id}: {len(part)} Anfragen eingereicht")
+
+    while state['batches']:
+        for batch in list(state['batches']):
+            status = client.messages.batches.retrieve(batch['id'])
+            if status.processing_status != 'ended':
+                continue
+            failed = collect_results(client, batch['id'], batch['ids'], stage, validate)
+            counts['failed'] += len(failed)
+            counts['succeeded'] += len(batch['ids']) - len(failed)
+            print(f"📦 Batch {batch['id']}: {len(batch['ids']) - len(failed)} erfolgreich, "
+                  f"{len(failed)} fehlgeschlagen")
+            for custom_id in failed:
+                print(f"      ⚠️  {custom_id}")
+            state['batches'].remove(batch)
+            save_state(state, state_path)
+        if state['batches']:
+            time.sleep(poll_interval)
+
+    if state_path.exists():
+        state_path.unlink()
+    return counts
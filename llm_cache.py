@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for Claude responses, shared by all AI stages.
+
+Every stage calls client.messages.create with temperature=0, so a response is
+determined by (model, max_tokens, system, prompt). The cache stores the response text
+under a SHA-256 of exactly that, zlib-compressed in a local SQLite file, and
+evicts least-recently-used entries once the store exceeds its size budget.
+Re-running a stage after a crash or an unrelated code change then costs
+nothing for inputs that did not change.
+
+Static instruction blocks can be passed as `system`: they are sent as a
+system block marked for provider-side prompt caching, and the cached versus
+uncached input tokens reported in each response's usage are tallied per
+stage. (The provider only caches prefixes above the model's minimum
+cacheable length; shorter ones simply show up as uncached.)
+
+Only answers the caller can use are stored: `validate` (the stage's parser,
+raising on a truncated or malformed answer) runs before put(), so a bad
+answer is asked for again instead of being replayed from the cache, and a
+stored answer that fails it is dropped on lookup.
+
+Environment:
+  LLM_CACHE_PATH    cache file (default: .llm_cache.sqlite3 in the working dir)
+  LLM_CACHE_MAX_MB  size budget before LRU eviction (default: 512)
+  LLM_CACHE_BYPASS  "1" skips lookups (fresh responses are still stored)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+DEFAULT_PATH = Path(os.environ.get('LLM_CACHE_PATH', '.llm_cache.sqlite3'))
+DEFAULT_MAX_BYTES = int(float(os.environ.get('LLM_CACHE_MAX_MB', '512')) * 1024 * 1024)
+
+
+def cache_key(model: str, max_tokens: int, prompt: str, system: Optional[str] = None) -> str:
+    """SHA-256 over everything that determines a temperature=0 response."""
+    fields = {'model': model, 'max_tokens': max_tokens, 'prompt': prompt}
+    if system is not None:
+        fields['system'] = system
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def request_kwargs(model: str, max_tokens: int, prompt: str,
+                   system: Optional[str] = None) -> Dict:
+    """
+    Arguments for client.messages.create: the static `system` text becomes a
+    cache_control block, the per-call `prompt` the user message.
+    """
+    kwargs = {
+        'model': model,
+        'max_tokens': max_tokens,
+        'temperature': 0,
+        'messages': [{'role': 'user', 'content': prompt}],
+    }
+    if system is not None:
+        kwargs['system'] = [{'type': 'text', 'text': system,
+                             'cache_control': {'type': 'ephemeral'}}]
+    return kwargs
+
+
+class TokenUsage:
+    """Input/output token tally of one stage, split by prompt-cache status."""
+
+    def __init__(self):
+        self.calls = 0
+        self.uncached = 0
+        self.cache_read = 0
+        self.cache_write = 0
+        self.output = 0
+
+    def add(self, usage):
+        self.calls += 1
+        self.uncached += getattr(usage, 'input_tokens', 0) or 0
+        self.cache_read += getattr(usage, 'cache_read_input_tokens', 0) or 0
+        self.cache_write += getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        self.output += getattr(usage, 'output_tokens', 0) or 0
+
+    def report(self, stage: str) -> str:
+        total = self.uncached + self.cache_read + self.cache_write
+        share = f" ({self.cache_read / total:.0%})" if total else ""
+        return (f"   {stage}: {self.calls} Aufrufe, Input {total} Tokens — "
+                f"{self.cache_read} aus Prompt-Cache{share}, {self.cache_write} in Cache geschrieben, "
+                f"{self.uncached} ungecacht; Output {self.output}")
+
+
+class ResponseCache:
+    """SQLite-backed response store with size-based LRU eviction and hit/miss counters."""
+
+    def __init__(self, path: Path = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 bypass: bool = False):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.usage: Dict[str, TokenUsage] = defaultdict(TokenUsage)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute('''CREATE TABLE IF NOT EXISTS responses (
+                                key TEXT PRIMARY KEY,
+                                response BLOB NOT NULL,
+                                size INTEGER NOT NULL,
+                                last_used REAL NOT NULL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)')
+        self._db.commit()
+        self._total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def get(self, key: str, validate: Optional[Callable[[str], object]] = None) -> Optional[str]:
+        """
+        Cached response text for a key, or None (always None when bypassed).
+        A stored text that `validate` rejects is deleted and counts as a miss.
+        """
+        if self.bypass:
+            self.misses += 1
+            return None
+        with self._lock:
+            row = self._db.execute('SELECT response FROM responses WHERE key = ?',
+                                   (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute('UPDATE responses SET last_used = ? WHERE key = ?',
+                             (time.time(), key))
+            self._db.commit()
+        text = zlib.decompress(row[0]).decode('utf-8')
+        if validate is not None:
+            try:
+                validate(text)
+            except Exception:
+                self.delete(key)
+                self.misses += 1
+                return None
+        self.hits += 1
+        return text
+
+    def has(self, key: str) -> bool:
+        """Whether a response is stored for key, without counting a hit or miss."""
+        if self.bypass:
+            return False
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM responses WHERE key = ?',
+                                    (key,)).fetchone() is not None
+
+    def put(self, key: str, text: str):
+        blob = zlib.compress(text.encode('utf-8'))
+        with self._lock:
+            old = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                             (key, blob, len(blob), time.time()))
+            self._total += len(blob) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._total -= row[0]
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the store fits max_bytes."""
+        if self._total <= self.max_bytes:
+            return
+        rows = self._db.execute('SELECT key, size FROM responses ORDER BY last_used').fetchall()
+        for key, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._total -= size
+            self.evictions += 1
+
+    def record_usage(self, stage: str, message):
+        """Tally a response's token usage under its pipeline stage."""
+        usage = getattr(message, 'usage', None)
+        if usage is not None:
+            self.usage[stage].add(usage)
+
+    def create(self, client, *, model: str, max_tokens: int, prompt: str,
+               system: Optional[str] = None, stage: str = 'default',
+               validate: Optional[Callable[[str], object]] = None, attempts: int = 1) -> str:
+        """
+        client.messages.create for one prompt, served from the cache when possible.
+
+        With `validate`, an answer is only cached (and returned) once it
+        passes; a rejected one is requested again, up to `attempts` calls in
+        all, after which the last validation error is raised.
+        """
+        key = cache_key(model, max_tokens, prompt, system)
+        text = self.get(key, validate)
+        if text is not None:
+            return text
+        for attempt in range(1, attempts + 1):
+            message = client.messages.create(**request_kwargs(model, max_tokens, prompt, system))
+            self.record_usage(stage, message)
+            text = message.content[0].text
+            if validate is not None:
+                try:
+                    validate(text)
+                except Exception:
+                    if attempt == attempts:
+                        raise
+                    continue
+            self.put(key, text)
+            return text
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = f" ({self.hits / total:.0%})" if total else ""
+        evicted = f", {self.evictions} verdrängt" if self.evictions else ""
+        lines = [f"💾 LLM-Cache: {self.hits} Treffer, {self.misses} neu{rate}{evicted} "
+                 f"— {self._total / 1024 / 1024:.1f} MB in {self.path}"]
+        lines.extend(usage.report(stage) for stage, usage in sorted(self.usage.items()))
+        return '\n'.join(lines)
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def default_cache() -> ResponseCache:
+    """Process-wide cache configured from the LLM_CACHE_* environment variables."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache(bypass=os.environ.get('LLM_CACHE_BYPASS') == '1')
+    return _default_cache
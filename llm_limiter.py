@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Request pacing shared by all AI stages.
+
+AdaptiveLimiter caps the in-flight requests of an async stage and backs off
+on rate limiting; retry_delay() says how long to wait after a 429, and
+estimate_tokens() is the local token estimate the stages use for chunk
+budgets, scheduling and progress.
+"""
+
+import asyncio
+import math
+import random
+
+CHARS_PER_TOKEN = 3.5     # German transcript text, measured on the corpus
+
+
+class AdaptiveLimiter:
+    """
+    Cap on in-flight requests that adapts to rate limiting (AIMD).
+
+    A 429 halves the limit and pauses new requests for the server's
+    retry-after (or an exponential backoff); each run of `limit` successful
+    calls raises the limit by one again, up to the configured maximum.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self.limit = self.max_in_flight
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        delay = self._resume_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_in_flight:
+            self.limit += 1
+            self._successes = 0
+
+    def on_rate_limit(self, delay: float):
+        self.rate_limited += 1
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+        resume_at = asyncio.get_running_loop().time() + delay
+        self._resume_at = max(self._resume_at, resume_at)
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait after a 429: the server's retry-after, else backoff with jitter."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Local input-token estimate (no API call)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
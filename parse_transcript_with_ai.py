@@ -13,14 +13,24 @@ This replaces extract_study_bible_data.py + ai_extraction.py with a
 single AI-driven pass that understands meaning, not just pattern matches.
 """
 
+import argparse
+import asyncio
 import json
 import os
-import sys
+import re
 import time
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import anthropic
 
+import fake_anthropic
+from bible_refs import parse_reference
+from extract_study_bible_data import match_line
+from llm_batch import POLL_INTERVAL, batch_custom_id, run_batch
+from llm_cache import cache_key, default_cache, request_kwargs
+from llm_limiter import AdaptiveLimiter, estimate_tokens, retry_delay
+from work_scheduler import WorkScheduler
+
 CATEGORY_LABELS = [
     "textanalyse",        # word meanings, Hebrew/Greek, structure
     "historisch_kulturell",  # historical/cultural background
@@ -30,21 +40,54 @@ CATEGORY_LABELS = [
     "illustrationen",     # stories, analogies, examples
 ]
 
-
-def parse_chunk(chunk: List[Dict], video_title: str, client: anthropic.Anthropic) -> List[Dict]:
-    """
-    Have Claude read a chunk of transcript segments and extract all
-    meaningful teaching sections with verse attribution and category.
-    """
-
-    chunk_text = "\n".join(
-        f"[{seg['start']}] {seg['text']}"
-        for seg in chunk
-    )
-
-    prompt = f"""Du analysierst ein deutsches Bibel-Lehr-Video-Transkript.
-
-VIDEO: {video_title}
+MODEL = "claude-sonnet-4-5-20250929"
+MAX_TOKENS = 4000
+PARSE_ATTEMPTS = 2        # requests per chunk before an unparseable answer counts as failed
+
+# Transcript chunking: pack segments up to a token budget per request and
+# repeat whole sentences (up to OVERLAP_TOKEN_BUDGET) at chunk boundaries
+CHUNK_TOKEN_BUDGET = 2000
+OVERLAP_TOKEN_BUDGET = 120
+PAUSE_MS = 8000           # gap after a segment that counts as a pause
+SENTENCE_ENDINGS = ('.', '!', '?', '…', '"', '“')
+
+# Overlapping chunks often return the same section twice. Sections about
+# overlapping verses within DEDUPE_WINDOW_MS whose word-bigram Jaccard
+# similarity reaches DEDUPE_SIMILARITY are merged.
+DEDUPE_WINDOW_MS = 30_000
+DEDUPE_SIMILARITY = 0.4
+QUALITY_RANK = {"high": 2, "medium": 1, "low": 0}
+
+# Local relevance prefilter (--prefilter): chunks whose teaching density
+# stays below PREFILTER_THRESHOLD are not sent to the model. Density is the
+# weighted feature count per segment: regex verse hits, theological terms and
+# topics from extract_study_bible_data, plus teaching and noise cue words.
+PREFILTER_THRESHOLD = 0.2
+TEACHING_CUES = re.compile(
+    r"\b(?:gott\w*|jesus|christus|bibel\w*|vers|kapitel|bedeutet|heißt|hebräisch\w*|"
+    r"griechisch\w*|glaube\w*|evangelium|gnade|heilige\w*|herr|geist\w*|paulus|mose|"
+    r"schrift|wort)\b", re.IGNORECASE)
+NOISE_CUES = re.compile(
+    r"\bmusik\b|\bapplaus\b|herzlich willkommen|untertitel|abonnier|\bspende|"
+    r"impressum|copyright", re.IGNORECASE)
+
+# --order: longest first starts the long tail early (shortest makespan)
+ORDER_POLICIES = ("longest", "oldest", "name")
+
+# Submitted --batch runs, so an interrupted run resumes polling instead of resubmitting
+BATCH_STATE = Path(".parse_batch_state.json")
+
+# The fixed chunking used before token-budget packing, for plan reports
+LEGACY_CHUNK_SIZE = 40
+LEGACY_CHUNK_OVERLAP = 5
+
+
+# Static instructions, identical for every chunk: sent as a system block marked
+# for provider-side prompt caching, so only the transcript chunk is billed at
+# the full input rate after the first call. The provider caches only prefixes
+# of at least 1024 tokens (Sonnet), so the block carries the full category
+# guide and a worked example rather than a bare schema.
+CHUNK_INSTRUCTIONS = """Du analysierst ein deutsches Bibel-Lehr-Video-Transkript.
 
 DEINE AUFGABE:
 Identifiziere alle Stellen im Transkript, wo der Sprecher über einen konkreten Bibelvers oder -abschnitt LEHRT (nicht nur vorliest oder ankündigt).
@@ -54,6 +97,8 @@ Ignoriere:
 - Verse vorlesen ohne Kommentar
 - Ankündigungen ("Schlagen Sie auf...")
 - Musik, Begrüßungen, Übergänge
+- Gebete, Spendenaufrufe, Hinweise auf Veranstaltungen oder andere Sendungen
+- Wiederholungen dessen, was der Sprecher kurz zuvor schon gesagt hat
 
 Extrahiere NUR:
 - Stellen mit echtem Lehrinhalt: Erklärungen, Einsichten, Anwendungen, Illustrationen
@@ -71,84 +116,324 @@ Für jede Lehrstelle:
   - "illustrationen": Geschichte, Analogie, Beispiel zur Veranschaulichung
 - Was sagt der Sprecher konkret? (als klare, eigenständige Aussage)
 
-TRANSKRIPT:
-{chunk_text}
+KATEGORIEN IM EINZELNEN:
+- "textanalyse": Der Sprecher erklärt, was ein Wort im Hebräischen oder Griechischen bedeutet, wie ein Satz gebaut ist, warum eine Formulierung wiederholt wird oder wie der Abschnitt gegliedert ist. Beispiel: "bara" wird im Alten Testament nur für Gottes Schaffen verwendet.
+- "historisch_kulturell": Der Sprecher erklärt die Welt der ersten Leser: altorientalische Schöpfungsmythen, Sitten, Geografie, Entstehungszeit oder Adressaten eines Buches. Beispiel: Sonne und Mond waren in den Nachbarvölkern Gottheiten, Genesis nennt sie bewusst nur "Lichter".
+- "theologisch": Der Sprecher leitet aus dem Text eine Aussage über Gott, den Menschen, die Sünde, das Heil oder die Schöpfung ab. Beispiel: Gott schafft durch sein Wort, nicht aus einem Kampf mit anderen Mächten.
+- "christologisch": Der Sprecher verbindet den Text mit Jesus Christus oder zeigt, wie das Neue Testament ihn aufgreift. Beispiel: Johannes 1 nimmt "Im Anfang" auf und nennt Jesus das Wort, durch das alles geschaffen ist.
+- "anwendung": Der Sprecher sagt, was der Text für das Leben der Zuhörer heute bedeutet, möglichst konkret. Beispiel: Weil jeder Mensch Gottes Ebenbild ist, hat auch der Kollege, der mich ärgert, unantastbare Würde.
+- "illustrationen": Der Sprecher erzählt eine Geschichte, ein Erlebnis, einen Vergleich oder ein Bild, um den Text anschaulich zu machen. Beispiel: Ein Künstler signiert sein Werk — so trägt der Mensch Gottes Handschrift.
+Passt eine Aussage in mehrere Kategorien, wähle die, die ihren Schwerpunkt am besten trifft. Enthält ein längerer Abschnitt mehrere verschiedene Gedanken, lege für jeden Gedanken einen eigenen Eintrag an.
+
+REGELN FÜR DIE FELDER:
+- "timestamp": der Zeitstempel des Segments, in dem die Lehraussage beginnt, genau so wie er im Transkript in eckigen Klammern steht.
+- "verse_reference": die behandelte Stelle so genau wie möglich ("Genesis 1:26-27"). Nennt der Sprecher nur das Kapitel, gib das Kapitel an ("Genesis 1"). Spricht er über einen Vers, ohne ihn zu nennen, gib den Vers an, auf den sich seine Worte eindeutig beziehen.
+- "category": genau einer der sechs Werte oben.
+- "quality": siehe unten.
+- "content": was der Sprecher sagt, in eigenen Worten als klare, eigenständige Aussage in 1-3 Sätzen, verständlich ohne das Transkript. Keine Füllwörter, keine Einleitung wie "Der Sprecher sagt". Nichts hinzufügen, was der Sprecher nicht sagt.
+
+Das Video und der TRANSKRIPT-Ausschnitt folgen in der Nachricht.
 
 ANTWORTFORMAT (nur JSON):
-{{
+{
   "sections": [
-    {{
+    {
       "timestamp": "HH:MM:SS",
       "verse_reference": "Genesis 1:1",
       "category": "theologisch",
       "quality": "high",
       "content": "Was der Sprecher sagt — als klare Aussage, nicht als Zitat"
-    }}
+    }
   ]
-}}
+}
 
 "quality" Werte: "high" (tiefgründig, einzigartig), "medium" (solide, nützlich), "low" (zu allgemein).
 Nur "high" und "medium" aufnehmen. Bei Zweifeln weglassen.
+"high" heißt: eine Einsicht, die man nicht in jeder Predigt hört, mit Begründung aus dem Text. "medium" heißt: richtig und hilfreich, aber naheliegend. Allgemeine Sätze wie "Gott ist groß" ohne Bezug zum Text sind "low".
+
+BEISPIEL:
+TRANSKRIPT:
+[00:12:04] Und dann heißt es: Und Gott sprach, es werde Licht.
+[00:12:09] Im Hebräischen steht da nur ein Wort: jehi or. Mehr braucht Gott nicht.
+[00:12:15] Die Babylonier erzählten, die Welt sei aus einem Kampf der Götter entstanden.
+[00:12:21] Hier kämpft niemand. Gott spricht, und es geschieht.
+[00:12:27] Und das gilt auch heute: Wenn Gott in dein Dunkel spricht, wird es hell.
+Antwort:
+{
+  "sections": [
+    {"timestamp": "00:12:09", "verse_reference": "Genesis 1:3", "category": "textanalyse", "quality": "high", "content": "Der hebräische Befehl besteht nur aus zwei Wörtern, jehi or; Gottes Wort genügt, um Licht entstehen zu lassen."},
+    {"timestamp": "00:12:15", "verse_reference": "Genesis 1:3", "category": "historisch_kulturell", "quality": "high", "content": "Anders als im babylonischen Mythos entsteht die Welt nicht aus einem Götterkampf, sondern allein durch Gottes Sprechen."},
+    {"timestamp": "00:12:27", "verse_reference": "Genesis 1:3", "category": "anwendung", "quality": "medium", "content": "Wie am Anfang bringt Gottes Wort auch heute Licht in persönliche Dunkelheit."}
+  ]
+}
+
 Nur gültiges JSON. Alles auf Deutsch."""
 
+
+def build_chunk_prompt(chunk: List[Dict], video_title: str) -> str:
+    """Per-chunk part of the prompt; the instructions are CHUNK_INSTRUCTIONS."""
+
+    chunk_text = "\n".join(
+        f"[{seg['start']}] {seg['text']}"
+        for seg in chunk
+    )
+
+    return f"""VIDEO: {video_title}
+
+TRANSKRIPT:
+{chunk_text}"""
+
+
+def parse_sections_response(text: str) -> List[Dict]:
+    """Extract the sections list from a model reply (may be wrapped in ```json)."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+
+    result = json.loads(text)
+    if not isinstance(result, dict) or not isinstance(result.get("sections", []), list):
+        raise ValueError("answer has no sections list")
+    return result.get("sections", [])
+
+
+def parse_chunk(chunk: List[Dict], video_title: str,
+                client: anthropic.Anthropic) -> Optional[List[Dict]]:
+    """
+    Have Claude read a chunk of transcript segments and extract all
+    meaningful teaching sections with verse attribution and category.
+    Returns None if the chunk could not be parsed.
+    """
+    prompt = build_chunk_prompt(chunk, video_title)
+
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=4000,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        text = message.content[0].text.strip()
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-
-        result = json.loads(text)
-        return result.get("sections", [])
+        text = default_cache().create(client, model=MODEL, max_tokens=MAX_TOKENS, prompt=prompt,
+                                      system=CHUNK_INSTRUCTIONS, stage="parse",
+                                      validate=parse_sections_response, attempts=PARSE_ATTEMPTS)
+        return parse_sections_response(text)
 
     except Exception as e:
         print(f"      ⚠️  Chunk parse error: {e}")
-        return []
+        return None
 
 
-def parse_transcript(video_data: Dict, client: anthropic.Anthropic) -> Dict:
+async def parse_chunk_async(chunk: List[Dict], video_title: str,
+                            client: anthropic.AsyncAnthropic,
+                            limiter: AdaptiveLimiter,
+                            max_attempts: int = 6) -> Optional[List[Dict]]:
     """
-    AI-parse a full video transcript to extract all teaching sections.
+    Async parse_chunk(): retries 429s through the shared limiter. An
+    unparseable answer is not cached and is requested again, up to
+    PARSE_ATTEMPTS times.
+    """
+    prompt = build_chunk_prompt(chunk, video_title)
+    cache = default_cache()
+    key = cache_key(MODEL, MAX_TOKENS, prompt, CHUNK_INSTRUCTIONS)
+
+    # Cache hits never take a slot from the limiter
+    text = cache.get(key, validate=parse_sections_response)
+    if text is not None:
+        return parse_sections_response(text)
+
+    unusable = 0
+    for attempt in range(max_attempts):
+        async with limiter:
+            try:
+                message = await client.messages.create(
+                    **request_kwargs(MODEL, MAX_TOKENS, prompt, CHUNK_INSTRUCTIONS))
+            except anthropic.RateLimitError as e:
+                limiter.on_rate_limit(retry_delay(e, attempt))
+                continue
+            except Exception as e:
+                print(f"      ⚠️  Chunk parse error: {e}")
+                return None
+
+        limiter.on_success()
+        cache.record_usage("parse", message)
+        text = message.content[0].text
+        try:
+            sections = parse_sections_response(text)
+        except Exception as e:
+            print(f"      ⚠️  Chunk parse error: {e}")
+            unusable += 1
+            if unusable >= PARSE_ATTEMPTS:
+                return None
+            continue
+        cache.put(key, text)
+        return sections
 
-    Returns enriched video data with AI-identified teaching sections
-    organized by verse reference and category.
+    print(f"      ⚠️  Chunk parse error: rate limited {max_attempts}x, giving up")
+    return None
+
+
+def segment_tokens(seg: Dict) -> int:
+    """Tokens a segment costs in the prompt, as rendered by build_chunk_prompt."""
+    return estimate_tokens(f"[{seg['start']}] {seg['text']}\n")
+
+
+def is_boundary(segments: List[Dict], idx: int) -> bool:
+    """True if a chunk may end after segments[idx]: sentence end or speech pause."""
+    if idx + 1 >= len(segments):
+        return True
+    if segments[idx].get('text', '').rstrip().endswith(SENTENCE_ENDINGS):
+        return True
+    gap = segments[idx + 1].get('start_ms', 0) - segments[idx].get('start_ms', 0)
+    return gap >= PAUSE_MS
+
+
+def chunk_segments(segments: List[Dict], budget: int = CHUNK_TOKEN_BUDGET,
+                   overlap_budget: int = OVERLAP_TOKEN_BUDGET) -> List[List[Dict]]:
     """
+    Pack segments into chunks of at most `budget` estimated input tokens.
 
-    title = video_data.get("title", "")
-    segments = video_data.get("segments", [])
+    A full chunk is cut back to the last sentence end or pause in its final
+    quarter, and the next chunk repeats only the whole sentences that fit in
+    `overlap_budget` — so teaching spanning a boundary isn't lost without
+    re-billing a fixed share of every transcript.
+    """
+    costs = [segment_tokens(seg) for seg in segments]
+    chunks = []
+    start = 0
+    while start < len(segments):
+        end = start
+        used = 0
+        while end < len(segments) and (end == start or used + costs[end] <= budget):
+            used += costs[end]
+            end += 1
+
+        # Prefer ending on a boundary, unless that would shrink the chunk by > 25%
+        if end < len(segments):
+            trimmed = used
+            for cut in range(end, start + 1, -1):
+                if trimmed < 0.75 * budget:
+                    break
+                if is_boundary(segments, cut - 1):
+                    end = cut
+                    break
+                trimmed -= costs[cut - 1]
+
+        chunks.append(segments[start:end])
+        if end >= len(segments):
+            break
+
+        # Overlap: start the next chunk at the earliest sentence start whose
+        # tail still fits the overlap budget; without one, repeat the tail as is
+        next_start = end
+        fallback = end
+        tail = 0
+        for k in range(end - 1, start, -1):
+            tail += costs[k]
+            if tail > overlap_budget:
+                break
+            fallback = k
+            if is_boundary(segments, k - 1):
+                next_start = k
+        start = next_start if next_start < end else fallback
+    return chunks
+
+
+def teaching_score(chunk: List[Dict]) -> float:
+    """Teaching density of a chunk: weighted local feature hits per segment."""
+    score = 0
+    for seg in chunk:
+        text = seg.get("text", "")
+        verses, topics, terms = match_line(text)
+        score += 3 * len(verses) + 2 * len(terms) + len(topics)
+        score += len(TEACHING_CUES.findall(text)) - 2 * len(NOISE_CUES.findall(text))
+    return score / max(1, len(chunk))
+
+
+def plan_calls(segments: List[Dict]) -> Dict:
+    """Projected requests and transcript tokens for one video, vs. the fixed 40/5 chunking."""
+    chunks = chunk_segments(segments)
+    step = LEGACY_CHUNK_SIZE - LEGACY_CHUNK_OVERLAP
+    return {
+        'calls': len(chunks),
+        'tokens': sum(segment_tokens(seg) for chunk in chunks for seg in chunk),
+        'legacy_calls': len(range(0, len(segments), step)),
+        'legacy_tokens': sum(segment_tokens(seg)
+                             for i in range(0, len(segments), step)
+                             for seg in segments[i:i + LEGACY_CHUNK_SIZE]),
+    }
 
-    print(f"    📖 Parsing {len(segments)} segments...")
 
-    # Process in chunks of 40 segments with 5-segment overlap
-    chunk_size = 40
-    overlap = 5
-    all_sections = []
+def timestamp_ms(ts: str) -> int:
+    """HH:MM:SS → milliseconds (0 if unparseable)."""
+    try:
+        hours, minutes, seconds = (int(p) for p in ts.split(":"))
+    except (AttributeError, ValueError):
+        return 0
+    return (hours * 3600 + minutes * 60 + seconds) * 1000
 
-    i = 0
-    chunk_num = 0
-    while i < len(segments):
-        chunk = segments[i:i + chunk_size]
-        chunk_num += 1
-        print(f"      Chunk {chunk_num} [{chunk[0]['start']} → {chunk[-1]['start']}]...", end=" ")
 
-        sections = parse_chunk(chunk, title, client)
-        all_sections.extend(sections)
-        print(f"{len(sections)} Lehrabschnitte")
+def shingles(text: str) -> set:
+    """Word bigrams of a text, lowercased; empty for texts of fewer than two words."""
+    words = re.findall(r"\w+", text.lower())
+    return {(a, b) for a, b in zip(words, words[1:])}
 
-        # Advance with overlap so teaching spanning chunk boundaries isn't lost
-        i += chunk_size - overlap
 
-        # Small delay to avoid rate limits
-        time.sleep(0.5)
+def jaccard(a: set, b: set) -> float:
+    """Bigram overlap; 0 if either side is empty, so empty or one-word texts never match."""
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def same_passage(ref_a: str, ref_b: str) -> bool:
+    """True if two verse references share at least one verse."""
+    ranges_a, ranges_b = parse_reference(ref_a), parse_reference(ref_b)
+    if not ranges_a or not ranges_b:
+        return re.sub(r"\(.*?\)", "", ref_a).strip().lower() == \
+            re.sub(r"\(.*?\)", "", ref_b).strip().lower()
+    return any(sa <= eb and sb <= ea for sa, ea in ranges_a for sb, eb in ranges_b)
+
+
+def dedupe_sections(sections: List[Dict]) -> List[Dict]:
+    """
+    Merge near-duplicate sections produced by overlapping chunks.
+
+    Sections are clustered when they cover overlapping verses, lie within
+    DEDUPE_WINDOW_MS of each other and their content is similar enough; each
+    cluster keeps its best member (quality, then length) in original order.
+    """
+    times = [timestamp_ms(sec.get("timestamp", "")) for sec in sections]
+    grams = [shingles(sec.get("content", "")) for sec in sections]
+    parent = list(range(len(sections)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Only sections close in time are compared
+    order = sorted(range(len(sections)), key=lambda i: times[i])
+    for pos, i in enumerate(order):
+        for j in order[pos + 1:]:
+            if times[j] - times[i] > DEDUPE_WINDOW_MS:
+                break
+            if (jaccard(grams[i], grams[j]) >= DEDUPE_SIMILARITY and
+                    same_passage(sections[i].get("verse_reference", ""),
+                                 sections[j].get("verse_reference", ""))):
+                parent[find(j)] = find(i)
+
+    best: Dict[int, Tuple[Tuple[int, int], int]] = {}
+    for i, sec in enumerate(sections):
+        root = find(i)
+        score = (QUALITY_RANK.get(sec.get("quality"), 0), len(sec.get("content", "")))
+        if root not in best or score > best[root][0]:
+            best[root] = (score, i)
+    keep = sorted(i for _, i in best.values())
+    return [sections[i] for i in keep]
+
+
+def assemble_parsed(video_data: Dict, all_sections: List[Dict]) -> Dict:
+    """Deduplicate sections, organize them by verse reference and attach them to the video data."""
+    found = len(all_sections)
+    all_sections = dedupe_sections(all_sections)
+    removed = found - len(all_sections)
+    if removed:
+        print(f"    🧹 {removed} doppelte Lehrabschnitte entfernt")
 
-    # Organize sections by verse reference
     verse_sections: Dict[str, List[Dict]] = {}
     for section in all_sections:
         ref = section.get("verse_reference", "")
@@ -164,21 +449,371 @@ def parse_transcript(video_data: Dict, client: anthropic.Anthropic) -> Dict:
         **video_data,
         "ai_sections": all_sections,
         "verse_sections": verse_sections,
+        "duplicates_removed": removed,
     }
 
 
+class ChunkJournal:
+    """
+    Append-only record of one video's parsed chunks (*_journal.jsonl).
+
+    Each line holds a chunk's sections, keyed by its first/last segment
+    timestamp and a hash of the full request. After a crash or Ctrl-C the
+    next run replays these and only sends the missing chunks. Failed chunks
+    are never recorded, so a video with one is not saved and the next run
+    asks only for those; save_parsed() removes the journal once
+    *_parsed.json is written.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, List[Dict]] = {}
+        self.replayed = 0
+        if not path.exists():
+            return
+        text = path.read_text(encoding="utf-8")
+        if text and not text.endswith("\n"):
+            # Torn last line from a crash mid-write: drop it before appending again
+            text = text[:text.rfind("\n") + 1]
+            path.write_text(text, encoding="utf-8")
+        for line in text.splitlines():
+            entry = json.loads(line)
+            self.entries[entry["chunk"]] = entry["sections"]
+
+    @staticmethod
+    def chunk_id(chunk: List[Dict], video_title: str) -> str:
+        prompt = build_chunk_prompt(chunk, video_title)
+        digest = cache_key(MODEL, MAX_TOKENS, prompt, CHUNK_INSTRUCTIONS)[:16]
+        return f"{chunk[0]['start']}-{chunk[-1]['start']}:{digest}"
+
+    def get(self, chunk_id: str) -> Optional[List[Dict]]:
+        sections = self.entries.get(chunk_id)
+        if sections is not None:
+            self.replayed += 1
+        return sections
+
+    def record(self, chunk_id: str, sections: List[Dict]):
+        self.entries[chunk_id] = sections
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"chunk": chunk_id, "sections": sections}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def journal_path(data_file: Path, data_dir: Path) -> Path:
+    base_name = data_file.stem.replace('_study_data', '')
+    return data_dir / f"{base_name}_journal.jsonl"
+
+
+def parse_transcript(video_data: Dict, client: anthropic.Anthropic,
+                     min_score: Optional[float] = None,
+                     journal: Optional[ChunkJournal] = None) -> Optional[Dict]:
+    """
+    AI-parse a full video transcript to extract all teaching sections.
+
+    Returns enriched video data with AI-identified teaching sections
+    organized by verse reference and category. With min_score, chunks whose
+    teaching_score is lower are skipped without a model call; chunks already
+    in the journal are replayed from it. Returns None if any chunk failed:
+    the video is incomplete and must not be saved yet.
+    """
+
+    title = video_data.get("title", "")
+    segments = video_data.get("segments", [])
+
+    print(f"    📖 Parsing {len(segments)} segments...")
+
+    all_sections = []
+    failed = 0
+    for chunk_num, chunk in enumerate(chunk_segments(segments), 1):
+        print(f"      Chunk {chunk_num} [{chunk[0]['start']} → {chunk[-1]['start']}]...", end=" ")
+
+        if min_score is not None:
+            score = teaching_score(chunk)
+            if score < min_score:
+                print(f"übersprungen (Score {score:.2f})")
+                continue
+
+        chunk_id = ChunkJournal.chunk_id(chunk, title) if journal else None
+        sections = journal.get(chunk_id) if journal else None
+        if sections is not None:
+            all_sections.extend(sections)
+            print(f"{len(sections)} Lehrabschnitte (Journal)")
+            continue
+
+        sections = parse_chunk(chunk, title, client)
+        if sections is None:
+            failed += 1
+        else:
+            if journal:
+                journal.record(chunk_id, sections)
+            all_sections.extend(sections)
+            print(f"{len(sections)} Lehrabschnitte")
+
+        # Small delay to avoid rate limits
+        time.sleep(0.5)
+
+    if failed:
+        print(f"    ⚠️  Unvollständig: {failed} Chunks fehlgeschlagen — nicht gespeichert, "
+              f"der nächste Lauf fragt nur diese erneut an")
+        return None
+    return assemble_parsed(video_data, all_sections)
+
+
+def load_video(data_file: Path, videos: Optional[Dict[Path, Dict]] = None) -> Dict:
+    """Read a *_study_data.json once: through `videos` if given, so ordering and parsing share it."""
+    if videos is not None and data_file in videos:
+        return videos[data_file]
+    with open(data_file, encoding="utf-8") as f:
+        video_data = json.load(f)
+    if videos is not None:
+        videos[data_file] = video_data
+    return video_data
+
+
+def video_job(data_file: Path, data_dir: Path, client: anthropic.AsyncAnthropic,
+              limiter: AdaptiveLimiter, min_score: Optional[float] = None,
+              incomplete: Optional[List[Path]] = None,
+              videos: Optional[Dict[Path, Dict]] = None):
+    """
+    Scheduler tasks for one video's chunks that are not in its journal yet,
+    and the callback that writes *_parsed.json once they have all landed.
+    Sections are reassembled in chunk order, so the output matches the
+    sequential parser. If a chunk failed, nothing is written; the video goes
+    into `incomplete` and its journal stays for the next run.
+    """
+    video_data = load_video(data_file, videos)
+    title = video_data.get("title", "")
+    chunks = chunk_segments(video_data.get("segments", []))
+    if min_score is not None:
+        relevant = [chunk for chunk in chunks if teaching_score(chunk) >= min_score]
+        if len(relevant) < len(chunks):
+            print(f"    ⏭  {title[:40]}: {len(chunks) - len(relevant)} Chunks übersprungen (Prefilter)")
+        chunks = relevant
+
+    journal = ChunkJournal(journal_path(data_file, data_dir))
+    chunk_ids = [ChunkJournal.chunk_id(chunk, title) for chunk in chunks]
+    slots = [journal.get(chunk_id) for chunk_id in chunk_ids]
+    missing = [i for i, sections in enumerate(slots) if sections is None]
+
+    async def parse_one(i: int) -> Optional[List[Dict]]:
+        sections = await parse_chunk_async(chunks[i], title, client, limiter)
+        if sections is not None:
+            journal.record(chunk_ids[i], sections)
+        return sections
+
+    def on_complete(results: List[Optional[List[Dict]]]):
+        for i, sections in zip(missing, results):
+            slots[i] = sections
+        print(f"    📹 {title[:60]}")
+        if journal.replayed:
+            print(f"    📓 {journal.replayed} Chunks aus dem Journal übernommen")
+        failed = sum(1 for sections in slots if sections is None)
+        if failed:
+            print(f"    ⚠️  Unvollständig: {failed} Chunks fehlgeschlagen — nicht gespeichert, "
+                  f"der nächste Lauf fragt nur diese erneut an\n")
+            if incomplete is not None:
+                incomplete.append(data_file)
+            return
+        parsed = assemble_parsed(video_data, [section for sections in slots for section in sections])
+        out_file = save_parsed(parsed, data_file, data_dir)
+        print(f"    💾 Gespeichert: {out_file.name}\n")
+
+    tasks = [(estimate_tokens(build_chunk_prompt(chunks[i], title)), lambda i=i: parse_one(i))
+             for i in missing]
+    return tasks, on_complete
+
+
+def order_videos(input_files: List[Path], policy: str,
+                 videos: Optional[Dict[Path, Dict]] = None) -> List[Path]:
+    """
+    Processing order: most transcript tokens first, oldest input first, or by
+    name. Files read for ranking are kept in `videos` for the parse that follows.
+    """
+    if policy == "longest":
+        def transcript_tokens(data_file: Path) -> int:
+            segments = load_video(data_file, videos).get("segments", [])
+            return sum(segment_tokens(seg) for seg in segments)
+        return sorted(input_files, key=transcript_tokens, reverse=True)
+    if policy == "oldest":
+        return sorted(input_files, key=lambda data_file: data_file.stat().st_mtime)
+    return sorted(input_files)
+
+
+def save_parsed(parsed: Dict, data_file: Path, data_dir: Path) -> Path:
+    """Save as *_parsed.json — same base name as the input file for consistent matching."""
+    base_name = data_file.stem.replace('_study_data', '')
+    out_file = data_dir / f"{base_name}_parsed.json"
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump(parsed, f, indent=2, ensure_ascii=False)
+    # Every chunk is in *_parsed.json now
+    journal = journal_path(data_file, data_dir)
+    if journal.exists():
+        journal.unlink()
+    return out_file
+
+
+async def parse_all_async(input_files: List[Path], data_dir: Path,
+                          client: anthropic.AsyncAnthropic, concurrency: int,
+                          min_score: Optional[float] = None,
+                          per_video: Optional[int] = None,
+                          videos: Optional[Dict[Path, Dict]] = None) -> List[Path]:
+    """
+    Parse all videos through one work queue: every pending chunk of every
+    video (in input_files order) shares the concurrency cap and the rate
+    limiter, and each *_parsed.json is written as soon as its last chunk lands.
+    Returns the videos left incomplete by failed chunks.
+    """
+    limiter = AdaptiveLimiter(concurrency)
+    scheduler = WorkScheduler(concurrency, per_video or max(1, concurrency // 2))
+    incomplete: List[Path] = []
+    for data_file in input_files:
+        tasks, on_complete = video_job(data_file, data_dir, client, limiter, min_score, incomplete, videos)
+        scheduler.add(data_file.stem, tasks, on_complete)
+
+    progress = await scheduler.run()
+    print(progress.line())
+    if limiter.rate_limited:
+        print(f"⏳ {limiter.rate_limited}x Rate-Limit (429), "
+              f"zuletzt {limiter.limit}/{limiter.max_in_flight} parallele Anfragen")
+    return incomplete
+
+
+def collect_batch_requests(input_files: List[Path], min_score: Optional[float] = None,
+                           videos: Optional[Dict[Path, Dict]] = None) -> List[Dict]:
+    """One message-batch request per chunk that parse_all_async would send."""
+    requests = []
+    for data_file in input_files:
+        video_data = load_video(data_file, videos)
+        title = video_data.get("title", "")
+        base_name = data_file.stem.replace('_study_data', '')
+        for chunk_num, chunk in enumerate(chunk_segments(video_data.get("segments", [])), 1):
+            if min_score is not None and teaching_score(chunk) < min_score:
+                continue
+            prompt = build_chunk_prompt(chunk, title)
+            requests.append({
+                "custom_id": batch_custom_id(base_name, f"c{chunk_num}"),
+                "key": cache_key(MODEL, MAX_TOKENS, prompt, CHUNK_INSTRUCTIONS),
+                "params": request_kwargs(MODEL, MAX_TOKENS, prompt, CHUNK_INSTRUCTIONS),
+            })
+    return requests
+
+
+def dedupe_existing(data_dir: Path):
+    """Apply dedupe_sections to *_parsed.json files written before it existed."""
+    removed = 0
+    for parsed_file in sorted(data_dir.glob("*_parsed.json")):
+        with open(parsed_file, encoding="utf-8") as f:
+            data = json.load(f)
+        print(f"📹 {data.get('title', parsed_file.stem)[:60]}")
+        parsed = assemble_parsed(data, data.get("ai_sections", []))
+        removed += parsed["duplicates_removed"]
+        with open(parsed_file, "w", encoding="utf-8") as f:
+            json.dump(parsed, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ {removed} doppelte Lehrabschnitte entfernt")
+
+
+def prefilter_report(data_dir: Path, thresholds: List[float]):
+    """
+    Recall of the prefilter against existing *_parsed.json files: which share
+    of the AI-found sections would still be found, and how many calls would be
+    skipped, at each threshold.
+    """
+    videos = []
+    for parsed_file in sorted(data_dir.glob("*_parsed.json")):
+        with open(parsed_file, encoding="utf-8") as f:
+            data = json.load(f)
+        chunks = chunk_segments(data.get("segments", []))
+        spans = [(chunk[0].get("start_ms", 0), chunk[-1].get("start_ms", 0), teaching_score(chunk))
+                 for chunk in chunks]
+        section_ms = [timestamp_ms(sec.get("timestamp", "")) for sec in data.get("ai_sections", [])]
+        videos.append((spans, section_ms))
+
+    if not videos:
+        print("❌ Keine *_parsed.json Dateien für den Recall-Report.")
+        return
+
+    print(f"📊 Prefilter-Recall über {len(videos)} geparste Videos:\n")
+    print("  Schwelle  übersprungen  Recall")
+    for threshold in thresholds:
+        skipped = total_chunks = kept = total_sections = 0
+        for spans, section_ms in videos:
+            total_chunks += len(spans)
+            skipped += sum(1 for _, _, score in spans if score < threshold)
+            for ms in section_ms:
+                total_sections += 1
+                # A section survives if any chunk containing it is still sent
+                if any(start <= ms <= end and score >= threshold for start, end, score in spans):
+                    kept += 1
+        recall = kept / total_sections if total_sections else 1.0
+        print(f"  {threshold:8.2f}  {skipped:4d}/{total_chunks:<4d}     {recall:6.1%}")
+
+
+def print_plan(input_files: List[Path]):
+    """Projected number of requests per video with token-budget packing."""
+    totals = {'calls': 0, 'tokens': 0, 'legacy_calls': 0, 'legacy_tokens': 0}
+    for data_file in input_files:
+        with open(data_file, encoding="utf-8") as f:
+            segments = json.load(f).get("segments", [])
+        plan = plan_calls(segments)
+        for key in totals:
+            totals[key] += plan[key]
+        print(f"  {data_file.stem[:60]}: {plan['calls']} Anfragen "
+              f"(bisher {plan['legacy_calls']}), ~{plan['tokens']} Tokens")
+
+    print(f"\n📊 {totals['calls']} Anfragen statt {totals['legacy_calls']}, "
+          f"~{totals['tokens']} statt ~{totals['legacy_tokens']} Transkript-Tokens "
+          f"(Budget {CHUNK_TOKEN_BUDGET}/Anfrage)")
+
+
 def main():
-    api_key = None
-    if len(sys.argv) > 1:
-        api_key = sys.argv[1]
-    else:
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
+    parser = argparse.ArgumentParser(description="AI-Parsing der Transkripte")
+    parser.add_argument("api_key", nargs="?", default=os.environ.get("ANTHROPIC_API_KEY"),
+                        help="Anthropic API key (default: $ANTHROPIC_API_KEY)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Send chunks of all videos concurrently")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Max. in-flight requests in --async mode (default: 8)")
+    parser.add_argument("--per-video", type=int, default=None,
+                        help="Max. in-flight requests per video in --async mode "
+                             "(default: half of --concurrency)")
+    parser.add_argument("--order", choices=ORDER_POLICIES, default="longest",
+                        help="Video order: most transcript first, oldest file first, "
+                             "or by name (default: longest)")
+    parser.add_argument("--plan", action="store_true",
+                        help="Only report projected calls and tokens, no API requests")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="Skip chunks with little teaching content (local score, no API)")
+    parser.add_argument("--prefilter-threshold", type=float, default=PREFILTER_THRESHOLD,
+                        help=f"Minimum teaching score per chunk (default: {PREFILTER_THRESHOLD})")
+    parser.add_argument("--prefilter-report", action="store_true",
+                        help="Report prefilter recall against existing *_parsed.json files")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Deduplicate sections of existing *_parsed.json files, no API requests")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit all chunks as message batches, then assemble from the cache")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between batch status checks (default: {POLL_INTERVAL:.0f})")
+    parser.add_argument("--fake", action="store_true",
+                        help="Use the local stand-in client (fake_anthropic), no API requests")
+    args = parser.parse_args()
+    api_key = args.api_key
+
+    if args.dedupe:
+        dedupe_existing(Path("study_bible_data"))
+        return
 
-    if not api_key:
+    if args.prefilter_report:
+        thresholds = sorted({0.1, 0.2, 0.3, 0.5, args.prefilter_threshold})
+        prefilter_report(Path("study_bible_data"), thresholds)
+        return
+
+    min_score = args.prefilter_threshold if args.prefilter else None
+
+    if not api_key and not args.plan and not args.fake:
         print("❌ Kein API-Schlüssel. Aufruf: python3 parse_transcript_with_ai.py YOUR_KEY")
         return
 
-    client = anthropic.Anthropic(api_key=api_key)
     data_dir = Path("study_bible_data")
 
     # Only process videos that have a corresponding *_enhanced.json
@@ -204,24 +839,55 @@ def main():
         print(f"✅ Alle {parsed_count} Genesis 1 Videos bereits geparst.")
         return
 
-    print(f"🤖 AI-Transkript-Parsing für {len(input_files)} Videos...\n")
-
-    for data_file in input_files:
-        with open(data_file, encoding="utf-8") as f:
-            video_data = json.load(f)
-
-        print(f"📹 {video_data.get('title', data_file.stem)[:60]}")
-
-        parsed = parse_transcript(video_data, client)
-
-        # Save as *_parsed.json — use same base name as input file for consistent matching
-        base_name = data_file.stem.replace('_study_data', '')
-        out_file = data_dir / f"{base_name}_parsed.json"
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(parsed, f, indent=2, ensure_ascii=False)
-
-        print(f"    💾 Gespeichert: {out_file.name}\n")
+    if args.plan:
+        print_plan(input_files)
+        return
 
+    print(f"🤖 AI-Transkript-Parsing für {len(input_files)} Videos...\n")
+    # Transcripts read for ordering or batching are reused by the parse
+    videos: Dict[Path, Dict] = {}
+    input_files = order_videos(input_files, args.order, videos)
+
+    if args.batch:
+        batch_client = fake_anthropic.FakeAnthropic() if args.fake else anthropic.Anthropic(api_key=api_key)
+        requests = collect_batch_requests(input_files, min_score, videos)
+        counts = run_batch(batch_client, requests, BATCH_STATE, "parse", args.poll_interval,
+                           validate=parse_sections_response)
+        print(f"📦 {counts['succeeded']} Chunks per Batch, {counts['cached']} aus dem Cache, "
+              f"{counts['failed']} fehlgeschlagen (werden direkt angefragt)\n")
+
+    if args.use_async or args.batch:
+        if args.fake:
+            client = fake_anthropic.AsyncFakeAnthropic()
+        else:
+            # Retries are handled by the limiter so 429s can shrink the concurrency
+            client = anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
+        incomplete = asyncio.run(parse_all_async(input_files, data_dir, client, args.concurrency,
+                                                 min_score, args.per_video, videos))
+    else:
+        client = fake_anthropic.FakeAnthropic() if args.fake else anthropic.Anthropic(api_key=api_key)
+        incomplete = []
+        for data_file in input_files:
+            video_data = videos.pop(data_file, None) or load_video(data_file)
+
+            print(f"📹 {video_data.get('title', data_file.stem)[:60]}")
+
+            journal = ChunkJournal(journal_path(data_file, data_dir))
+            parsed = parse_transcript(video_data, client, min_score, journal)
+            if parsed is None:
+                incomplete.append(data_file)
+                print()
+                continue
+            out_file = save_parsed(parsed, data_file, data_dir)
+
+            print(f"    💾 Gespeichert: {out_file.name}\n")
+
+    print(default_cache().report())
+    if incomplete:
+        print(f"⚠️  {len(incomplete)} Videos unvollständig (Journal bleibt): "
+              + ", ".join(data_file.stem.replace('_study_data', '') for data_file in incomplete))
+        print("➡️  Erneut ausführen, um die fehlgeschlagenen Chunks nachzuholen")
+        return
     print("✅ AI-Parsing abgeschlossen!")
     print("➡️  Nächster Schritt: python3 rebuild_database.py YOUR_KEY")
 
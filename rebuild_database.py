@@ -5,16 +5,33 @@ per-verse commentary by aggregating teachings from ALL videos about each verse.
 
 Primary input: *_parsed.json (from parse_transcript_with_ai.py)
 Fallback input: *_enhanced.json (legacy Python-regex extraction)
+
+Usage: python3 rebuild_database.py [api_key] [--workers N] [--token-budget N] [--force] [--fake]
 """
 
+import argparse
+import asyncio
+import hashlib
 import json
 import re
-import sys
 import os
+import sys
+import time
 from pathlib import Path
 from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 import anthropic
 
+import fake_anthropic
+from bible_refs import BOOK_IDS, ReferenceIndex, chapter_span, is_single_verse
+from llm_cache import cache_key, default_cache, request_kwargs
+from llm_limiter import CHARS_PER_TOKEN, AdaptiveLimiter, estimate_tokens, retry_delay
+from transcript import Transcript
+from video_corpus import VideoCorpus
+
+# Focus chapter of the MVP as a packed (start_id, end_id) range
+GENESIS_1 = chapter_span(BOOK_IDS['Genesis'], 1)
+
 
 def clean_title(title: str) -> str:
     """Convert a video title/filename to a short readable label."""
@@ -92,67 +109,56 @@ READING_PHRASES = [
 ]
 
 
-def rebuild_database(data_dir: Path) -> dict:
+def rebuild_database(data_dir: Path, corpus: VideoCorpus = None) -> dict:
     """
     Rebuild database from AI-parsed files (primary) or enhanced files (fallback).
 
     Parsed files (*_parsed.json) contain AI-identified teaching sections with
     pre-classified categories — far richer than the old Python regex approach.
+
+    corpus: the loaded video files; read from data_dir if not given.
     """
 
     db_path = data_dir / 'study_bible_database.json'
     with open(db_path) as f:
         db = json.load(f)
 
-    new_genesis1 = defaultdict(list)
-    new_all = defaultdict(list)
+    if corpus is None:
+        corpus = VideoCorpus(data_dir)
 
-    # Prefer *_parsed.json (AI-first), fall back to *_enhanced.json
-    parsed_files = sorted(data_dir.glob('*_parsed.json'))
-    enhanced_files = sorted(data_dir.glob('*_enhanced.json'))
+    new_all = defaultdict(list)
 
     # Determine which videos have parsed files so we skip their enhanced fallback
     parsed_video_ids = set()
 
-    # Build lookup: base_name -> enhanced file path for ai_summary retrieval
-    enhanced_by_base = {f.stem.replace('_enhanced', ''): f for f in enhanced_files}
-
-    if parsed_files:
-        print(f"   Found {len(parsed_files)} AI-parsed files (primary)")
-        for parsed_file in parsed_files:
-            with open(parsed_file) as f:
-                data = json.load(f)
-
-            video_id = data.get('video_id', '')
-            title = data.get('title', '')
-            video_file = data.get('video_file', '')
+    # Prefer *_parsed.json (AI-first), fall back to *_enhanced.json
+    if corpus.parsed:
+        print(f"   Found {len(corpus.parsed)} AI-parsed files (primary)")
+        for record in corpus.parsed:
+            video_id = record.video_id
+            title = record.title
+            video_file = record.video_file
             parsed_video_ids.add(video_id)
 
             # Build thumbnail URL from CRN (imgix pattern: {crn}.jpg)
             crn_match = re.search(r'_(\d{5,})(?:\.mp4)?$', video_id or title or '')
             thumb = f"https://bibeltv.imgix.net/{crn_match.group(1)}.jpg" if crn_match else None
 
-            # Load ai_summary from corresponding enhanced file if available
-            base_name = parsed_file.stem.replace('_parsed', '')
+            # Take ai_summary from the corresponding enhanced file if available
+            base_name = record.path.stem.replace('_parsed', '')
             ai_summary = None
-            if base_name in enhanced_by_base:
-                try:
-                    with open(enhanced_by_base[base_name]) as ef:
-                        edata = json.load(ef)
-                    ai_summary = edata.get('ai_summary', '')
-                    # Strip markdown heading if present
-                    if ai_summary and ai_summary.startswith('# '):
-                        ai_summary = ai_summary.split('\n', 1)[-1].strip()
-                except Exception:
-                    pass
-
-            # Extract speaker/organization info from transcript and summary
-            segments = data.get('segments', [])
-            speaker_info = extract_speaker_info(segments, ai_summary)
+            if base_name in corpus.enhanced_by_base:
+                ai_summary = corpus.enhanced_by_base[base_name].ai_summary
+                # Strip markdown heading if present
+                if ai_summary and ai_summary.startswith('# '):
+                    ai_summary = ai_summary.split('\n', 1)[-1].strip()
+
+            # Extract speaker/organization info from transcript opening and summary
+            speaker_info = extract_speaker_info(record.opening, ai_summary)
 
             # verse_sections: {verse_ref: [section, ...]}
             # Each section: {timestamp, verse_reference, category, quality, content}
-            verse_sections = data.get('verse_sections', {})
+            verse_sections = record.verse_sections or {}
             for verse_ref, sections in verse_sections.items():
                 # Build mention-style entries compatible with VideoList component
                 mentions = []
@@ -188,31 +194,25 @@ def rebuild_database(data_dir: Path) -> dict:
                     'mentions': mentions,
                 }
 
-                if 'Genesis 1' in verse_ref or '1. Mose 1' in verse_ref:
-                    new_genesis1[verse_ref].append(video_entry)
                 new_all[verse_ref].append(video_entry)
 
     # Fallback: load enhanced files for any video without a parsed file
-    fallback_files = [f for f in enhanced_files
-                      if not any(f.stem.startswith(vid) for vid in parsed_video_ids)]
-    if fallback_files:
-        print(f"   Found {len(fallback_files)} legacy enhanced files (fallback)")
-        for enhanced_file in fallback_files:
-            with open(enhanced_file) as f:
-                data = json.load(f)
-
-            video_id = data.get('video_id', '')
-            title = data.get('title', '')
-            video_file = data.get('video_file', '')
+    fallback_records = [r for r in corpus.enhanced
+                        if not any(r.path.stem.startswith(vid) for vid in parsed_video_ids)]
+    if fallback_records:
+        print(f"   Found {len(fallback_records)} legacy enhanced files (fallback)")
+        for record in fallback_records:
+            video_id = record.video_id
+            title = record.title
+            video_file = record.video_file
             crn_match = re.search(r'_(\d{5,})(?:\.mp4)?$', video_id or title or '')
             thumb = f"https://bibeltv.imgix.net/{crn_match.group(1)}.jpg" if crn_match else None
 
             # Extract speaker info from enhanced file
-            ai_summary = data.get('ai_summary', '')
-            segments = data.get('segments', [])
-            speaker_info = extract_speaker_info(segments, ai_summary)
+            ai_summary = record.ai_summary
+            speaker_info = extract_speaker_info(record.opening, ai_summary)
 
-            for verse_ref, mentions in data.get('verse_mentions', {}).items():
+            for verse_ref, mentions in record.verse_mentions.items():
                 quality_mentions = []
                 for mention in mentions:
                     meaningfulness = mention.get('meaningfulness')
@@ -239,11 +239,13 @@ def rebuild_database(data_dir: Path) -> dict:
                     'organization': speaker_info.get('organization'),
                     'mentions': quality_mentions,
                 }
-                if 'Genesis 1' in verse_ref or '1. Mose 1' in verse_ref:
-                    new_genesis1[verse_ref].append(video_entry)
                 new_all[verse_ref].append(video_entry)
 
-    db['verses']['genesis1'] = dict(new_genesis1)
+    # Genesis 1 partition: every reference whose range overlaps the chapter
+    genesis1_refs = ReferenceIndex.from_keys(new_all).keys_in(*GENESIS_1)
+    new_genesis1 = {k: v for k, v in new_all.items() if k in genesis1_refs}
+
+    db['verses']['genesis1'] = new_genesis1
     db['verses']['all'] = dict(new_all)
     db['metadata']['genesis1_verses'] = len(new_genesis1)
     db['metadata']['total_verse_refs'] = len(new_all)
@@ -255,71 +257,209 @@ def rebuild_database(data_dir: Path) -> dict:
     return db
 
 
-def get_teaching_block(segments: list, timestamp: str, after: int = 60) -> list:
+def get_teaching_block(transcript: Transcript, timestamp: str, after: int = 60) -> list:
     """
     Get the teaching block that follows a verse mention.
 
     Preacher cites a verse, THEN teaches about it.
     Grab the 60 segments AFTER the citation — that's the actual teaching.
     """
-    for idx, seg in enumerate(segments):
-        if seg.get('start', '') >= timestamp:
-            # A few before for context, then lots after for the teaching
-            start = max(0, idx - 2)
-            end = min(len(segments), idx + after)
-            return segments[start:end]
-    return []
+    # A few before for context, then lots after for the teaching
+    return transcript.after(timestamp, after, before=2)
+
+
+# The six study-bible categories, shared by the synthesis and reduce
+# instructions. Together with the rules and the worked example it keeps both
+# system blocks above the provider's 1024-token minimum for prompt caching.
+CATEGORY_GUIDE = """KATEGORIEN:
+- "textanalyse": Beobachtungen am Text selbst — Bedeutung hebräischer oder griechischer Wörter, Satzbau, Wiederholungen, Gliederung des Abschnitts, Unterschiede zwischen Übersetzungen.
+- "historisch_kulturell": Hintergrund, den ein Sprecher erläutert — altorientalische Vorstellungen und Mythen, Sitten, Geografie, Entstehungszeit, Situation der ersten Leser.
+- "theologisch": Aussagen über Gott, den Menschen, Sünde, Heil und Schöpfung, die ein Sprecher aus dem Text ableitet.
+- "christologisch": Verbindungen zu Jesus Christus und zum Neuen Testament, die ein Sprecher aufzeigt — Zitate, Anspielungen, Erfüllung, Typologie.
+- "anwendung": Was der Text laut einem Sprecher für das Leben heute bedeutet, möglichst konkret und mit seinem Beispiel.
+- "illustrationen": Geschichten, Erlebnisse, Vergleiche und Bilder, mit denen ein Sprecher den Text anschaulich macht.
+Passt ein Punkt in mehrere Kategorien, ordne ihn dort ein, wo sein Schwerpunkt liegt, und nur dort.
+
+REGELN FÜR DIE PUNKTE:
+- Jeder Punkt ist eine eigenständige Aussage in 1-2 Sätzen, verständlich ohne das Transkript.
+- Jeder Punkt hat genau eine Quelle. Sagen mehrere Sprecher dasselbe, behalte die klarste Fassung und nenne deren Quelle.
+- Formuliere sachlich in der dritten Person, ohne "Der Sprecher sagt" und ohne Wertung.
+- Keine Aussage erfinden, verschärfen oder mit eigenem Wissen ergänzen; im Zweifel weglassen.
+- Querverweise ("cross_references") nur, wenn ein Sprecher die Stelle nennt oder eindeutig zitiert, im Format "Buch Kapitel:Vers".
+- Die "summary" fasst in 1-2 Sätzen zusammen, worum es in der Textstelle laut den Lehrern geht, ohne Quellenangabe.
+
+BEISPIEL FÜR DUPLIKATE:
+Quelle "Schöpfung 2": "Gott sagt nicht: Lasst uns das Licht machen. Er sagt: Es werde Licht — und es wird."
+Quelle "Genesis kompakt": "Bei Gott fallen Wort und Tat zusammen. Er spricht, und es ist da."
+Beide meinen dasselbe. Daraus wird EIN Punkt in "theologisch": {"text": "Bei Gott fallen Wort und Tat zusammen: Er spricht, und was er sagt, geschieht.", "source": "Genesis kompakt"}
+Sagt eine dritte Quelle dazu etwas Neues, etwa dass Johannes 1 dieses schaffende Wort auf Jesus bezieht, wird das ein eigener Punkt in "christologisch" mit ihrer Quelle."""
+
+# Static part of the synthesis prompt. Sent as a cached system block so only
+# the verse, source count and speaker passages are new input on each call.
+SYNTHESIS_INSTRUCTIONS = """Du bist Kurator eines Video-Studienbibel-Projekts. Deine Aufgabe ist es, die Aussagen verschiedener Bibel-Lehrer zu einer Textstelle zu strukturieren — so wie es in Studienbibeln und Kommentaren üblich ist.
+
+Die BIBELSTELLE, die Anzahl der QUELLEN und die INHALTE DER SPRECHER folgen in der Nachricht.
 
+KRITISCH: Verwende NUR was tatsächlich in den Transkripten steht. Kein eigenes Wissen ergänzen.
+Quellenangabe: Nutze den Kurztitel genau so wie er in den ===[Titel]=== Headers steht.
 
-def synthesize_verse_commentary(verse_ref: str, all_video_data: list,
-                                 client: anthropic.Anthropic,
-                                 verse_video_entries: list = None) -> dict:
-    """
-    Synthesize commentary for a verse from ALL videos that discuss it.
+HINWEIS: Manche Quellen sind bereits nach Kategorien gegliedert (z.B. [TEXTANALYSE], [THEOLOGISCH]).
+Nutze diese Gliederung als Orientierung. Kombiniere und dedupliziere gleichartige Aussagen verschiedener Sprecher.
 
-    When AI-parsed data is available (*_parsed.json), sections already have
-    category and content extracted — synthesis only needs to deduplicate and
-    combine insights across sources.
+Ordne die Aussagen der Sprecher nach diesen Studienbibel-Kategorien.
+Lass eine Kategorie weg wenn wirklich nichts Passendes im Transkript steht.
+Lieber wenige, tiefgründige Punkte als viele oberflächliche.
 
-    Fallback: raw transcript segment extraction from *_enhanced.json.
+""" + CATEGORY_GUIDE + """
 
-    verse_video_entries: List of video entries from db['verses']['genesis1'][verse_ref]
-                         containing thumb, speaker, mentions with timestamps, etc.
-    """
+ANTWORTFORMAT (nur JSON):
+{
+  "summary": "1-2 Sätze: Was ist das Kernthema dieser Textstelle laut den Lehrern?",
+  "categories": {
+    "textanalyse": [
+      {"text": "Spezifische Beobachtung zum Text — z.B. Wortbedeutung, Satzbau, Struktur", "source": "Kurztitel"}
+    ],
+    "historisch_kulturell": [
+      {"text": "Historischer oder kultureller Hintergrund, den ein Sprecher erläutert", "source": "Kurztitel"}
+    ],
+    "theologisch": [
+      {"text": "Theologische Einsicht oder Lehraussage eines Sprechers", "source": "Kurztitel"}
+    ],
+    "christologisch": [
+      {"text": "Verbindung zu Jesus Christus oder zum Neuen Testament, die ein Sprecher aufzeigt", "source": "Kurztitel"}
+    ],
+    "anwendung": [
+      {"text": "Konkrete Lebensanwendung mit Beispiel, die ein Sprecher nennt", "source": "Kurztitel"}
+    ],
+    "illustrationen": [
+      {"text": "Geschichte, Analogie oder Bild, das ein Sprecher zur Veranschaulichung verwendet", "source": "Kurztitel"}
+    ]
+  },
+  "cross_references": ["Johannes 1:1", "Hebräer 11:3"],
+  "source_count": <Anzahl der QUELLEN>
+}
+
+BEISPIEL für einen Punkt:
+Quelle ===[Schöpfung 3]=== sagt: "Im Hebräischen steht da bara, und dieses Wort hat im ganzen Alten Testament immer nur Gott als Subjekt."
+Punkt in "textanalyse": {"text": "Das hebräische Verb bara (schaffen) hat im Alten Testament immer Gott als Subjekt; es bezeichnet ein Schaffen, das nur Gott zukommt.", "source": "Schöpfung 3"}
+
+Wenn gar kein verwertbarer Inhalt vorhanden ist, gib {} zurück.
+Alles auf Deutsch. Nur gültiges JSON."""
+
+SYNTHESIS_MODEL = "claude-sonnet-4-5-20250929"
+SYNTHESIS_MAX_TOKENS = 3000
+SYNTHESIS_ATTEMPTS = 3          # per verse: API errors and unparseable answers
+SYNTHESIS_JOURNAL = 'synthesis_journal.jsonl'
+SYNTHESIS_VERSION = 1           # bump when prompt handling or post-processing changes
+SYNTHESIS_TOKEN_BUDGET = 6000   # max estimated input tokens per call before map-reduce kicks in
+
+# Reduce step of map-reduce synthesis: merges partial commentaries (each a
+# synthesis answer for one group of sources) into the final commentary.
+REDUCE_INSTRUCTIONS = """Du bist Kurator eines Video-Studienbibel-Projekts. Zu einer Bibelstelle wurden die Aussagen verschiedener Bibel-Lehrer gruppenweise zu TEILKOMMENTAREN strukturiert. Führe sie zu einem einzigen Kommentar zusammen.
+
+Die BIBELSTELLE und die TEILKOMMENTARE (je ein JSON-Objekt) folgen in der Nachricht.
+
+KRITISCH: Verwende NUR was in den Teilkommentaren steht. Kein eigenes Wissen ergänzen.
+Quellenangabe: Übernimm "source" jedes Punktes unverändert.
+
+Kombiniere und dedupliziere gleichartige Aussagen über alle Teile hinweg; bei Duplikaten behalte den aussagekräftigsten Punkt.
+Behalte die Kategorien bei (textanalyse, historisch_kulturell, theologisch, christologisch, anwendung, illustrationen) und lass leere weg.
+Lieber wenige, tiefgründige Punkte als viele oberflächliche.
+Ein Punkt, der in einem Teilkommentar falsch eingeordnet ist, darf in die passende Kategorie wandern.
+Die "summary" schreibst du neu, so dass sie alle Teile zusammenfasst; "cross_references" ist die Vereinigung aller Teile ohne Duplikate.
+
+""" + CATEGORY_GUIDE + """
+
+BEISPIEL FÜR DAS ZUSAMMENFÜHREN:
+Teilkommentar 1, "theologisch": {"text": "Gott erschafft die Welt durch sein Wort.", "source": "Schöpfung 2"}
+Teilkommentar 2, "theologisch": {"text": "Gottes Wort genügt: Was er sagt, geschieht sofort.", "source": "Genesis kompakt"}
+Teilkommentar 2, "anwendung": {"text": "Wer Gottes Zusagen hört, darf sich auf sie verlassen wie auf das 'Es werde Licht'.", "source": "Genesis kompakt"}
+Ergebnis: in "theologisch" nur der aussagekräftigere der beiden gleichartigen Punkte ({"text": "Gottes Wort genügt: Was er sagt, geschieht sofort.", "source": "Genesis kompakt"}), in "anwendung" der Punkt unverändert. Die Quellen werden nie zusammengelegt oder umbenannt.
+
+ANTWORTFORMAT (nur JSON, wie die Teilkommentare):
+{
+  "summary": "1-2 Sätze: Was ist das Kernthema dieser Textstelle laut den Lehrern?",
+  "categories": {
+    "theologisch": [
+      {"text": "...", "source": "Kurztitel"}
+    ]
+  },
+  "cross_references": ["Johannes 1:1"]
+}
+
+Alles auf Deutsch. Nur gültiges JSON."""
 
-    all_passages = []
-    # Build metadata lookup: short_key -> {video_id, thumb, speaker, speaker_avatar, timestamp_ms}
-    source_metadata = {}
-
-    for video_data in all_video_data:
-        title = video_data.get('title', '')
-        short_key = clean_title(title)
-
-        # Build metadata for this video source
-        video_id = video_data.get('video_id', '')
-        crn_match = re.search(r'_(\d{5,})(?:\.mp4)?$', video_id or title or '')
-        thumb = f"https://bibeltv.imgix.net/{crn_match.group(1)}.jpg" if crn_match else None
-
-        # Get timestamp from the first mention for this verse
-        timestamp_ms = None
-        if verse_video_entries:
-            for entry in verse_video_entries:
-                if clean_title(entry.get('title', '')) == short_key:
-                    mentions = entry.get('mentions', [])
-                    if mentions:
-                        timestamp_ms = mentions[0].get('timestamp_ms') or mentions[0].get('clip_start_ms')
-                    break
 
-        source_metadata[short_key] = {
-            'video_id': video_id,
-            'thumb': thumb,
-            'speaker': video_data.get('speaker'),
-            'speaker_avatar': video_data.get('speaker_avatar'),
-            'timestamp_ms': timestamp_ms,
+class VerseCorpus:
+    """
+    One-time inverted index over the loaded videos for verse synthesis.
+
+    Maps each verse reference to the videos that contribute to it — through
+    AI-parsed verse_sections or, failing those, legacy verse_mentions — and
+    holds each video's short title, thumbnail and speaker, computed once.
+    First-mention timestamps per (verse, video) come from the database
+    entries. Assembling a verse's synthesis input only touches its own
+    contributors, however many unrelated videos the corpus holds; raw
+    segments are fetched from the VideoCorpus only for the legacy fallback.
+    """
+
+    def __init__(self, corpus: VideoCorpus, verse_entries: dict):
+        self.corpus = corpus
+        self.videos = []
+        self.by_verse = defaultdict(list)
+        self.by_key = {}   # short_key -> video (last one wins, as titles may repeat)
+        for record in corpus.videos():
+            title = record.title
+            video_id = record.video_id
+            crn_match = re.search(r'_(\d{5,})(?:\.mp4)?$', video_id or title or '')
+            video = {
+                'record': record,
+                'title': title,
+                'short_key': clean_title(title),
+                'video_id': video_id,
+                'thumb': f"https://bibeltv.imgix.net/{crn_match.group(1)}.jpg" if crn_match else None,
+            }
+            refs = {ref for ref, secs in (record.verse_sections or {}).items() if secs}
+            refs |= {ref for ref, mentions in record.verse_mentions.items() if mentions}
+            for ref in refs:
+                self.by_verse[ref].append(video)
+            self.videos.append(video)
+            self.by_key[video['short_key']] = video
+
+        # (verse_ref, short_key) -> timestamp of the first mention in the database entry
+        self.first_mention = {}
+        for verse_ref, entries in verse_entries.items():
+            for entry in entries:
+                key = (verse_ref, clean_title(entry.get('title', '')))
+                if key in self.first_mention:
+                    continue
+                mentions = entry.get('mentions', [])
+                self.first_mention[key] = (mentions[0].get('timestamp_ms') or
+                                           mentions[0].get('clip_start_ms')) if mentions else None
+
+    def contributors(self, verse_ref: str) -> list:
+        """Videos with sections or mentions for verse_ref, in corpus order."""
+        return self.by_verse.get(verse_ref, [])
+
+    def source_metadata(self, verse_ref: str, short_key: str) -> dict:
+        """video_id, thumb, speaker, speaker_avatar and first-mention timestamp_ms for a cited source."""
+        video = self.by_key.get(short_key)
+        if video is None:
+            return None
+        return {
+            'video_id': video['video_id'],
+            'thumb': video['thumb'],
+            'speaker': video['record'].speaker,
+            'speaker_avatar': video['record'].speaker_avatar,
+            'timestamp_ms': self.first_mention.get((verse_ref, short_key)),
         }
 
+    def passage(self, verse_ref: str, video: dict) -> dict:
+        """The video's synthesis input for verse_ref, or None if too thin."""
+        record = video['record']
+
         # --- Primary: AI-parsed sections ---
-        verse_sections = video_data.get('verse_sections', {}).get(verse_ref, [])
+        verse_sections = (record.verse_sections or {}).get(verse_ref, [])
         if verse_sections:
             # Build formatted text grouped by category
             by_category: dict = {}
@@ -329,30 +469,28 @@ def synthesize_verse_commentary(verse_ref: str, all_video_data: list,
                 if content and len(content) > 40:
                     by_category.setdefault(cat, []).append(content)
 
-            if by_category:
-                lines = []
-                for cat, contents in by_category.items():
-                    lines.append(f"[{cat.upper()}]")
-                    lines.extend(f"- {c}" for c in contents)
-                all_passages.append({
-                    'video_title': title,
-                    'text': '\n'.join(lines),
-                    'is_parsed': True,
-                })
-            continue
+            if not by_category:
+                return None
+            lines = []
+            for cat, contents in by_category.items():
+                lines.append(f"[{cat.upper()}]")
+                lines.extend(f"- {c}" for c in contents)
+            return {
+                'video_title': video['title'],
+                'text': '\n'.join(lines),
+                'is_parsed': True,
+            }
 
         # --- Fallback: raw transcript segment extraction ---
-        mentions = video_data.get('verse_mentions', {}).get(verse_ref, [])
-        if not mentions:
-            continue
-
-        segments = video_data.get('segments', [])
+        mentions = record.verse_mentions.get(verse_ref, [])
+        transcript = self.corpus.transcript(record)
+        segments = transcript.segments
         seen_indices = set()
         video_blocks = []
 
         for mention in mentions:
             ts = mention.get('timestamp', '')
-            pos = next((idx for idx, s in enumerate(segments) if s.get('start', '') >= ts), None)
+            pos = transcript.index_after(ts)
             if pos is None:
                 continue
             start = max(0, pos - 2)
@@ -366,202 +504,619 @@ def synthesize_verse_commentary(verse_ref: str, all_video_data: list,
         if video_blocks:
             block_text = ' '.join(s['text'] for s in video_blocks)
             if len(block_text) > 200:
-                all_passages.append({
-                    'video_title': title,
+                return {
+                    'video_title': video['title'],
                     'text': '\n'.join(f"[{s['start']}] {s['text']}" for s in video_blocks),
                     'is_parsed': False,
-                })
+                }
+        return None
+
+
+class SynthesisJournal:
+    """
+    Append-only record of synthesized verses (synthesis_journal.jsonl).
+
+    Each line holds one verse's parsed model answer, keyed by the verse and
+    its input fingerprint, and is written as soon as the verse completes.
+    If a run dies half-way, the next one replays these and only sends the
+    missing verses; synthesize_all_verses() removes the journal once the
+    database is saved with every verse done.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self.replayed = 0
+        if not path.exists():
+            return
+        text = path.read_text(encoding='utf-8')
+        if text and not text.endswith('\n'):
+            # Torn last line from a crash mid-write: drop it before appending again
+            text = text[:text.rfind('\n') + 1]
+            path.write_text(text, encoding='utf-8')
+        for line in text.splitlines():
+            entry = json.loads(line)
+            self.entries[entry['verse']] = entry['result']
+
+    @staticmethod
+    def entry_id(verse_ref: str, fingerprint: str) -> str:
+        return f"{verse_ref}:{fingerprint}"
+
+    def get(self, entry_id: str) -> Optional[dict]:
+        result = self.entries.get(entry_id)
+        if result is not None:
+            self.replayed += 1
+        return result
+
+    def record(self, entry_id: str, result: dict):
+        self.entries[entry_id] = result
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'verse': entry_id, 'result': result}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def build_synthesis_prompt(verse_ref: str, corpus: VerseCorpus) -> Optional[Tuple[str, list]]:
+    """
+    The synthesis prompt for a verse and the passages it was built from, or
+    None if no video says enough about the verse.
+
+    When AI-parsed data is available (*_parsed.json), sections already have
+    category and content extracted — synthesis only needs to deduplicate and
+    combine insights across sources.
+
+    Fallback: raw transcript segment extraction from *_enhanced.json.
+    """
+
+    all_passages = []
+    for video in corpus.contributors(verse_ref):
+        passage = corpus.passage(verse_ref, video)
+        if passage:
+            all_passages.append(passage)
 
     if not all_passages:
-        return {}
+        return None
+    return format_synthesis_prompt(verse_ref, all_passages), all_passages
+
 
+def passage_header(passage: dict) -> str:
+    return f"\n\n=== [{clean_title(passage['video_title'])}] ===\n"
+
+
+def format_synthesis_prompt(verse_ref: str, passages: list) -> str:
     # Format for prompt — use clean short titles as keys for attribution
     formatted = ""
-    title_map = {}  # short_key -> full title
-    for source in all_passages:
-        short_key = clean_title(source['video_title'])
-        title_map[short_key] = source['video_title']
-        formatted += f"\n\n=== [{short_key}] ===\n"
+    for source in passages:
+        formatted += passage_header(source)
         formatted += source['text']
 
-    prompt = f"""Du bist Kurator eines Video-Studienbibel-Projekts. Deine Aufgabe ist es, die Aussagen verschiedener Bibel-Lehrer zu einer Textstelle zu strukturieren — so wie es in Studienbibeln und Kommentaren üblich ist.
+    return f"""BIBELSTELLE: {verse_ref}
+QUELLEN: {len(passages)} verschiedene Lehrer/Videos
 
-BIBELSTELLE: {verse_ref}
-QUELLEN: {len(all_passages)} verschiedene Lehrer/Videos
+INHALTE DER SPRECHER:
+{formatted}"""
+
+
+def split_passage(passage: dict, budget: int) -> list:
+    """A passage cut at line breaks into pieces of at most `budget` tokens each."""
+    pieces, lines, used = [], [], 0
+    for line in passage['text'].split('\n'):
+        # A single line beyond the budget (rare) is cut hard
+        while estimate_tokens(line) > budget:
+            if lines:
+                pieces.append(lines)
+                lines, used = [], 0
+            cut = int(budget * CHARS_PER_TOKEN)
+            pieces.append([line[:cut]])
+            line = line[cut:]
+        cost = estimate_tokens(line + '\n')
+        if lines and used + cost > budget:
+            pieces.append(lines)
+            lines, used = [], 0
+        lines.append(line)
+        used += cost
+    if lines:
+        pieces.append(lines)
+    return [dict(passage, text='\n'.join(piece)) for piece in pieces]
+
+
+def group_passages(verse_ref: str, passages: list, budget: int) -> List[list]:
+    """
+    Pack a verse's passages, in order, into groups whose synthesis prompt
+    stays within `budget` estimated tokens. A passage too large for any
+    group on its own is split first, keeping its source header.
+    """
+    base = estimate_tokens(format_synthesis_prompt(verse_ref, []))
+    room = max(1, budget - base)
+    groups, group, used = [], [], 0
+    for passage in passages:
+        header = estimate_tokens(passage_header(passage))
+        for piece in split_passage(passage, max(1, room - header)):
+            cost = header + estimate_tokens(piece['text'])
+            if group and used + cost > room:
+                groups.append(group)
+                group, used = [], 0
+            group.append(piece)
+            used += cost
+    if group:
+        groups.append(group)
+    return groups
+
+
+def format_reduce_prompt(verse_ref: str, partials: List[dict]) -> str:
+    parts = ""
+    for i, partial in enumerate(partials, 1):
+        content = {k: partial[k] for k in ('summary', 'categories', 'cross_references') if k in partial}
+        parts += f"\n\n=== TEIL {i} ===\n{json.dumps(content, ensure_ascii=False)}"
+    return f"""BIBELSTELLE: {verse_ref}
+TEILKOMMENTARE: {len(partials)}
+{parts}"""
+
+
+def group_partials(verse_ref: str, partials: List[dict], budget: int) -> List[List[dict]]:
+    """
+    Pack partial commentaries into reduce groups within `budget` tokens.
+    Every group but possibly the last gets at least two partials, so each
+    reduce round shrinks the list even if single partials are large.
+    """
+    groups, group = [], []
+    for partial in partials:
+        if len(group) >= 2 and estimate_tokens(format_reduce_prompt(verse_ref, group + [partial])) > budget:
+            groups.append(group)
+            group = []
+        group.append(partial)
+    if group:
+        groups.append(group)
+    return groups
+
+
+def synthesis_fingerprint(key: str, budget: Optional[int] = None) -> str:
+    """
+    Fingerprint of a verse's synthesis input: the request's cache key (model,
+    instructions and the prompt with all formatted source passages) plus
+    SYNTHESIS_VERSION — and the token budget if the verse went through
+    map-reduce, since that decides the grouping. Stored in the commentary;
+    an unchanged fingerprint means the commentary can be reused without
+    asking the model again.
+    """
+    plan = f"{SYNTHESIS_VERSION}:{budget}:{key}" if budget else f"{SYNTHESIS_VERSION}:{key}"
+    return hashlib.sha256(plan.encode('utf-8')).hexdigest()[:16]
 
-KRITISCH: Verwende NUR was tatsächlich in den Transkripten steht. Kein eigenes Wissen ergänzen.
-Quellenangabe: Nutze den Kurztitel genau so wie er in den ===[Titel]=== Headers steht.
 
-HINWEIS: Manche Quellen sind bereits nach Kategorien gegliedert (z.B. [TEXTANALYSE], [THEOLOGISCH]).
-Nutze diese Gliederung als Orientierung. Kombiniere und dedupliziere gleichartige Aussagen verschiedener Sprecher.
+def reuse_commentary(verse_ref: str, fingerprint: str, journal: Optional['SynthesisJournal'],
+                     previous: Optional[dict]) -> Optional[dict]:
+    """A result for exactly this input: `previous` if its fingerprint matches, else a journal entry."""
+    if previous and previous.get('fingerprint') == fingerprint:
+        return previous
+    return journal.get(SynthesisJournal.entry_id(verse_ref, fingerprint)) if journal else None
 
-INHALTE DER SPRECHER:
-{formatted}
 
-Ordne die Aussagen der Sprecher nach diesen Studienbibel-Kategorien.
-Lass eine Kategorie weg wenn wirklich nichts Passendes im Transkript steht.
-Lieber wenige, tiefgründige Punkte als viele oberflächliche.
+def parse_commentary(response_text: str) -> dict:
+    """The JSON object in a synthesis answer; ValueError if there is none."""
+    response_text = response_text.strip()
+    if response_text.startswith('```'):
+        response_text = response_text.split('```')[1]
+        if response_text.startswith('json'):
+            response_text = response_text[4:]
 
-ANTWORTFORMAT (nur JSON):
-{{
-  "summary": "1-2 Sätze: Was ist das Kernthema dieser Textstelle laut den Lehrern?",
-  "categories": {{
-    "textanalyse": [
-      {{"text": "Spezifische Beobachtung zum Text — z.B. Wortbedeutung, Satzbau, Struktur", "source": "Kurztitel"}}
-    ],
-    "historisch_kulturell": [
-      {{"text": "Historischer oder kultureller Hintergrund, den ein Sprecher erläutert", "source": "Kurztitel"}}
-    ],
-    "theologisch": [
-      {{"text": "Theologische Einsicht oder Lehraussage eines Sprechers", "source": "Kurztitel"}}
-    ],
-    "christologisch": [
-      {{"text": "Verbindung zu Jesus Christus oder zum Neuen Testament, die ein Sprecher aufzeigt", "source": "Kurztitel"}}
-    ],
-    "anwendung": [
-      {{"text": "Konkrete Lebensanwendung mit Beispiel, die ein Sprecher nennt", "source": "Kurztitel"}}
-    ],
-    "illustrationen": [
-      {{"text": "Geschichte, Analogie oder Bild, das ein Sprecher zur Veranschaulichung verwendet", "source": "Kurztitel"}}
-    ]
-  }},
-  "cross_references": ["Johannes 1:1", "Hebräer 11:3"],
-  "source_count": {len(all_passages)}
-}}
+    # Robust JSON parsing — transcript quotes often break raw JSON
+    try:
+        result = json.loads(response_text)
+    except json.JSONDecodeError:
+        # Try to extract JSON object even if trailing content exists
+        match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if not match:
+            raise ValueError('no JSON object in response')
+        result = json.loads(match.group())
+    if not isinstance(result, dict):
+        raise ValueError(f'expected a JSON object, got {type(result).__name__}')
+    return result
 
-Wenn gar kein verwertbarer Inhalt vorhanden ist, gib {{}} zurück.
-Alles auf Deutsch. Nur gültiges JSON."""
 
-    try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=3000,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        response_text = message.content[0].text.strip()
-        if response_text.startswith('```'):
-            response_text = response_text.split('```')[1]
-            if response_text.startswith('json'):
-                response_text = response_text[4:]
-
-        # Robust JSON parsing — transcript quotes often break raw JSON
+def finish_commentary(verse_ref: str, corpus: VerseCorpus, result: dict,
+                      all_passages: list, fingerprint: str) -> dict:
+    """Add source counts, per-item video metadata and the input fingerprint to a synthesis answer."""
+    if result:
+        result['source_count'] = len(all_passages)
+    result['source_videos'] = [clean_title(s['video_title']) for s in all_passages]
+
+    # Enrich each category item with video metadata for UI rendering
+    if 'categories' in result:
+        for cat_key, items in result['categories'].items():
+            for item in items:
+                meta = corpus.source_metadata(verse_ref, item.get('source', ''))
+                if meta:
+                    item['video_id'] = meta.get('video_id')
+                    item['thumb'] = meta.get('thumb')
+                    item['speaker'] = meta.get('speaker')
+                    item['speaker_avatar'] = meta.get('speaker_avatar')
+                    item['timestamp_ms'] = meta.get('timestamp_ms')
+    result['fingerprint'] = fingerprint
+    return result
+
+
+def request_commentary(client: anthropic.Anthropic, prompt: str, instructions: str, label: str,
+                       attempts: int = SYNTHESIS_ATTEMPTS) -> Optional[dict]:
+    """
+    One synthesis-stage call, answered from the LLM cache when possible.
+
+    API errors and unparseable answers are retried up to `attempts` times;
+    only a parseable answer is cached (an unparseable cached one is dropped
+    and requested again). None if all failed.
+    """
+    cache = default_cache()
+    key = cache_key(SYNTHESIS_MODEL, SYNTHESIS_MAX_TOKENS, prompt, instructions)
+    text = cache.get(key, validate=parse_commentary)
+    for attempt in range(1, attempts + 1):
+        if text is None:
+            try:
+                message = client.messages.create(**request_kwargs(
+                    SYNTHESIS_MODEL, SYNTHESIS_MAX_TOKENS, prompt, instructions))
+            except Exception as e:
+                print(f"      ⚠️  Synthesis error for {label} ({attempt}/{attempts}): {e}")
+                if attempt < attempts:
+                    time.sleep(retry_delay(e, attempt))
+                continue
+            cache.record_usage("synthesis", message)
+            text = message.content[0].text
         try:
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            # Try to extract JSON object even if trailing content exists
-            match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if match:
+            result = parse_commentary(text)
+        except ValueError as e:
+            print(f"      ⚠️  Synthesis answer for {label} unusable ({attempt}/{attempts}): {e}")
+            text = None
+            continue
+        cache.put(key, text)
+        return result
+    return None
+
+
+async def request_commentary_async(client: anthropic.AsyncAnthropic, limiter: AdaptiveLimiter,
+                                   prompt: str, instructions: str, label: str,
+                                   attempts: int = SYNTHESIS_ATTEMPTS,
+                                   max_rate_limited: int = 6) -> Optional[dict]:
+    """Async request_commentary(): 429s back off through the shared limiter."""
+    cache = default_cache()
+    key = cache_key(SYNTHESIS_MODEL, SYNTHESIS_MAX_TOKENS, prompt, instructions)
+
+    # Cache hits never take a slot from the limiter
+    text = cache.get(key, validate=parse_commentary)
+    failures = rate_limited = 0
+    while failures < attempts and rate_limited < max_rate_limited:
+        if text is None:
+            error = None
+            async with limiter:
                 try:
-                    result = json.loads(match.group())
-                except Exception:
-                    return {}
-            else:
-                return {}
-
-        result['source_videos'] = [clean_title(s['video_title']) for s in all_passages]
-
-        # Enrich each category item with video metadata for UI rendering
-        if 'categories' in result:
-            for cat_key, items in result['categories'].items():
-                for item in items:
-                    source = item.get('source', '')
-                    if source in source_metadata:
-                        meta = source_metadata[source]
-                        item['video_id'] = meta.get('video_id')
-                        item['thumb'] = meta.get('thumb')
-                        item['speaker'] = meta.get('speaker')
-                        item['speaker_avatar'] = meta.get('speaker_avatar')
-                        item['timestamp_ms'] = meta.get('timestamp_ms')
-
+                    message = await client.messages.create(**request_kwargs(
+                        SYNTHESIS_MODEL, SYNTHESIS_MAX_TOKENS, prompt, instructions))
+                except anthropic.RateLimitError as e:
+                    limiter.on_rate_limit(retry_delay(e, rate_limited))
+                    rate_limited += 1
+                    continue
+                except Exception as e:
+                    error = e
+            if error is not None:
+                failures += 1
+                print(f"      ⚠️  Synthesis error for {label} ({failures}/{attempts}): {error}")
+                if failures < attempts:
+                    await asyncio.sleep(retry_delay(error, failures))
+                continue
+            limiter.on_success()
+            cache.record_usage("synthesis", message)
+            text = message.content[0].text
+        try:
+            result = parse_commentary(text)
+        except ValueError as e:
+            failures += 1
+            print(f"      ⚠️  Synthesis answer for {label} unusable ({failures}/{attempts}): {e}")
+            text = None
+            continue
+        cache.put(key, text)
         return result
+    return None
+
+
+def plan_synthesis(verse_ref: str, corpus: VerseCorpus,
+                   token_budget: int) -> Optional[Tuple[str, list, List[list], str]]:
+    """(prompt, passages, source groups, fingerprint) for a verse, or None if there is nothing to say."""
+    request = build_synthesis_prompt(verse_ref, corpus)
+    if request is None:
+        return None
+    prompt, all_passages = request
+    if token_budget and estimate_tokens(prompt) > token_budget:
+        groups = group_passages(verse_ref, all_passages, token_budget)
+    else:
+        groups = [all_passages]
+    key = cache_key(SYNTHESIS_MODEL, SYNTHESIS_MAX_TOKENS, prompt, SYNTHESIS_INSTRUCTIONS)
+    fingerprint = synthesis_fingerprint(key, token_budget if len(groups) > 1 else None)
+    return prompt, all_passages, groups, fingerprint
 
-    except Exception as e:
-        print(f"      ⚠️  Synthesis error for {verse_ref}: {e}")
-        return {}
 
+def synthesize_verse_commentary(verse_ref: str, corpus: VerseCorpus,
+                                 client: anthropic.Anthropic,
+                                 journal: Optional[SynthesisJournal] = None,
+                                 previous: Optional[dict] = None,
+                                 token_budget: int = SYNTHESIS_TOKEN_BUDGET,
+                                 attempts: int = SYNTHESIS_ATTEMPTS) -> Optional[dict]:
+    """
+    Synthesize commentary for a verse from ALL videos that discuss it.
 
-def synthesize_all_verses(db: dict, data_dir: Path, client: anthropic.Anthropic):
-    """For each Genesis 1 verse with multiple videos, synthesize commentary."""
+    corpus: VerseCorpus over all loaded videos; only the verse's contributors
+            are visited.
 
-    print("\n🧠 Synthesizing verse commentary from all video sources...")
+    previous: the verse's commentary from the last run; returned as is (with
+              fresh video metadata) if its fingerprint still matches.
 
-    # Load all video data — prefer *_parsed.json, fall back to *_enhanced.json
-    all_video_data = []
-    loaded_ids: set = set()
+    If the prompt would exceed token_budget (0 = no limit), the sources are
+    synthesized in groups within the budget (map) and the partial
+    commentaries are then merged, again within the budget (reduce).
 
-    for f in sorted(data_dir.glob('*_parsed.json')):
-        with open(f) as fh:
-            data = json.load(fh)
-        all_video_data.append(data)
-        loaded_ids.add(data.get('video_id', ''))
+    Returns {} if there is nothing to synthesize, None if the verse failed.
+    """
+    plan = plan_synthesis(verse_ref, corpus, token_budget)
+    if plan is None:
+        return {}
+    prompt, all_passages, groups, fingerprint = plan
 
-    for f in sorted(data_dir.glob('*_enhanced.json')):
-        with open(f) as fh:
-            data = json.load(fh)
-        if data.get('video_id', '') not in loaded_ids:
-            all_video_data.append(data)
+    result = reuse_commentary(verse_ref, fingerprint, journal, previous)
+    if result is None:
+        if len(groups) == 1:
+            result = request_commentary(client, prompt, SYNTHESIS_INSTRUCTIONS, verse_ref, attempts)
+        else:
+            print(f"      🧩 {verse_ref}: {len(groups)} Quellengruppen, Map-Reduce")
+            partials = []
+            for i, group in enumerate(groups, 1):
+                partial = request_commentary(client, format_synthesis_prompt(verse_ref, group),
+                                             SYNTHESIS_INSTRUCTIONS,
+                                             f"{verse_ref} [{i}/{len(groups)}]", attempts)
+                if partial is None:
+                    return None
+                partials.append(partial)
+            result = reduce_commentaries(verse_ref, partials, client, token_budget, attempts)
+        if result is None:
+            return None
+        if journal:
+            journal.record(SynthesisJournal.entry_id(verse_ref, fingerprint), result)
+    return finish_commentary(verse_ref, corpus, result, all_passages, fingerprint)
+
+
+def reduce_commentaries(verse_ref: str, partials: List[dict], client: anthropic.Anthropic,
+                        token_budget: int, attempts: int = SYNTHESIS_ATTEMPTS) -> Optional[dict]:
+    """Merge partial commentaries round by round until one is left; None if a call failed."""
+    partials = [p for p in partials if p]
+    round_ = 0
+    while len(partials) > 1:
+        round_ += 1
+        merged = []
+        for i, group in enumerate(group_partials(verse_ref, partials, token_budget), 1):
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            result = request_commentary(client, format_reduce_prompt(verse_ref, group),
+                                        REDUCE_INSTRUCTIONS, f"{verse_ref} reduce {round_}.{i}",
+                                        attempts)
+            if result is None:
+                return None
+            if result:
+                merged.append(result)
+        partials = merged
+    return partials[0] if partials else {}
+
+
+async def synthesize_verse_commentary_async(verse_ref: str, corpus: VerseCorpus,
+                                            client: anthropic.AsyncAnthropic,
+                                            limiter: AdaptiveLimiter,
+                                            journal: Optional[SynthesisJournal] = None,
+                                            previous: Optional[dict] = None,
+                                            token_budget: int = SYNTHESIS_TOKEN_BUDGET,
+                                            attempts: int = SYNTHESIS_ATTEMPTS) -> Optional[dict]:
+    """Async synthesize_verse_commentary(): source groups and reduce calls run concurrently."""
+    plan = plan_synthesis(verse_ref, corpus, token_budget)
+    if plan is None:
+        return {}
+    prompt, all_passages, groups, fingerprint = plan
 
-    parsed_count = sum(1 for d in all_video_data if 'verse_sections' in d)
-    print(f"   Loaded {len(all_video_data)} videos ({parsed_count} AI-parsed, "
-          f"{len(all_video_data) - parsed_count} legacy)")
+    result = reuse_commentary(verse_ref, fingerprint, journal, previous)
+    if result is None:
+        if len(groups) == 1:
+            result = await request_commentary_async(client, limiter, prompt, SYNTHESIS_INSTRUCTIONS,
+                                                    verse_ref, attempts)
+        else:
+            print(f"      🧩 {verse_ref}: {len(groups)} Quellengruppen, Map-Reduce")
+            partials = await asyncio.gather(*(
+                request_commentary_async(client, limiter, format_synthesis_prompt(verse_ref, group),
+                                         SYNTHESIS_INSTRUCTIONS,
+                                         f"{verse_ref} [{i}/{len(groups)}]", attempts)
+                for i, group in enumerate(groups, 1)))
+            if any(partial is None for partial in partials):
+                return None
+            result = await reduce_commentaries_async(verse_ref, partials, client, limiter,
+                                                     token_budget, attempts)
+        if result is None:
+            return None
+        if journal:
+            journal.record(SynthesisJournal.entry_id(verse_ref, fingerprint), result)
+    return finish_commentary(verse_ref, corpus, result, all_passages, fingerprint)
+
+
+async def reduce_commentaries_async(verse_ref: str, partials: List[dict],
+                                    client: anthropic.AsyncAnthropic, limiter: AdaptiveLimiter,
+                                    token_budget: int,
+                                    attempts: int = SYNTHESIS_ATTEMPTS) -> Optional[dict]:
+    """Async reduce_commentaries(): the groups of each round are merged concurrently."""
+    partials = [p for p in partials if p]
+    round_ = 0
+    while len(partials) > 1:
+        round_ += 1
+        groups = group_partials(verse_ref, partials, token_budget)
+
+        async def merge(i: int, group: List[dict]) -> Optional[dict]:
+            if len(group) == 1:
+                return group[0]
+            return await request_commentary_async(client, limiter, format_reduce_prompt(verse_ref, group),
+                                                  REDUCE_INSTRUCTIONS,
+                                                  f"{verse_ref} reduce {round_}.{i}", attempts)
+
+        merged = await asyncio.gather(*(merge(i, group) for i, group in enumerate(groups, 1)))
+        if any(result is None for result in merged):
+            return None
+        partials = [result for result in merged if result]
+    return partials[0] if partials else {}
+
+
+def verse_status(verse_ref: str, n_videos: int, commentary: Optional[dict]) -> str:
+    line = f"   🔎 {verse_ref} ({n_videos} video{'s' if n_videos > 1 else ''})... "
+    if commentary is None:
+        return line + "❌ Fehlgeschlagen"
+    if not commentary:
+        return line + "⚠️  Nicht genug Lehrinhalt"
+    cats = commentary.get('categories', {})
+    total = sum(len(v) for v in cats.values()) if cats else len(commentary.get('key_points', []))
+    sources = commentary.get('source_count', 0)
+    return line + f"✅ {total} Punkte aus {sources} Quellen"
+
+
+async def synthesize_verses_async(to_process: dict, corpus: VerseCorpus,
+                                  client: anthropic.AsyncAnthropic, workers: int,
+                                  journal: SynthesisJournal, previous: dict,
+                                  token_budget: int = SYNTHESIS_TOKEN_BUDGET) -> dict:
+    """Synthesize all verses with up to `workers` requests in flight; verse_ref -> result."""
+    limiter = AdaptiveLimiter(workers)
+    results = {}
+
+    async def run(verse_ref: str, n_videos: int):
+        results[verse_ref] = await synthesize_verse_commentary_async(
+            verse_ref, corpus, client, limiter, journal, previous.get(verse_ref), token_budget)
+        print(verse_status(verse_ref, n_videos, results[verse_ref]))
+
+    await asyncio.gather(*(run(verse_ref, len(videos))
+                           for verse_ref, videos in sorted(to_process.items())))
+    if limiter.rate_limited:
+        print(f"   ⏳ {limiter.rate_limited}x rate-limited, limit now {limiter.limit}")
+    return results
+
+
+def synthesize_all_verses(db: dict, data_dir: Path, client, video_corpus: VideoCorpus = None,
+                          workers: int = 1, force: bool = False,
+                          token_budget: int = SYNTHESIS_TOKEN_BUDGET):
+    """
+    For each Genesis 1 verse with multiple videos, synthesize commentary.
+
+    workers > 1 runs that many requests concurrently (client must then be an
+    AsyncAnthropic). Every finished verse is checkpointed in the synthesis
+    journal, so an interrupted or partly failed run resumes where it stopped.
+    Verses whose input fingerprint matches the stored commentary are reused
+    without a model call unless force is set. Verses whose prompt exceeds
+    token_budget are synthesized map-reduce style (0 = never). A verse whose
+    synthesis fails keeps its stored commentary and is retried next run.
+    Returns the failed verse refs.
+    """
+
+    print("\n🧠 Synthesizing verse commentary from all video sources...")
+
+    # All video data — prefer *_parsed.json, fall back to *_enhanced.json
+    if video_corpus is None:
+        video_corpus = VideoCorpus(data_dir)
+    corpus = VerseCorpus(video_corpus, db['verses']['genesis1'])
+
+    parsed_count = sum(1 for v in corpus.videos if v['record'].verse_sections is not None)
+    print(f"   Loaded {len(corpus.videos)} videos ({parsed_count} AI-parsed, "
+          f"{len(corpus.videos) - parsed_count} legacy)")
 
     # Process each verse that has 2+ videos (synthesis is most valuable here)
-    verse_commentaries = {}
     genesis1_verses = db['verses']['genesis1']
 
     # Priority: specific single verses first (Genesis 1:1, 1:3, etc.)
     single_verses = {k: v for k, v in genesis1_verses.items()
-                     if ':' in k and '-' not in k and len(v) >= 1}
+                     if is_single_verse(k) and len(v) >= 1}
     # Also include multi-verse ranges if they have multiple sources
     range_verses = {k: v for k, v in genesis1_verses.items()
                     if k not in single_verses and len(v) >= 2}
 
     all_to_process = {**single_verses, **range_verses}
 
-    for verse_ref, videos in sorted(all_to_process.items()):
-        n = len(videos)
-        print(f"   🔎 {verse_ref} ({n} video{'s' if n > 1 else ''})...", end=' ')
-
-        commentary = synthesize_verse_commentary(verse_ref, all_video_data, client, videos)
-
-        if commentary:
-            verse_commentaries[verse_ref] = commentary
-            cats = commentary.get('categories', {})
-            total = sum(len(v) for v in cats.values()) if cats else len(commentary.get('key_points', []))
-            sources = commentary.get('source_count', 0)
-            print(f"✅ {total} Punkte aus {sources} Quellen")
-        else:
-            print("⚠️  Nicht genug Lehrinhalt")
+    previous = {} if force else db.get('verse_commentaries', {})
+    journal = SynthesisJournal(data_dir / SYNTHESIS_JOURNAL)
+    if journal.entries:
+        print(f"   ↩️  Resuming: {len(journal.entries)} verses in {journal.path.name}")
 
-    # Save synthesized commentaries into the database
+    if workers > 1:
+        results = asyncio.run(synthesize_verses_async(all_to_process, corpus, client,
+                                                      workers, journal, previous, token_budget))
+    else:
+        results = {}
+        for verse_ref, videos in sorted(all_to_process.items()):
+            results[verse_ref] = synthesize_verse_commentary(verse_ref, corpus, client, journal,
+                                                             previous.get(verse_ref), token_budget)
+            print(verse_status(verse_ref, len(videos), results[verse_ref]))
+
+    # Save synthesized commentaries into the database, in verse order. A verse
+    # whose synthesis failed keeps its stored commentary, old fingerprint and
+    # all, so it is still shown and the next run retries it.
+    stored = db.get('verse_commentaries', {})
+    failed = sorted(verse_ref for verse_ref, result in results.items() if result is None)
+    kept = [verse_ref for verse_ref in failed if stored.get(verse_ref)]
+    for verse_ref in kept:
+        results[verse_ref] = stored[verse_ref]
+    verse_commentaries = {verse_ref: results[verse_ref] for verse_ref in sorted(results)
+                          if results[verse_ref]}
+    reused = sum(1 for verse_ref, result in verse_commentaries.items()
+                 if verse_ref not in failed and result is previous.get(verse_ref))
     db['verse_commentaries'] = verse_commentaries
 
     db_path = data_dir / 'study_bible_database.json'
     with open(db_path, 'w', encoding='utf-8') as f:
         json.dump(db, f, indent=2, ensure_ascii=False)
 
-    print(f"\n✅ Synthesized commentary for {len(verse_commentaries)} verses")
+    synthesized = len(verse_commentaries) - len(kept)
+    print(f"\n✅ Synthesized commentary for {synthesized} verses"
+          + (f" ({journal.replayed} from checkpoint)" if journal.replayed else ""))
+    print(f"♻️  {reused} unchanged verses reused, "
+          f"{synthesized - reused} re-synthesized")
     print("💾 Saved to study_bible_database.json")
+    if failed:
+        print(f"❌ {len(failed)} verses failed: {', '.join(failed)}")
+        if kept:
+            print(f"   {len(kept)} failed, kept previous commentary: {', '.join(kept)}")
+        print(f"   Checkpoint kept in {journal.path} — re-run to retry only these.")
+    else:
+        journal.path.unlink(missing_ok=True)
+    print(default_cache().report())
+    return failed
 
 
 def main():
-    api_key = None
-    if len(sys.argv) > 1:
-        api_key = sys.argv[1]
-    else:
-        api_key = os.environ.get('ANTHROPIC_API_KEY')
+    parser = argparse.ArgumentParser(description='Rebuild the database and synthesize verse commentary')
+    parser.add_argument('api_key', nargs='?', default=os.environ.get('ANTHROPIC_API_KEY'),
+                        help='Anthropic API key (default: $ANTHROPIC_API_KEY); synthesis is skipped without one')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Verses synthesized concurrently (default: 1, sequential)')
+    parser.add_argument('--token-budget', type=int, default=SYNTHESIS_TOKEN_BUDGET,
+                        help='Max estimated input tokens per synthesis call; larger verses are '
+                             'synthesized in source groups and merged (0 = one call per verse)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-synthesize every verse, even if its sources are unchanged')
+    parser.add_argument('--fake', action='store_true',
+                        help='Use the local stand-in client (fake_anthropic), no API requests')
+    args = parser.parse_args()
+    api_key = args.api_key
 
     data_dir = Path('study_bible_data')
 
     print("🔄 Step 1: Rebuilding database from AI-parsed files...")
-    db = rebuild_database(data_dir)
+    video_corpus = VideoCorpus(data_dir)
+    db = rebuild_database(data_dir, video_corpus)
 
-    if api_key:
-        client = anthropic.Anthropic(api_key=api_key)
+    if api_key or args.fake:
+        if args.workers > 1:
+            client = (fake_anthropic.AsyncFakeAnthropic() if args.fake
+                      else anthropic.AsyncAnthropic(api_key=api_key, max_retries=0))
+        else:
+            client = fake_anthropic.FakeAnthropic() if args.fake else anthropic.Anthropic(api_key=api_key)
         print("\n🔄 Step 2: Synthesizing verse commentary across all videos...")
-        synthesize_all_verses(db, data_dir, client)
+        failed = synthesize_all_verses(db, data_dir, client, video_corpus, args.workers, args.force,
+                                       args.token_budget)
+        if failed:
+            sys.exit(1)
     else:
         print("\n⚠️  No API key — skipping synthesis step. Pass key as argument to enable.")
 
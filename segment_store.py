@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mapped segment store: one compact binary file per video.
+
+*_study_data.json repeats every key for each segment and carries mostly
+empty verses/topics/terms lists; readers that only need start times or a few
+texts still have to json.load the whole file. <video>_segments.bin stores
+the same segments column-wise:
+
+  header    magic, version, segment count, text and annotation blob sizes
+  start_ms  uint32[N]
+  text      uint32[N+1] offsets into one UTF-8 blob of all segment texts
+  notes     uint32[N+1] offsets into a blob holding, only for segments with
+            non-empty verses/topics/terms, the three lists separated by
+            \x1e with \x1f between items (empty otherwise)
+
+SegmentStore opens it with mmap: start_ms is a typed memoryview over the file
+(bisectable in place), and texts are decoded from zero-copy slices only when
+asked for. A segment dict is built on first access and then reused, so
+overlapping time windows pay for it once. "start" is derived from start_ms, so
+segments read back exactly as they were written. The JSON files stay the
+export format.
+
+Usage: python3 segment_store.py [--data-dir DIR] [--force]   (convert *_study_data.json)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MAGIC = b'SEG1'
+HEADER = struct.Struct('<4sHHIII')   # magic, version, reserved, count, text bytes, note bytes
+VERSION = 1
+NOTE_KEYS = ('verses', 'topics', 'terms')
+LIST_SEP, ITEM_SEP = '\x1e', '\x1f'
+SUFFIX = '_segments.bin'
+
+if sys.byteorder != 'little':
+    raise ImportError('segment_store maps little-endian arrays directly')
+
+
+def store_path(data_dir: Path, video_id: str) -> Path:
+    return data_dir / f"{video_id}{SUFFIX}"
+
+
+def format_start(start_ms: int) -> str:
+    s = start_ms // 1000
+    return '%02d:%02d:%02d' % (s // 3600, s % 3600 // 60, s % 60)
+
+
+def write_store(segments: List[Dict], path: Path):
+    """Write segments column-wise; atomic via a temp file."""
+    starts = array('I', (seg['start_ms'] for seg in segments))
+    text_offsets, note_offsets = array('I', [0]), array('I', [0])
+    texts, notes = bytearray(), bytearray()
+    for seg in segments:
+        texts += seg.get('text', '').encode('utf-8')
+        text_offsets.append(len(texts))
+        if any(seg.get(key) for key in NOTE_KEYS):
+            notes += LIST_SEP.join(ITEM_SEP.join(seg.get(key, [])) for key in NOTE_KEYS).encode('utf-8')
+        note_offsets.append(len(notes))
+
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(segments), len(texts), len(notes)))
+        f.write(starts.tobytes())
+        f.write(text_offsets.tobytes())
+        f.write(note_offsets.tobytes())
+        f.write(texts)
+        f.write(notes)
+    os.replace(tmp, path)
+
+
+class SegmentStore:
+    """Read-only, mmap-backed view of one video's segments."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, text_bytes, note_bytes = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: not a version {VERSION} segment store")
+        self.count = count
+        view = memoryview(self._mmap)
+        pos = HEADER.size
+        self.start_ms = view[pos:pos + 4 * count].cast('I')
+        pos += 4 * count
+        self._text_offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+        pos += 4 * (count + 1)
+        self._note_offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+        pos += 4 * (count + 1)
+        self._texts = view[pos:pos + text_bytes]
+        self._notes = view[pos + text_bytes:pos + text_bytes + note_bytes]
+        self._decoded: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def text_bytes(self, i: int) -> memoryview:
+        """Zero-copy UTF-8 bytes of segment i's text."""
+        return self._texts[self._text_offsets[i]:self._text_offsets[i + 1]]
+
+    def text(self, i: int) -> str:
+        return str(self.text_bytes(i), 'utf-8')
+
+    def segment(self, i: int) -> Dict:
+        """Segment i as the dict the JSON files store (decoded once, then shared)."""
+        seg = self._decoded.get(i)
+        if seg is None:
+            seg = self._decoded[i] = self._decode(i)
+        return seg
+
+    def _decode(self, i: int) -> Dict:
+        start_ms = self.start_ms[i]
+        lo, hi = self._note_offsets[i], self._note_offsets[i + 1]
+        if lo == hi:
+            verses, topics, terms = [], [], []
+        else:
+            verses, topics, terms = ([item for item in field.split(ITEM_SEP) if item]
+                                     for field in str(self._notes[lo:hi], 'utf-8').split(LIST_SEP))
+        return {'start': format_start(start_ms), 'start_ms': start_ms, 'text': self.text(i),
+                'verses': verses, 'topics': topics, 'terms': terms}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.segment(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.segment(index)
+
+    def segments(self) -> List[Dict]:
+        """All segments, e.g. for exporting back to JSON."""
+        return self[:]
+
+
+def open_store(data_dir: Path, video_id: str) -> Optional[SegmentStore]:
+    """The video's segment store, unless missing or older than its *_study_data.json."""
+    path = store_path(data_dir, video_id)
+    if not path.exists():
+        return None
+    source = data_dir / f"{video_id}_study_data.json"
+    if source.exists() and source.stat().st_mtime > path.stat().st_mtime:
+        return None
+    return SegmentStore(path)
+
+
+def convert(data_dir: Path, force: bool = False) -> int:
+    """Write <video>_segments.bin for every *_study_data.json that needs one."""
+    written = 0
+    for source in sorted(data_dir.glob('*_study_data.json')):
+        video_id = source.name[:-len('_study_data.json')]
+        target = store_path(data_dir, video_id)
+        if not force and target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+            continue
+        with open(source, encoding='utf-8') as f:
+            segments = json.load(f).get('segments', [])
+        write_store(segments, target)
+        written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert *_study_data.json segments to segment stores')
+    parser.add_argument('--data-dir', type=Path, default=Path('study_bible_data'))
+    parser.add_argument('--force', action='store_true', help='Rewrite stores that are up to date')
+    args = parser.parse_args()
+
+    written = convert(args.data_dir, args.force)
+    print(f"✅ {written} Segment-Stores geschrieben ({args.data_dir})")
+
+
+if __name__ == '__main__':
+    main()
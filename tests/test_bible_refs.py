@@ -0,0 +1,71 @@
+import pytest
+
+from bible_refs import format_id, parse_reference
+
+
+def refs(text):
+    return [(format_id(start), format_id(end)) for start, end in parse_reference(text)]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Genesis 1:3', [('Genesis 1:3', 'Genesis 1:3')]),
+    ('1. Mose 1,1-5', [('Genesis 1:1', 'Genesis 1:5')]),
+    ('Genesis 1:31-2:2', [('Genesis 1:31', 'Genesis 2:2')]),
+    ('Genesis 1-11', [('Genesis 1', 'Genesis 11')]),
+    ('1. Mose 1, Vers 3 bis 5', [('Genesis 1:3', 'Genesis 1:5')]),
+    ('Genesis 1:3-5 und 1:14-19', [('Genesis 1:3', 'Genesis 1:5'), ('Genesis 1:14', 'Genesis 1:19')]),
+    ('Römer 8:28, 12:1', [('Romans 8:28', 'Romans 8:28'), ('Romans 12:1', 'Romans 12:1')]),
+])
+def test_known_forms(text, expected):
+    assert refs(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Genesis 2:4b-25', [('Genesis 2:4', 'Genesis 2:25')]),
+    ('Genesis 2:4a', [('Genesis 2:4', 'Genesis 2:4')]),
+])
+def test_verse_suffix_letters(text, expected):
+    assert refs(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Genesis 1:1, 3', [('Genesis 1:1', 'Genesis 1:1'), ('Genesis 1:3', 'Genesis 1:3')]),
+    ('Genesis 1:1-3, 5-7', [('Genesis 1:1', 'Genesis 1:3'), ('Genesis 1:5', 'Genesis 1:7')]),
+    ('1. Mose 1,1, 3', [('Genesis 1:1', 'Genesis 1:1'), ('Genesis 1:3', 'Genesis 1:3')]),
+    ('Genesis 1:31-2:2, 4', [('Genesis 1:31', 'Genesis 2:2'), ('Genesis 2:4', 'Genesis 2:4')]),
+])
+def test_verse_lists_stay_in_chapter(text, expected):
+    assert refs(text) == expected
+
+
+def test_bare_number_after_chapter_is_german_verse():
+    assert refs('Genesis 1,3') == [('Genesis 1:3', 'Genesis 1:3')]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1. Mose 1,1-2,3', [('Genesis 1:1', 'Genesis 2:3')]),
+    ('1. Mose 1,1-2,4a', [('Genesis 1:1', 'Genesis 2:4')]),
+    ('1. Mose 1,1–2,3', [('Genesis 1:1', 'Genesis 2:3')]),
+])
+def test_german_cross_chapter_range(text, expected):
+    assert refs(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1. Mose 1,26.27', [('Genesis 1:26', 'Genesis 1:26'), ('Genesis 1:27', 'Genesis 1:27')]),
+    ('1. Mose 1,26.27-29.31', [('Genesis 1:26', 'Genesis 1:26'), ('Genesis 1:27', 'Genesis 1:29'),
+                               ('Genesis 1:31', 'Genesis 1:31')]),
+])
+def test_german_dot_verse_list(text, expected):
+    assert refs(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Prediger', [('Ecclesiastes 0', 'Ecclesiastes 999')]),
+    ('Genesis (allgemein)', [('Genesis 0', 'Genesis 999')]),
+    ('Genesis 1-11 und Offenbarung', [('Genesis 1', 'Genesis 11'), ('Revelation 0', 'Revelation 999')]),
+    ('Der Prediger sagt', []),
+    ('wie die Richter es taten', []),
+])
+def test_book_without_chapter_only_on_its_own(text, expected):
+    assert refs(text) == expected
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip('anthropic')
+
+import parse_transcript_with_ai as ptai
+
+
+def make_segments(n, sentence_every=3, words=12):
+    """n segments of ~words words; every `sentence_every`-th one ends a sentence."""
+    segments = []
+    for i in range(n):
+        text = ' '.join(f'wort{i}x{w}' for w in range(words))
+        if i % sentence_every == sentence_every - 1:
+            text += '.'
+        segments.append({'start': f'{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}',
+                         'start_ms': i * 4000, 'text': text, 'i': i})
+    return segments
+
+
+def cost(chunk):
+    return sum(ptai.segment_tokens(seg) for seg in chunk)
+
+
+@pytest.mark.parametrize('n', [1, 7, 150, 400])
+def test_chunks_cover_transcript_within_budget(n):
+    segments = make_segments(n)
+    chunks = ptai.chunk_segments(segments, budget=600, overlap_budget=60)
+
+    assert all(cost(chunk) <= 600 for chunk in chunks)
+    # Every segment appears, in order, and consecutive chunks overlap without gaps
+    assert chunks[0][0]['i'] == 0 and chunks[-1][-1]['i'] == n - 1
+    for chunk in chunks:
+        assert [seg['i'] for seg in chunk] == list(range(chunk[0]['i'], chunk[-1]['i'] + 1))
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev[0]['i'] < nxt[0]['i'] <= prev[-1]['i'] + 1
+        repeated = [seg for seg in prev if seg['i'] >= nxt[0]['i']]
+        assert cost(repeated) <= 60
+
+
+def test_chunks_end_on_sentence_boundaries():
+    segments = make_segments(150)
+    # A sentence is three segments of ~35 tokens, so one fits the overlap budget
+    chunks = ptai.chunk_segments(segments, budget=600, overlap_budget=120)
+    for chunk in chunks[:-1]:
+        assert chunk[-1]['text'].endswith('.')
+        assert cost(chunk) >= 0.75 * 600
+    # The overlap repeats whole sentences: the next chunk starts after a sentence end
+    for nxt in chunks[1:]:
+        assert segments[nxt[0]['i'] - 1]['text'].endswith('.')
+
+
+def test_pause_counts_as_boundary():
+    segments = make_segments(60, sentence_every=1000)
+    for seg in segments[20:]:
+        seg['start_ms'] += 10_000        # pause after segment 19
+    chunks = ptai.chunk_segments(segments, budget=cost(segments[:22]), overlap_budget=0)
+    assert chunks[0][-1]['i'] == 19
+    assert chunks[1][0]['i'] == 20
+
+
+def test_without_boundaries_chunks_stay_full():
+    segments = make_segments(100, sentence_every=1000)
+    chunks = ptai.chunk_segments(segments, budget=600, overlap_budget=60)
+    # No sentence end: cut at the budget and repeat the tail as is
+    assert all(cost(chunk) > 600 - ptai.segment_tokens(segments[0]) for chunk in chunks[:-1])
+    assert all(prev[-1]['i'] >= nxt[0]['i'] for prev, nxt in zip(chunks, chunks[1:]))
+
+
+def test_oversized_segment_gets_its_own_chunk():
+    segments = make_segments(5)
+    segments[2]['text'] = 'lang ' * 2000
+    chunks = ptai.chunk_segments(segments, budget=600, overlap_budget=0)
+    assert [[seg['i'] for seg in chunk] for chunk in chunks] == [[0, 1], [2], [3, 4]]
+
+
+def test_plan_calls():
+    segments = make_segments(400)
+    plan = ptai.plan_calls(segments)
+    chunks = ptai.chunk_segments(segments)
+    assert plan['calls'] == len(chunks)
+    assert plan['tokens'] == sum(cost(chunk) for chunk in chunks)
+    # Fixed 40-segment windows every 35 segments
+    assert plan['legacy_calls'] == 12
+    assert plan['legacy_tokens'] == sum(cost(segments[i:i + 40]) for i in range(0, 400, 35))
+    assert plan['calls'] < plan['legacy_calls'] and plan['tokens'] < plan['legacy_tokens']
@@ -0,0 +1,45 @@
+from clip_boundaries import BoundaryDetector
+from transcript import Transcript
+
+CREATION = 'Gott schuf Himmel Erde Licht Finsternis Wasser Schöpfung Anfang'
+COVENANT = 'Abraham Verheißung Bund Nachkommen Sterne Glaube Gerechtigkeit'
+
+
+def detector(pause_at: int = 20, n: int = 40) -> BoundaryDetector:
+    """n segments 5 s apart, switching topic after a 20 s pause at segment pause_at."""
+    segments, ms = [], 0
+    for i in range(n):
+        if i == pause_at:
+            ms += 20_000
+        words = (CREATION if i < pause_at else COVENANT).split()
+        segments.append({'start_ms': ms, 'text': ' '.join(words[i % 3:] + words[:i % 3])})
+        ms += 5_000
+    return BoundaryDetector(Transcript(segments))
+
+
+def test_topic_shift_after_pause_opens_clip():
+    d = detector()
+    proposal = d.propose(d.starts[22])
+    assert proposal['clip_start_ms'] == d.starts[20]
+    start, confidence = d.best_boundary(d.starts[22] - 90_000, d.starts[22])
+    assert start == 20 and confidence > 0.5
+
+
+def test_video_start_is_not_ranked():
+    d = detector()
+    assert d.best_boundary(0, 0) is None
+    start, _ = d.best_boundary(0, d.starts[5])
+    assert start != 0
+
+
+def test_mention_at_video_start_has_no_confidence():
+    d = detector()
+    proposal = d.propose(d.starts[0])
+    assert proposal['clip_start_ms'] == 0
+    assert proposal['confidence'] == 0
+
+
+def test_boundary_without_rivals_has_no_confidence():
+    d = detector()
+    # Only segments 1 and 2 in range: each is the other's neighbour
+    assert d.best_boundary(d.starts[1], d.starts[2])[1] == 0.0
@@ -0,0 +1,27 @@
+import parse_transcript_with_ai as ptai
+
+TEXT = 'Gott schafft durch sein Wort, nicht durch einen Kampf mit anderen Mächten.'
+
+
+def section(ts, content, ref='Genesis 1:1', quality='medium'):
+    return {'timestamp': ts, 'verse_reference': ref, 'quality': quality, 'content': content}
+
+
+def test_overlap_duplicates_keep_best_member():
+    sections = [section('00:01:00', TEXT),
+                section('00:01:10', TEXT + ' Das ist einzigartig.', quality='high'),
+                section('00:05:00', 'Ein ganz anderer Gedanke über das Licht am ersten Tag.')]
+    assert ptai.dedupe_sections(sections) == sections[1:]
+
+
+def test_short_or_empty_content_is_never_merged():
+    sections = [section('00:01:00', ''), section('00:01:05', ''),
+                section('00:01:10', 'Amen'), section('00:01:15', 'Amen')]
+    assert ptai.shingles('') == set() and ptai.shingles('Amen') == set()
+    assert ptai.dedupe_sections(sections) == sections
+
+
+def test_no_merge_across_passages_or_time():
+    sections = [section('00:01:00', TEXT), section('00:01:05', TEXT, ref='Genesis 1:3'),
+                section('00:02:00', TEXT)]
+    assert ptai.dedupe_sections(sections) == sections
@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+pytest.importorskip('anthropic')
+
+import extract_clips as ec
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ec.time, 'monotonic', clock)
+    return clock
+
+
+def saved(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_checkpoint_saves_every_n_mentions(tmp_path, clock):
+    db = {'clips': []}
+    checkpoint = ec.Checkpoint(db, every=3, interval=60, path=tmp_path / 'db.json')
+    for n in range(7):
+        db['clips'].append(n)
+        checkpoint.tick()
+        clock.now += 1
+    assert checkpoint.saves == 2 and checkpoint.pending == 1
+    # An interruption now loses at most the mention since the last save
+    assert saved(tmp_path / 'db.json') == {'clips': [0, 1, 2, 3, 4, 5]}
+
+
+def test_checkpoint_saves_after_interval(tmp_path, clock):
+    db = {'clips': []}
+    checkpoint = ec.Checkpoint(db, every=100, interval=30, path=tmp_path / 'db.json')
+    db['clips'].append('a')
+    checkpoint.tick()
+    assert checkpoint.saves == 0
+    clock.now += 30
+    db['clips'].append('b')
+    checkpoint.tick()
+    assert checkpoint.saves == 1
+    assert saved(tmp_path / 'db.json') == {'clips': ['a', 'b']}
+
+    # The interval counts from the last save
+    clock.now += 10
+    checkpoint.tick()
+    assert checkpoint.saves == 1
+
+
+def test_save_db_replaces_atomically(tmp_path, monkeypatch):
+    path = tmp_path / 'db.json'
+    ec.save_db({'version': 1}, path)
+    assert saved(path) == {'version': 1}
+    assert [p.name for p in tmp_path.iterdir()] == ['db.json']
+
+    # A crash while writing leaves the previous database intact
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(ec.json, 'dump', crash)
+    with pytest.raises(KeyboardInterrupt):
+        ec.save_db({'version': 2}, path)
+    assert saved(path) == {'version': 1}
+
+
+def mention(ms, context='Gott schuf'):
+    return {'timestamp': ec.ms_to_ts(ms), 'timestamp_ms': ms, 'context': context, 'category': 'theologisch'}
+
+
+def member(ms, verse_ref='Genesis 1:1'):
+    return {'verse_ref': verse_ref, 'mention': mention(ms), 'targets': [], 'label': 'v'}
+
+
+def times(clusters):
+    return [[m['mention']['timestamp_ms'] for m in cluster] for cluster in clusters]
+
+
+def test_cluster_members_gap_span_and_size(monkeypatch):
+    monkeypatch.setattr(ec, 'CLUSTER_GAP_MS', 60_000)
+    monkeypatch.setattr(ec, 'CLUSTER_SPAN_MS', 180_000)
+    monkeypatch.setattr(ec, 'CLUSTER_MAX', 3)
+    members = [member(ms) for ms in (400_000, 0, 60_000, 500_000, 120_000, 180_000, 200_000, 121_000)]
+    assert times(ec.cluster_members(members)) == [
+        [0, 60_000, 120_000],     # full at CLUSTER_MAX
+        [121_000, 180_000, 200_000],
+        [400_000],                # more than CLUSTER_GAP_MS after the previous mention
+        [500_000],
+    ]
+
+    # The span caps a chain of mentions that each stay within the gap
+    chain = [member(ms) for ms in range(0, 300_000, 50_000)]
+    monkeypatch.setattr(ec, 'CLUSTER_MAX', 8)
+    assert times(ec.cluster_members(chain)) == [[0, 50_000, 100_000, 150_000], [200_000, 250_000]]
+    assert ec.cluster_members([]) == []
+
+
+def test_pending_members_merges_equal_requests():
+    shared = mention(10_000)
+    db = {'verses': {
+        'genesis1': {'Genesis 1:1': [
+            {'video_id': 'a', 'display_title': 'A', 'mentions': [shared, mention(90_000),
+                                                                 dict(mention(5000), clip_start_ms=0)]},
+            {'video_id': 'ohne', 'mentions': [mention(1000)]},
+        ]},
+        # The same mention copied into another section: one request fills both
+        'schoepfung': {'Genesis 1:1': [{'video_id': 'a', 'display_title': 'A', 'mentions': [dict(shared)]}]},
+        'licht': {'Genesis 1:3': [{'video_id': 'a', 'display_title': 'A', 'mentions': [mention(10_000)]}]},
+    }}
+    seg_cache = {'a': ec.Transcript([{'start_ms': 0, 'start': '00:00:00', 'text': 'Am Anfang'}]),
+                 'ohne': ec.Transcript([])}
+    by_video, total, skipped = ec.pending_members(db, seg_cache)
+
+    assert (total, skipped) == (5, 1)
+    assert list(by_video) == ['a']
+    members = by_video['a']
+    assert [(m['verse_ref'], m['mention']['timestamp_ms'], len(m['targets'])) for m in members] == [
+        ('Genesis 1:1', 10_000, 2), ('Genesis 1:1', 90_000, 1), ('Genesis 1:3', 10_000, 1)]
+    assert members[0]['targets'][0] is shared
+
+
+def test_plan_requests_clusters_per_video():
+    segments = [{'start_ms': s * 1000, 'start': ec.ms_to_ts(s * 1000), 'text': f'Satz {s}.'}
+                for s in range(0, 900, 10)]
+    mentions = [mention(ms, context=f'Stelle {ms}') for ms in (30_000, 50_000, 600_000)]
+    db = {'verses': {'genesis1': {'Genesis 1:1': [{'video_id': 'a', 'mentions': mentions}]}}}
+    seg_cache = {'a': ec.Transcript(segments)}
+
+    requests, local, stats = ec.plan_requests(db, seg_cache)
+    assert [len(r['members']) for r in requests] == [2, 1] and local == []
+    assert requests[0]['max_tokens'] == ec.cluster_max_tokens(2)
+    assert 'Stelle 30000' in requests[0]['prompt'] and 'Stelle 50000' in requests[0]['prompt']
+    # A lone mention gets exactly the request it would get without clustering
+    assert requests[1]['prompt'] == ec.build_clip_prompt('Genesis 1:1', mentions[2], seg_cache['a'])
+    assert stats['requests'] == 2 and stats['pending'] == 3
+
+    requests, _, stats = ec.plan_requests(db, seg_cache, cluster=False)
+    assert [len(r['members']) for r in requests] == [1, 1, 1] and stats['requests'] == 3
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+import pytest
+
+import extract_study_bible_data as esd
+
+TRANSCRIPTS = {
+    'a': ['[00:00:01] Genesis 1:1 sagt: Am Anfang schuf Gott Himmel und Erde.',
+          '[00:00:09] Das ist die Schöpfung, und Gnade steht am Anfang.'],
+    'b': ['[00:00:02] In Genesis 1:27 schuf Gott den Menschen.',
+          '[00:00:08] Vergleiche Johannes 1:1 und Römer 5:12 zur Sünde.'],
+}
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    transcripts = tmp_path / 'bibelthek_videos' / 'transcripts'
+    transcripts.mkdir(parents=True)
+    for name, lines in TRANSCRIPTS.items():
+        (transcripts / f'{name}.txt').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return tmp_path / 'study_bible_data'
+
+
+def run(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['extract_study_bible_data.py'])
+    esd.main()
+    out = capsys.readouterr().out
+    processed = sorted(line.split()[-1].rstrip('.') for line in out.splitlines() if '📹 Processing' in line)
+    with open('study_bible_data/study_bible_database.json', encoding='utf-8') as f:
+        return processed, json.load(f)
+
+
+def test_unchanged_videos_come_from_the_manifest(corpus, monkeypatch, capsys):
+    processed, database = run(monkeypatch, capsys)
+    assert processed == ['a.txt', 'b.txt']
+    manifest = json.loads((corpus / esd.MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert manifest['videos']['a.txt']['summary']['verse_mentions']['Genesis 1']
+
+    # Unchanged: the summary comes from the manifest, *_study_data.json is not read again
+    study_data = corpus / 'a_study_data.json'
+    mtime = study_data.stat().st_mtime
+    study_data.write_text('kein JSON', encoding='utf-8')
+    os.utime(study_data, (mtime, mtime))
+    assert run(monkeypatch, capsys) == ([], database)
+
+
+def test_missing_or_stale_artifacts_are_rebuilt(corpus, monkeypatch, capsys):
+    _, database = run(monkeypatch, capsys)
+
+    (corpus / 'a_segments.bin').unlink()
+    (corpus / 'b_study_data.json').unlink()
+    assert run(monkeypatch, capsys) == (['a.txt', 'b.txt'], database)
+    assert (corpus / 'a_segments.bin').exists() and (corpus / 'b_study_data.json').exists()
+
+    # A segment store older than its study data is stale
+    store = corpus / 'a_segments.bin'
+    mtime = (corpus / 'a_study_data.json').stat().st_mtime
+    os.utime(store, (mtime - 10, mtime - 10))
+    assert run(monkeypatch, capsys)[0] == ['a.txt']
+
+    # A changed transcript is processed again
+    with open('bibelthek_videos/transcripts/b.txt', 'a', encoding='utf-8') as f:
+        f.write('[00:00:20] In Exodus 20:3 steht das erste Gebot.\n')
+    processed, database = run(monkeypatch, capsys)
+    assert processed == ['b.txt'] and 'Exodus 20' in database['verses']['all']
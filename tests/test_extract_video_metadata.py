@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+pytest.importorskip('anthropic')
+
+import fake_anthropic
+import llm_cache
+import extract_video_metadata as evm
+
+VIDEOS = [(f'v{i}', f'Video {i}', f'Herzlich willkommen zu Folge {i}.') for i in range(3)]
+ENTRY = {'speaker': 'Anna', 'series': None, 'episode': 1, 'organization': None}
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, '_default_cache',
+                        llm_cache.ResponseCache(tmp_path / 'cache.sqlite3', bypass=True))
+
+
+def responder(single):
+    """Batched prompts never get a usable entry; single prompts get `single`."""
+    def respond(request):
+        if 'JEDES Video' in request['messages'][0]['content']:
+            return '[]'
+        return json.dumps(single)
+    return respond
+
+
+def test_rounds_stop_once_size_would_repeat():
+    client = fake_anthropic.FakeAnthropic(responder=responder(ENTRY))
+    metadata, counts = evm.extract_metadata_batched(client, VIDEOS, per_request=2, rounds=3)
+    # Sizes 2 (2 requests) and 1 (3 requests); no second round of size 1
+    assert counts == {'batched': 5, 'requeued': 6, 'single': 3}
+    assert len(client.requests) == 8
+    assert metadata == {vid_id: ENTRY for vid_id, _, _ in VIDEOS}
+
+
+def test_single_fallback_is_validated():
+    client = fake_anthropic.FakeAnthropic(responder=responder({'speaker': ['Anna'], 'series': None}))
+    metadata, _ = evm.extract_metadata_batched(client, VIDEOS[:1], per_request=2)
+    assert metadata == {'v0': {}}
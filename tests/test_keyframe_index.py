@@ -0,0 +1,114 @@
+import os
+import struct
+
+import keyframe_index as ki
+
+FTYP_SIZE = 20
+
+
+# Minimal mp4 writer: just the boxes keyframe_index reads
+def box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+
+def full(kind: bytes, payload: bytes, version: int = 0) -> bytes:
+    return box(kind, bytes([version, 0, 0, 0]) + payload)
+
+
+def table(kind: bytes, fmt: str, rows, version: int = 0) -> bytes:
+    entries = b''.join(struct.pack('>' + fmt, *row) for row in rows)
+    return full(kind, struct.pack('>I', len(rows)) + entries, version)
+
+
+def trak(handler: bytes, timescale: int, stbl: bytes, edts: bytes = b'', mdhd_version: int = 0) -> bytes:
+    if mdhd_version == 1:
+        mdhd = full(b'mdhd', struct.pack('>QQIQ', 0, 0, timescale, 0) + bytes(4), 1)
+    else:
+        mdhd = full(b'mdhd', struct.pack('>IIII', 0, 0, timescale, 0) + bytes(4))
+    hdlr = full(b'hdlr', struct.pack('>I4s', 0, handler) + bytes(12) + b'\0')
+    return box(b'trak', full(b'tkhd', bytes(80)) + edts
+               + box(b'mdia', mdhd + hdlr + box(b'minf', box(b'stbl', stbl))))
+
+
+def stsz(sizes) -> bytes:
+    return full(b'stsz', struct.pack(f'>II{len(sizes)}I', 0, len(sizes), *sizes))
+
+
+def ftyp() -> bytes:
+    return box(b'ftyp', b'isom' + bytes(4) + b'isom')
+
+
+# 12 samples of 0.5 s (timescale 2000), 4 per chunk, sizes 100, 200, ... 1200,
+# keyframes 1, 5 and 9; mdat comes first, so the chunks start right after it.
+# ctts shifts every sample by 1 s, sample 5 by 1.5 s; the edit list opens with
+# an empty edit and then starts the media at 1 s.
+SIZES = [100 * (i + 1) for i in range(12)]
+MDAT_START = FTYP_SIZE + 8
+EXPECTED = [(0, MDAT_START), (2500, MDAT_START + 1000), (4000, MDAT_START + 3600)]
+
+
+def write_video(path):
+    audio = trak(b'soun', 48000, table(b'stts', 'II', [(4, 1024)]) + table(b'stsc', 'III', [(1, 4, 1)])
+                 + stsz([10] * 4) + table(b'stco', 'I', [(MDAT_START,)]))
+    chunks = [MDAT_START, MDAT_START + sum(SIZES[:4]), MDAT_START + sum(SIZES[:8])]
+    stbl = (full(b'stsd', struct.pack('>I', 0))
+            + table(b'stts', 'II', [(12, 1000)])
+            + table(b'ctts', 'II', [(4, 2000), (1, 3000), (7, 2000)])
+            + table(b'stsc', 'III', [(1, 4, 1)])
+            + stsz(SIZES)
+            + table(b'stco', 'I', [(offset,) for offset in chunks])
+            + table(b'stss', 'I', [(1,), (5,), (9,)]))
+    edts = box(b'edts', table(b'elst', 'IiI', [(500, -1, 0x10000), (6000, 2000, 0x10000)]))
+    moov = box(b'moov', full(b'mvhd', bytes(96)) + audio + trak(b'vide', 2000, stbl, edts))
+    path.write_bytes(ftyp() + box(b'mdat', bytes(sum(SIZES))) + moov)
+
+
+def test_scan_keyframes(tmp_path):
+    write_video(tmp_path / 'a.mp4')
+    assert ki.scan_keyframes(tmp_path / 'a.mp4') == EXPECTED
+
+
+def test_scan_version_1_boxes_moov_first(tmp_path):
+    # co64, mdhd/ctts/elst version 1, no stss (every sample is a keyframe)
+    def moov(base):
+        stbl = (table(b'stts', 'II', [(3, 40)]) + table(b'ctts', 'Ii', [(3, 80)], 1)
+                + table(b'stsc', 'III', [(1, 3, 1)]) + stsz([5, 6, 7]) + table(b'co64', 'Q', [(base,)]))
+        edts = box(b'edts', table(b'elst', 'qqI', [(120, 80, 0x10000)], 1))
+        return box(b'moov', trak(b'vide', 1000, stbl, edts, mdhd_version=1))
+    base = FTYP_SIZE + len(moov(0)) + 8
+    (tmp_path / 'b.mp4').write_bytes(ftyp() + moov(base) + box(b'mdat', bytes(18)))
+    assert ki.scan_keyframes(tmp_path / 'b.mp4') == [(0, base), (40, base + 5), (80, base + 11)]
+
+
+def test_open_index_roundtrip(tmp_path):
+    write_video(tmp_path / 'a.mp4')
+    index = ki.open_index(tmp_path, 'a', tmp_path / 'a.mp4')
+    assert list(zip(index.time_ms, index.offsets)) == EXPECTED
+    assert index.before(2499) == EXPECTED[0]
+    assert index.before(2500) == EXPECTED[1]
+    assert index.before(10_000) == EXPECTED[2]
+
+    # Up to date: kept; without the mp4 the stored index is still used
+    mtime = os.path.getmtime(ki.index_path(tmp_path, 'a'))
+    ki.open_index(tmp_path, 'a', tmp_path / 'a.mp4')
+    assert os.path.getmtime(ki.index_path(tmp_path, 'a')) == mtime
+    (tmp_path / 'a.mp4').unlink()
+    assert len(ki.open_index(tmp_path, 'a', tmp_path / 'a.mp4')) == 3
+    assert ki.open_index(tmp_path, 'b', tmp_path / 'b.mp4') is None
+
+
+def test_annotate_clips(tmp_path):
+    write_video(tmp_path / 'a.mp4')
+    indexes = {'a': ki.open_index(tmp_path, 'a', tmp_path / 'a.mp4')}
+    mentions = [{'clip_start_ms': 3000}, {'clip_start_ms': 4000}, {'timestamp_ms': 1}]
+    db = {'verses': {'genesis1': {'Genesis 1:1': [{'video_id': 'a', 'mentions': mentions},
+                                                  {'video_id': 'b', 'mentions': [{'clip_start_ms': 0}]}]}}}
+
+    assert ki.annotate_clips(db, indexes) == 2
+    assert mentions[0] == {'clip_start_ms': 3000, 'clip_keyframe_ms': 2500,
+                           'clip_keyframe_offset': EXPECTED[1][1]}
+    assert mentions[1]['clip_keyframe_offset'] == EXPECTED[2][1]
+    assert 'clip_keyframe_ms' not in mentions[2]
+
+    ki.annotate_clips(db, indexes, snap=True)
+    assert mentions[0]['clip_start_ms'] == 2500
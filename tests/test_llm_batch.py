@@ -0,0 +1,114 @@
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import fake_anthropic
+import llm_batch
+import llm_cache
+import parse_transcript_with_ai as ptai
+from llm_cache import cache_key, request_kwargs
+
+MODEL = 'claude-haiku-4-5-20251001'
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def echo(request):
+    return json.dumps({'prompt': request['messages'][0]['content']})
+
+
+def batch_requests(prompts):
+    return [{'custom_id': llm_batch.batch_custom_id('video', f'c{n}'), 'key': cache_key(MODEL, 50, prompt),
+             'params': request_kwargs(MODEL, 50, prompt)} for n, prompt in enumerate(prompts, 1)]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, '_default_cache', llm_cache.ResponseCache(tmp_path / 'cache.sqlite3'))
+    return llm_cache._default_cache
+
+
+def test_custom_id_is_valid():
+    assert llm_batch.batch_custom_id('Schöpfung & Fall', 'c1') == 'Sch_pfung_Fall-c1'
+    long_id = llm_batch.batch_custom_id('x' * 80, 'c1')
+    assert len(long_id) == 64 and long_id != llm_batch.batch_custom_id('x' * 80, 'c2')
+
+
+def test_results_land_under_their_cache_key(cache, tmp_path):
+    client = fake_anthropic.FakeAnthropic(responder=echo, batch_dir=tmp_path / 'batches')
+    requests = batch_requests(['eins', 'zwei', 'drei', 'eins'])
+    counts = llm_batch.run_batch(client, requests, tmp_path / 'state.json', 'test', poll_interval=0)
+
+    assert counts == {'cached': 0, 'duplicates': 1, 'submitted': 3, 'succeeded': 3, 'failed': 0}
+    for request in requests:
+        prompt = request['params']['messages'][0]['content']
+        assert json.loads(cache.get(request['key'])) == {'prompt': prompt}
+    assert not (tmp_path / 'state.json').exists()
+
+    # Everything is cached now: nothing is submitted again
+    counts = llm_batch.run_batch(client, requests, tmp_path / 'state.json', 'test', poll_interval=0)
+    assert counts['cached'] == 3 and len(client.batches_created) == 1
+
+
+RESUME = '''
+import json, sys
+from pathlib import Path
+import fake_anthropic, llm_batch
+client = fake_anthropic.FakeAnthropic(responder=lambda r: json.dumps({"prompt": r["messages"][0]["content"]}))
+requests = json.loads(sys.argv[1])
+counts = llm_batch.run_batch(client, requests, Path(sys.argv[2]), "test", poll_interval=0)
+print(json.dumps({"counts": counts, "created": client.batches_created}))
+'''
+
+
+def test_interrupted_run_resumes_in_new_process(cache, tmp_path, monkeypatch):
+    client = fake_anthropic.FakeAnthropic(responder=echo, batch_dir=tmp_path / 'batches', batch_latency=3600)
+    requests = batch_requests(['eins', 'zwei'])
+    state = tmp_path / 'state.json'
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(llm_batch.time, 'sleep', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        llm_batch.run_batch(client, requests, state, 'test')
+    saved = json.loads(state.read_text())
+    assert [batch['id'] for batch in saved['batches']] == client.batches_created
+    assert saved['batches'][0]['ids'] == {r['custom_id']: r['key'] for r in requests}
+
+    # A new process polls the submitted batch instead of submitting again
+    env = {**os.environ, 'PYTHONPATH': str(ROOT), 'LLM_CACHE_PATH': str(cache.path),
+           'FAKE_BATCH_DIR': str(tmp_path / 'batches'), 'FAKE_BATCH_LATENCY': '0'}
+    out = subprocess.run([sys.executable, '-c', RESUME, json.dumps(requests), str(state)],
+                         env=env, cwd=tmp_path, capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.splitlines()[-1])
+    assert result['created'] == []
+    assert result['counts']['succeeded'] == 2 and result['counts']['submitted'] == 0
+    assert not state.exists()
+    assert all(cache.has(r['key']) for r in requests)
+
+
+def test_errored_results_fall_back_to_direct_calls(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(ptai.time, 'sleep', lambda seconds: None)
+    segments = [{'start': f'{i // 360:02d}:{i // 6 % 60:02d}:{i % 6 * 10:02d}', 'start_ms': i * 10_000,
+                 'text': f'Satz {i}: Gott schuf Himmel und Erde, und es wurde Licht über dem Wasser.'}
+                for i in range(400)]
+    data = {'video_id': 'v1', 'title': 'Schöpfung', 'segments': segments}
+    data_file = tmp_path / 'v1_study_data.json'
+    data_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+    random.seed(1)
+    batch_client = fake_anthropic.FakeAnthropic(batch_dir=tmp_path / 'batches', batch_error_rate=0.5)
+    requests = ptai.collect_batch_requests([data_file])
+    counts = llm_batch.run_batch(batch_client, requests, tmp_path / 'state.json', 'parse', poll_interval=0,
+                                 validate=ptai.parse_sections_response)
+    assert counts['failed'] and counts['succeeded']
+    assert counts['failed'] + counts['succeeded'] == len(requests)
+
+    # The parser finds the succeeded chunks in the cache and asks only for the rest
+    client = fake_anthropic.FakeAnthropic()
+    assert ptai.parse_transcript(data, client) is not None
+    assert len(client.requests) == counts['failed']
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import fake_anthropic
+import llm_cache
+from llm_cache import ResponseCache, cache_key
+
+MODEL = 'claude-haiku-4-5-20251001'
+
+
+def parse(text):
+    answer = json.loads(text)
+    if not isinstance(answer, dict):
+        raise ValueError('not an object')
+    return answer
+
+
+def answers(*texts):
+    """Responder that returns texts in turn, repeating the last one."""
+    texts = list(texts)
+    return lambda request: texts.pop(0) if len(texts) > 1 else texts[0]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / 'cache.sqlite3')
+
+
+def test_answer_is_cached(cache):
+    client = fake_anthropic.FakeAnthropic(responder=answers('{"a": 1}'))
+    for _ in range(2):
+        assert cache.create(client, model=MODEL, max_tokens=10, prompt='p', validate=parse) == '{"a": 1}'
+    assert len(client.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_malformed_answer_is_not_cached(cache):
+    client = fake_anthropic.FakeAnthropic(responder=answers('{"a": 1', '{"a": 1}'))
+    with pytest.raises(ValueError):
+        cache.create(client, model=MODEL, max_tokens=10, prompt='p', validate=parse)
+    assert not cache.has(cache_key(MODEL, 10, 'p'))
+
+    # The next call asks the model again instead of replaying the truncated text
+    assert cache.create(client, model=MODEL, max_tokens=10, prompt='p', validate=parse) == '{"a": 1}'
+    assert len(client.requests) == 2
+
+
+def test_malformed_answer_is_requested_again(cache):
+    client = fake_anthropic.FakeAnthropic(responder=answers('[]', '{"a": 1}'))
+    text = cache.create(client, model=MODEL, max_tokens=10, prompt='p', validate=parse, attempts=2)
+    assert text == '{"a": 1}'
+    assert len(client.requests) == 2
+    assert cache.get(cache_key(MODEL, 10, 'p')) == '{"a": 1}'
+
+
+def test_stored_malformed_answer_is_dropped(cache):
+    key = cache_key(MODEL, 10, 'p')
+    cache.put(key, 'not json')
+    assert cache.get(key, validate=parse) is None
+    assert not cache.has(key)
+    assert cache.misses == 1
+
+
+def test_batch_results_are_validated(tmp_path, monkeypatch):
+    import llm_batch
+    monkeypatch.setattr(llm_cache, '_default_cache', ResponseCache(tmp_path / 'cache.sqlite3'))
+    client = fake_anthropic.FakeAnthropic(
+        responder=lambda request: request['messages'][0]['content'], batch_dir=tmp_path / 'batches')
+    requests = [{'custom_id': name, 'key': cache_key(MODEL, 10, prompt),
+                 'params': llm_cache.request_kwargs(MODEL, 10, prompt)}
+                for name, prompt in (('good', '{"a": 1}'), ('bad', '{"a": '))]
+
+    counts = llm_batch.run_batch(client, requests, tmp_path / 'state.json', 'test',
+                                 poll_interval=0, validate=parse)
+    assert (counts['succeeded'], counts['failed']) == (1, 1)
+    assert llm_cache.default_cache().has(requests[0]['key'])
+    assert not llm_cache.default_cache().has(requests[1]['key'])
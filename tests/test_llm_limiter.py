@@ -0,0 +1,111 @@
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from llm_limiter import AdaptiveLimiter, estimate_tokens, retry_delay
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=5))
+
+
+def test_rate_limit_halves_and_successes_raise_again():
+    async def scenario():
+        limiter = AdaptiveLimiter(8)
+        limiter.on_rate_limit(0)
+        assert limiter.limit == 4
+        limiter.on_rate_limit(0)
+        limiter.on_rate_limit(0)
+        limiter.on_rate_limit(0)
+        assert (limiter.limit, limiter.rate_limited) == (1, 4)
+
+        # One step up per `limit` successes, never above the maximum
+        limits = []
+        for _ in range(40):
+            limiter.on_success()
+            limits.append(limiter.limit)
+        assert limits[:6] == [2, 2, 3, 3, 3, 4]
+        assert limiter.limit == 8
+    run(scenario())
+
+
+def test_in_flight_never_exceeds_limit():
+    async def scenario():
+        limiter = AdaptiveLimiter(4)
+        limiter.on_rate_limit(0)        # limit 4 → 2
+        seen = []
+
+        async def call():
+            async with limiter:
+                seen.append((limiter.in_flight, limiter.limit))
+                await asyncio.sleep(0.01)
+            limiter.on_success()
+
+        await asyncio.gather(*(call() for _ in range(12)))
+        return seen
+    seen = run(scenario())
+    assert all(in_flight <= limit for in_flight, limit in seen)
+    # The burst opens 2 wide and widens again as calls succeed
+    assert [in_flight for in_flight, _ in seen[:2]] == [1, 2] and seen[2][1] == 3
+    assert max(in_flight for in_flight, _ in seen) == 4
+
+
+def test_pause_after_rate_limit():
+    async def scenario():
+        limiter = AdaptiveLimiter(2)
+        loop = asyncio.get_running_loop()
+        limiter.on_rate_limit(0.05)
+        limiter.on_rate_limit(0.01)     # a shorter retry-after does not cut the pause
+        started = loop.time()
+        async with limiter:
+            return loop.time() - started
+    assert run(scenario()) >= 0.045
+
+
+def test_retry_delay():
+    def error(headers):
+        return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+    assert retry_delay(error({'retry-after': '7'}), attempt=3) == 7.0
+    random.seed(0)
+    assert 2 <= retry_delay(error({}), attempt=1) < 3
+    assert 60 <= retry_delay(error({'retry-after': 'bald'}), attempt=10) < 61
+    assert 1 <= retry_delay(Exception(), attempt=0) < 2
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('x') == 1
+    assert estimate_tokens('x' * 35) == 10
+
+
+def test_parse_chunk_backs_off_on_429(tmp_path, monkeypatch):
+    anthropic = pytest.importorskip('anthropic')
+    import fake_anthropic
+    import llm_cache
+    import parse_transcript_with_ai as ptai
+    monkeypatch.setattr(llm_cache, '_default_cache', llm_cache.ResponseCache(tmp_path / 'cache.sqlite3'))
+
+    class Flaky(fake_anthropic.AsyncFakeAnthropic):
+        """Answers 429 (retry-after 0) to the first two requests."""
+        def __init__(self):
+            super().__init__(responder=lambda request: json.dumps({'sections': []}))
+            self.rejected = 0
+            create = self.messages.create
+
+            async def create_or_reject(**kwargs):
+                if self.rejected < 2:
+                    self.rejected += 1
+                    error = anthropic.RateLimitError.__new__(anthropic.RateLimitError)
+                    error.response = SimpleNamespace(headers={'retry-after': '0'})
+                    raise error
+                return await create(**kwargs)
+            self.messages.create = create_or_reject
+
+    chunk = [{'start': '00:00:01', 'start_ms': 1000, 'text': 'Am Anfang schuf Gott.'}]
+    limiter = AdaptiveLimiter(8)
+    assert run(ptai.parse_chunk_async(chunk, 'Schöpfung', Flaky(), limiter)) == []
+    assert (limiter.rate_limited, limiter.limit) == (2, 2)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('anthropic')
+
+import fake_anthropic
+import llm_cache
+import parse_transcript_with_ai as ptai
+
+
+def segment(i):
+    s = i * 10
+    return {'start': f'{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}', 'start_ms': s * 1000,
+            'text': f'Satz {i}: Gott schuf Himmel und Erde, und es wurde Licht über dem Wasser.'}
+
+
+@pytest.fixture
+def video(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, '_default_cache',
+                        llm_cache.ResponseCache(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(ptai.time, 'sleep', lambda seconds: None)
+    data = {'video_id': 'v1', 'title': 'Schöpfung', 'segments': [segment(i) for i in range(400)]}
+    data_file = tmp_path / 'v1_study_data.json'
+    data_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    chunks = ptai.chunk_segments(data['segments'])
+    assert len(chunks) >= 3
+    return data, data_file, chunks
+
+
+def first_start(request):
+    return request['messages'][0]['content'].split('TRANSKRIPT:\n[', 1)[1][:8]
+
+
+def responder(fail_start=None, malformed=False):
+    """
+    Answers one section per chunk, at its first timestamp. The chunk at
+    fail_start fails: an API error, or with malformed a truncated answer.
+    """
+    def respond(request):
+        first = first_start(request)
+        answer = json.dumps({'sections': [{'timestamp': first, 'verse_reference': 'Genesis 1:1',
+                                           'category': 'theologisch', 'quality': 'high',
+                                           'content': f'Gott spricht am Anfang, Abschnitt {first}.'}]})
+        if first == fail_start:
+            if not malformed:
+                raise RuntimeError('overloaded')
+            return answer[:len(answer) // 2]
+        return answer
+    return respond
+
+
+def section_starts(parsed):
+    return sorted(sec['timestamp'] for sec in parsed['ai_sections'])
+
+
+def test_failed_chunk_keeps_journal_and_is_retried(video, tmp_path):
+    data, data_file, chunks = video
+    failing = chunks[1][0]['start']
+    journal_file = ptai.journal_path(data_file, tmp_path)
+
+    client = fake_anthropic.FakeAnthropic(responder=responder(failing))
+    parsed = ptai.parse_transcript(data, client, journal=ptai.ChunkJournal(journal_file))
+    assert parsed is None
+    assert journal_file.exists()
+    assert not (tmp_path / 'v1_parsed.json').exists()
+    assert len(ptai.ChunkJournal(journal_file).entries) == len(chunks) - 1
+
+    client = fake_anthropic.FakeAnthropic(responder=responder())
+    parsed = ptai.parse_transcript(data, client, journal=ptai.ChunkJournal(journal_file))
+    assert len(client.requests) == 1
+    assert failing in section_starts(parsed)
+    ptai.save_parsed(parsed, data_file, tmp_path)
+    assert not journal_file.exists()
+
+
+def test_failed_chunk_async_skips_save(video, tmp_path):
+    data, data_file, chunks = video
+    failing = chunks[-1][0]['start']
+    journal_file = ptai.journal_path(data_file, tmp_path)
+    parsed_file = tmp_path / 'v1_parsed.json'
+
+    client = fake_anthropic.AsyncFakeAnthropic(responder=responder(failing))
+    incomplete = asyncio.run(ptai.parse_all_async([data_file], tmp_path, client, 4))
+    assert incomplete == [data_file]
+    assert journal_file.exists()
+    assert not parsed_file.exists()
+
+    client = fake_anthropic.AsyncFakeAnthropic(responder=responder())
+    assert asyncio.run(ptai.parse_all_async([data_file], tmp_path, client, 4)) == []
+    assert len(client.requests) == 1
+    assert not journal_file.exists()
+    parsed = json.loads(parsed_file.read_text(encoding='utf-8'))
+    assert section_starts(parsed) == sorted(chunk[0]['start'] for chunk in chunks)
+
+
+def test_malformed_answer_is_not_cached(video, tmp_path):
+    data, data_file, chunks = video
+    failing = chunks[1][0]['start']
+    journal_file = ptai.journal_path(data_file, tmp_path)
+
+    client = fake_anthropic.FakeAnthropic(responder=responder(failing, malformed=True))
+    assert ptai.parse_transcript(data, client, journal=ptai.ChunkJournal(journal_file)) is None
+
+    # Cache enabled: the truncated answer must not be replayed from it
+    client = fake_anthropic.FakeAnthropic(responder=responder())
+    parsed = ptai.parse_transcript(data, client, journal=ptai.ChunkJournal(journal_file))
+    assert [first_start(request) for request in client.requests] == [failing]
+    assert section_starts(parsed) == sorted(chunk[0]['start'] for chunk in chunks)
+
+
+def test_malformed_answer_is_not_cached_async(video, tmp_path):
+    data, data_file, chunks = video
+    failing = chunks[-1][0]['start']
+
+    client = fake_anthropic.AsyncFakeAnthropic(responder=responder(failing, malformed=True))
+    assert asyncio.run(ptai.parse_all_async([data_file], tmp_path, client, 4)) == [data_file]
+
+    client = fake_anthropic.AsyncFakeAnthropic(responder=responder())
+    assert asyncio.run(ptai.parse_all_async([data_file], tmp_path, client, 4)) == []
+    assert [first_start(request) for request in client.requests] == [failing]
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+pytest.importorskip('anthropic')
+
+import fake_anthropic
+import llm_cache
+import parse_transcript_with_ai as ptai
+from llm_limiter import AdaptiveLimiter
+
+TEACHING = 'Im Hebräischen bedeutet das Wort in Genesis 1:1: Gott schuf, und Jesus Christus ist dieses Wort.'
+NOISE = 'Musik. Herzlich willkommen, abonniert den Kanal und lasst eine Spende da.'
+
+
+def segments(texts, offset=0):
+    return [{'start': f'00:{(offset + i) // 60:02d}:{(offset + i) % 60:02d}', 'start_ms': (offset + i) * 1000,
+             'text': text} for i, text in enumerate(texts)]
+
+
+@pytest.fixture
+def video(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, '_default_cache',
+                        llm_cache.ResponseCache(tmp_path / 'cache.sqlite3', bypass=True))
+    monkeypatch.setattr(ptai.time, 'sleep', lambda seconds: None)
+    # Intro noise, then teaching: long enough for chunks of only one or the other
+    data = {'video_id': 'v1', 'title': 'Schöpfung',
+            'segments': segments([NOISE] * 150) + segments([TEACHING] * 150, offset=150)}
+    data_file = tmp_path / 'v1_study_data.json'
+    data_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    chunks = ptai.chunk_segments(data['segments'])
+    assert len(chunks) >= 3
+    return data, data_file, chunks
+
+
+def test_teaching_score_ranks_teaching_above_noise():
+    teaching, noise = ptai.teaching_score(segments([TEACHING] * 3)), ptai.teaching_score(segments([NOISE] * 3))
+    assert noise < 0 < ptai.PREFILTER_THRESHOLD < teaching
+    assert ptai.teaching_score(segments(['Und dann sind wir weitergegangen.'])) == 0
+    assert ptai.teaching_score([]) == 0
+    # Density, not volume: repeating the same segment keeps the score
+    assert ptai.teaching_score(segments([TEACHING] * 10)) == pytest.approx(teaching)
+
+
+def relevant(chunks):
+    return [chunk for chunk in chunks if ptai.teaching_score(chunk) >= ptai.PREFILTER_THRESHOLD]
+
+
+def test_prefilter_skips_low_scoring_chunks(video):
+    data, _, chunks = video
+    kept = relevant(chunks)
+    assert 0 < len(kept) < len(chunks)
+
+    client = fake_anthropic.FakeAnthropic()
+    assert ptai.parse_transcript(data, client, min_score=ptai.PREFILTER_THRESHOLD) is not None
+    sent = [request['messages'][0]['content'] for request in client.requests]
+    assert sent == [ptai.build_chunk_prompt(chunk, 'Schöpfung') for chunk in kept]
+
+    # Without --prefilter every chunk is sent
+    client = fake_anthropic.FakeAnthropic()
+    ptai.parse_transcript(data, client)
+    assert len(client.requests) == len(chunks)
+
+
+def test_prefilter_applies_to_async_and_batch(video, tmp_path):
+    _, data_file, chunks = video
+    kept = relevant(chunks)
+
+    tasks, _ = ptai.video_job(data_file, tmp_path, fake_anthropic.AsyncFakeAnthropic(), AdaptiveLimiter(2),
+                              min_score=ptai.PREFILTER_THRESHOLD)
+    assert len(tasks) == len(kept)
+
+    requests = ptai.collect_batch_requests([data_file], min_score=ptai.PREFILTER_THRESHOLD)
+    assert [r['params']['messages'][0]['content'] for r in requests] == \
+        [ptai.build_chunk_prompt(chunk, 'Schöpfung') for chunk in kept]
+
+
+def test_prefilter_report(video, tmp_path, capsys):
+    data, _, chunks = video
+    parsed = dict(data, ai_sections=[{'timestamp': chunk[0]['start']} for chunk in chunks])
+    (tmp_path / 'v1_parsed.json').write_text(json.dumps(parsed), encoding='utf-8')
+
+    ptai.prefilter_report(tmp_path, [-10.0, ptai.PREFILTER_THRESHOLD])
+    rows = capsys.readouterr().out.splitlines()[-2:]
+    assert rows[0].split() == ['-10.00', f'0/{len(chunks)}', '100.0%']
+    # Only the sections in kept chunks would still be found
+    kept = relevant(chunks)
+    recall = len(kept) / len(chunks)
+    assert rows[1].split()[1:] == [f'{len(chunks) - len(kept)}/{len(chunks)}', f'{recall:.1%}']
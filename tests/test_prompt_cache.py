@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import fake_anthropic
+import llm_cache
+import parse_transcript_with_ai as ptai
+import rebuild_database as rb
+
+MIN_CACHEABLE_TOKENS = 1024   # Sonnet; both stages with a system block use it
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, '_default_cache',
+                        llm_cache.ResponseCache(tmp_path / 'cache.sqlite3', bypass=True))
+    return llm_cache._default_cache
+
+
+@pytest.mark.parametrize('instructions', [ptai.CHUNK_INSTRUCTIONS, rb.SYNTHESIS_INSTRUCTIONS,
+                                          rb.REDUCE_INSTRUCTIONS])
+def test_instructions_reach_cacheable_length(instructions):
+    assert fake_anthropic.estimate_tokens(instructions) >= MIN_CACHEABLE_TOKENS
+
+
+def chunk(n):
+    return [{'start': f'00:0{n}:00', 'start_ms': n * 60_000, 'text': f'Teil {n}: Am Anfang schuf Gott.'}]
+
+
+def test_chunk_request_shape_and_cache_reads(cache):
+    client = fake_anthropic.FakeAnthropic()
+    for n in range(2):
+        assert ptai.parse_chunk(chunk(n), 'Schöpfung', client) == []
+
+    for n, request in enumerate(client.requests):
+        assert request['system'] == [{'type': 'text', 'text': ptai.CHUNK_INSTRUCTIONS,
+                                      'cache_control': {'type': 'ephemeral'}}]
+        # The transcript only travels in the user message
+        assert request['messages'] == [{'role': 'user',
+                                        'content': ptai.build_chunk_prompt(chunk(n), 'Schöpfung')}]
+        assert 'Teil' not in request['system'][0]['text']
+
+    usage = cache.usage['parse']
+    instructions = fake_anthropic.estimate_tokens(ptai.CHUNK_INSTRUCTIONS)
+    assert (usage.cache_write, usage.cache_read) == (instructions, instructions)
+    assert usage.uncached == sum(fake_anthropic.estimate_tokens(r['messages'][0]['content'])
+                                 for r in client.requests)
+
+
+def test_synthesis_request_shape_and_cache_reads(cache):
+    answer = json.dumps({'summary': 'x', 'categories': {}})
+    client = fake_anthropic.FakeAnthropic(responder=lambda request: answer)
+    for verse in ('Genesis 1:1', 'Genesis 1:2'):
+        assert rb.request_commentary(client, f'STELLE-{verse}', rb.SYNTHESIS_INSTRUCTIONS, verse)
+
+    assert [r['system'][0]['cache_control'] for r in client.requests] == [{'type': 'ephemeral'}] * 2
+    assert all('STELLE-' not in r['system'][0]['text'] for r in client.requests)
+    assert cache.usage['synthesis'].cache_read == fake_anthropic.estimate_tokens(rb.SYNTHESIS_INSTRUCTIONS)
@@ -0,0 +1,43 @@
+import pytest
+
+from transcript import Transcript, parse_ms, to_ms
+
+
+@pytest.mark.parametrize('ts, expected', [
+    (62000, 62000),
+    ('01:02', 62000),
+    ('1:01:02', 3662000),
+    ('1:02.5', 62500),
+    ('1:02,25', 62250),
+    ('00:00:07', 7000),
+])
+def test_to_ms(ts, expected):
+    assert to_ms(ts) == expected
+
+
+@pytest.mark.parametrize('ts', ['', None, '   ', 'abc', '1::2', '1:02:03:04', '-5', '1:0x'])
+def test_malformed_timestamps(ts):
+    assert parse_ms(ts) is None
+    assert to_ms(ts) == 0
+
+
+def test_load_skips_segments_without_usable_start():
+    segments = [
+        {'start': '00:00:01', 'text': 'a'},
+        {'start': '', 'text': 'empty'},
+        {'start': None, 'text': 'none'},
+        {'start': '00:00:02.5', 'text': 'b'},
+        {'text': 'missing'},
+        {'start': 'kaputt', 'text': 'malformed'},
+        {'start': '00:00:04', 'text': 'c'},
+    ]
+    transcript = Transcript(segments)
+    assert [seg['text'] for seg in transcript.segments] == ['a', 'b', 'c']
+    assert transcript.starts == [1000, 2500, 4000]
+    assert transcript.at('00:00:03')['text'] == 'b'
+    assert [seg['text'] for seg in transcript.window('', 1000)] == ['a']
+
+
+def test_start_ms_wins_over_start():
+    transcript = Transcript([{'start': 'kaputt', 'start_ms': 5000, 'text': 'x'}])
+    assert transcript.starts == [5000]
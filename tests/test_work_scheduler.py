@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip('anthropic')
+
+import parse_transcript_with_ai as ptai
+from work_scheduler import WorkScheduler
+
+
+def run_jobs(jobs, concurrency, per_job):
+    """Run fake jobs {name: [delay, ...]}; returns (starts, completions, peaks)."""
+    starts, completed = [], []
+    in_flight = {name: 0 for name in jobs}
+    peaks = {'total': 0, **in_flight}
+
+    def factory(name, index, delay):
+        async def task():
+            starts.append((name, index))
+            in_flight[name] += 1
+            peaks[name] = max(peaks[name], in_flight[name])
+            peaks['total'] = max(peaks['total'], sum(in_flight.values()))
+            await asyncio.sleep(delay)
+            in_flight[name] -= 1
+            return f'{name}{index}'
+        return task
+
+    scheduler = WorkScheduler(concurrency, per_job)
+    for name, delays in jobs.items():
+        tasks = [(10, factory(name, i, delay)) for i, delay in enumerate(delays)]
+        scheduler.add(name, tasks, lambda results, name=name: completed.append((name, results)))
+    progress = asyncio.run(asyncio.wait_for(scheduler.run(), timeout=5))
+    assert progress.chunks == sum(len(delays) for delays in jobs.values())
+    return starts, completed, peaks
+
+
+def test_caps_and_fair_order():
+    jobs = {'lang': [0.03, 0.02, 0.01, 0.01], 'mittel': [0.01, 0.01], 'kurz': [0.01]}
+    starts, completed, peaks = run_jobs(jobs, concurrency=3, per_job=2)
+
+    assert peaks['total'] == 3
+    assert max(peaks[name] for name in jobs) == 2
+    # The first video takes its two slots, the third slot goes to the next video
+    assert starts[:3] == [('lang', 0), ('lang', 1), ('mittel', 0)]
+    assert sorted(starts) == sorted((name, i) for name, delays in jobs.items() for i in range(len(delays)))
+    # Results come back in chunk order, even though later chunks finished first
+    assert dict(completed)['lang'] == ['lang0', 'lang1', 'lang2', 'lang3']
+    assert [name for name, _ in completed] == ['mittel', 'kurz', 'lang']
+
+
+def test_empty_jobs_terminate():
+    starts, completed, _ = run_jobs({'leer': [], 'eins': [0]}, concurrency=4, per_job=1)
+    assert completed == [('leer', []), ('eins', ['eins0'])]
+
+    # Nothing queued at all: the workers still return
+    assert run_jobs({}, concurrency=2, per_job=1) == ([], [], {'total': 0})
+
+
+def write_video(path, n_segments, mtime):
+    segments = [{'start': f'00:00:{i:02d}', 'start_ms': i * 1000, 'text': 'Am Anfang schuf Gott.'}
+                for i in range(n_segments)]
+    path.write_text(json.dumps({'title': path.stem, 'segments': segments}), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_order_videos(tmp_path):
+    short = write_video(tmp_path / 'a_study_data.json', 2, mtime=3000)
+    long = write_video(tmp_path / 'b_study_data.json', 9, mtime=2000)
+    middle = write_video(tmp_path / 'c_study_data.json', 5, mtime=1000)
+    files = [short, long, middle]
+
+    assert ptai.order_videos(files, 'name') == [short, long, middle]
+    assert ptai.order_videos(files, 'oldest') == [middle, long, short]
+    videos = {}
+    assert ptai.order_videos(files, 'longest', videos) == [long, middle, short]
+
+    # The transcripts read for ranking are reused by the parse
+    assert set(videos) == set(files)
+    long.unlink()
+    tasks, _ = ptai.video_job(long, tmp_path, client=None, limiter=None, videos=videos)
+    assert len(tasks) == 1
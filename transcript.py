@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Time-indexed view of a video's transcript segments.
+
+Segments are stored in start order (extract_study_bible_data writes them as
+they appear in the transcript), so a sorted list of their start_ms values is
+all it takes to answer time queries with a bisect — O(log n) per mention
+instead of a scan over every segment.
+
+Timestamps may be given as milliseconds or as "HH:MM:SS" strings; the string
+form matches the old `seg['start'] >= ts` comparisons exactly, because every
+segment's "start" is its start_ms truncated to whole seconds. Fractional
+seconds ("1:02.5") are accepted; empty or malformed timestamps count as 0 in
+queries, and segments with one are left out.
+"""
+
+import json
+import re
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from segment_store import SegmentStore
+
+Timestamp = Union[int, str]
+
+TIMESTAMP_RE = re.compile(r'(?:(?:(\d+):)?(\d+):)?(\d+(?:[.,]\d+)?)')
+
+
+def parse_ms(ts: Optional[Timestamp]) -> Optional[int]:
+    """Milliseconds for an int (returned as is) or an "[[HH:]MM:]SS[.fff]" string; None if malformed."""
+    if isinstance(ts, int) and not isinstance(ts, bool):
+        return ts
+    if not isinstance(ts, str):
+        return None
+    m = TIMESTAMP_RE.fullmatch(ts.strip())
+    if not m:
+        return None
+    hours, minutes, seconds = m.groups()
+    return (int(hours or 0) * 3600 + int(minutes or 0) * 60) * 1000 + \
+        round(float(seconds.replace(',', '.')) * 1000)
+
+
+def to_ms(ts: Optional[Timestamp]) -> int:
+    """parse_ms(), with 0 for an empty or malformed timestamp."""
+    ms = parse_ms(ts)
+    return 0 if ms is None else ms
+
+
+class Transcript:
+    """Segments plus their sorted start times, with bisect-based queries."""
+
+    def __init__(self, segments: Sequence[Dict], starts: Optional[Sequence[int]] = None):
+        if starts is None:
+            # Segments without a usable start time cannot be placed: leave them out
+            timed = [(seg['start_ms'] if 'start_ms' in seg else parse_ms(seg.get('start')), seg)
+                     for seg in segments]
+            timed = [(ms, seg) for ms, seg in timed if ms is not None]
+            segments = [seg for _, seg in timed]
+            starts = [ms for ms, _ in timed]
+        self.segments = segments
+        self.starts = starts
+
+    @classmethod
+    def from_store(cls, store: SegmentStore) -> 'Transcript':
+        """Queries bisect the store's mmapped start_ms column; only hits are decoded."""
+        return cls(store, store.start_ms)
+
+    @classmethod
+    def load(cls, path: Path) -> 'Transcript':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f).get('segments', []))
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def index_after(self, ts: Timestamp) -> Optional[int]:
+        """Index of the first segment starting at or after ts, or None."""
+        idx = bisect_left(self.starts, to_ms(ts))
+        return idx if idx < len(self.starts) else None
+
+    def at(self, ts: Timestamp) -> Optional[Dict]:
+        """The segment being spoken at ts (last one starting at or before it)."""
+        idx = bisect_right(self.starts, to_ms(ts)) - 1
+        return self.segments[idx] if idx >= 0 else None
+
+    def after(self, ts: Timestamp, n: int, before: int = 0) -> List[Dict]:
+        """Up to n segments from the first one starting at/after ts, plus `before` for context."""
+        idx = self.index_after(ts)
+        if idx is None:
+            return []
+        return self.segments[max(0, idx - before):idx + n]
+
+    def window(self, center: Timestamp, radius_ms: int) -> List[Dict]:
+        """Segments starting within ±radius_ms of center (inclusive)."""
+        center_ms = to_ms(center)
+        lo = bisect_left(self.starts, center_ms - radius_ms)
+        hi = bisect_right(self.starts, center_ms + radius_ms)
+        return self.segments[lo:hi]
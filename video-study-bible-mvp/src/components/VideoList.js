@@ -66,7 +66,7 @@ function ClipCard({ clip, onPlayClip }) {
   return (
     <div
       className="cc-card"
-      onClick={() => onPlayClip(video, mention.clip_start_ms ?? mention.timestamp_ms, mention.clip_end_ms ?? null)}
+      onClick={() => onPlayClip(video, mention.clip_keyframe_ms ?? mention.clip_start_ms ?? mention.timestamp_ms, mention.clip_end_ms ?? null)}
       style={{
         background: 'var(--bg-elevated)',
         borderRadius: '10px',
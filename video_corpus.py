@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Lazy, bounded-memory view of the per-video *_parsed.json / *_enhanced.json
+files that rebuild_database works from.
+
+Every file is read once. Each video then holds only what the database and
+the synthesis step need: ids, titles, verse_sections, verse_mentions, the
+ai_summary and the first few segments (for speaker detection). Full segment
+lists are dropped right after loading and fetched again only when a verse
+actually needs raw transcript text — from the video's segment store when it
+is current, otherwise by re-reading the JSON — through an LRU cache of at
+most `cache_size` transcripts. Memory therefore grows with the number of
+verse sections, not with the hours of transcript in the corpus.
+"""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from segment_store import open_store
+from transcript import Transcript
+
+OPENING_SEGMENTS = 5      # what extract_speaker_info looks at
+TRANSCRIPT_CACHE = 8      # transcripts kept decoded at once
+
+
+class VideoRecord:
+    """The resident part of one *_parsed.json or *_enhanced.json file."""
+
+    def __init__(self, path: Path, data: Dict):
+        self.path = path
+        self.video_id = data.get('video_id', '')
+        self.title = data.get('title', '')
+        self.video_file = data.get('video_file', '')
+        self.speaker = data.get('speaker')
+        self.speaker_avatar = data.get('speaker_avatar')
+        self.ai_summary = data.get('ai_summary', '')
+        # None when the file has no AI-parsed sections at all (legacy file)
+        self.verse_sections: Optional[Dict] = data.get('verse_sections')
+        self.verse_mentions: Dict = data.get('verse_mentions', {})
+        self.opening: List[Dict] = data.get('segments', [])[:OPENING_SEGMENTS]
+
+
+class VideoCorpus:
+    """All parsed and enhanced video files of a data directory, loaded once."""
+
+    def __init__(self, data_dir: Path, cache_size: int = TRANSCRIPT_CACHE):
+        self.data_dir = data_dir
+        self.cache_size = max(1, cache_size)
+        self._transcripts: 'OrderedDict[Path, Transcript]' = OrderedDict()
+        self.parsed = [record for record in map(self._load, sorted(data_dir.glob('*_parsed.json')))
+                       if record]
+        self.enhanced = [record for record in map(self._load, sorted(data_dir.glob('*_enhanced.json')))
+                         if record]
+        # base name (file stem without suffix) -> enhanced record, for ai_summary lookups
+        self.enhanced_by_base = {record.path.stem[:-len('_enhanced')]: record
+                                 for record in self.enhanced}
+
+    @staticmethod
+    def _load(path: Path) -> Optional[VideoRecord]:
+        try:
+            with open(path, encoding='utf-8') as f:
+                return VideoRecord(path, json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"   ⚠️  {path.name} nicht lesbar: {e}")
+            return None
+
+    def videos(self) -> List[VideoRecord]:
+        """Parsed videos first, then enhanced files of videos without a parsed one."""
+        parsed_ids = {record.video_id for record in self.parsed}
+        return self.parsed + [record for record in self.enhanced
+                              if record.video_id not in parsed_ids]
+
+    def transcript(self, record: VideoRecord) -> Transcript:
+        """The video's segments, from the segment store if current, else its JSON file."""
+        transcript = self._transcripts.get(record.path)
+        if transcript is not None:
+            self._transcripts.move_to_end(record.path)
+            return transcript
+        store = open_store(self.data_dir, record.video_id) if record.video_id else None
+        transcript = Transcript.from_store(store) if store else Transcript.load(record.path)
+        self._transcripts[record.path] = transcript
+        if len(self._transcripts) > self.cache_size:
+            self._transcripts.popitem(last=False)
+        return transcript
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Global work queue for chunk-level LLM work across many videos.
+
+Every pending chunk of every video goes into one queue. Videos are served in
+the order they were added (the caller applies its policy, e.g. longest video
+first), and a worker always takes the next chunk of the first video that is
+below its per-video in-flight cap — so a long video cannot hold every slot
+while the rest wait, and the concurrency cap stays saturated until the queue
+runs dry. A video's on_complete callback runs as soon as its last chunk
+lands, with the results in chunk order.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+PROGRESS_INTERVAL = 5.0   # seconds between live progress lines
+
+# (estimated input tokens, coroutine factory) per chunk
+Task = Tuple[int, Callable[[], Awaitable]]
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class Progress:
+    """Throughput (chunks/s, tokens/s) and ETA over the completed chunks."""
+
+    def __init__(self, total_chunks: int, total_tokens: int,
+                 interval: float = PROGRESS_INTERVAL, unit: str = "Chunks"):
+        self.total_chunks = total_chunks
+        self.total_tokens = total_tokens
+        self.interval = interval
+        self.unit = unit
+        self.chunks = 0
+        self.tokens = 0
+        self.started = time.monotonic()
+        self._last_print = self.started
+
+    def update(self, tokens: int):
+        self.chunks += 1
+        self.tokens += tokens
+        now = time.monotonic()
+        if now - self._last_print >= self.interval:
+            self._last_print = now
+            print(self.line())
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        token_rate = self.tokens / elapsed
+        remaining = self.total_tokens - self.tokens
+        eta = format_duration(remaining / token_rate) if token_rate and remaining > 0 else "–"
+        return (f"⚡ {self.chunks}/{self.total_chunks} {self.unit} · "
+                f"{self.chunks / elapsed:.1f} {self.unit}/s · {token_rate:.0f} Tokens/s · "
+                f"ETA {eta} · {format_duration(elapsed)} vergangen")
+
+
+class Job:
+    """The pending chunks of one video."""
+
+    def __init__(self, name: str, tasks: List[Task], on_complete: Callable[[List], None]):
+        self.name = name
+        self.queue = deque(enumerate(tasks))
+        self.results: List = [None] * len(tasks)
+        self.remaining = len(tasks)
+        self.in_flight = 0
+        self.on_complete = on_complete
+
+
+class WorkScheduler:
+    """Runs the chunks of all added jobs under one global concurrency cap."""
+
+    def __init__(self, concurrency: int, per_job: Optional[int] = None, unit: str = "Chunks"):
+        self.concurrency = max(1, concurrency)
+        self.per_job = max(1, per_job or self.concurrency)
+        self.unit = unit
+        self.jobs: List[Job] = []
+
+    def add(self, name: str, tasks: List[Task], on_complete: Callable[[List], None]):
+        self.jobs.append(Job(name, tasks, on_complete))
+
+    def _next_job(self) -> Optional[Job]:
+        for job in self.jobs:
+            if job.queue and job.in_flight < self.per_job:
+                return job
+        return None
+
+    async def run(self) -> Progress:
+        progress = Progress(sum(len(job.results) for job in self.jobs),
+                            sum(tokens for job in self.jobs for _, (tokens, _) in job.queue),
+                            unit=self.unit)
+        for job in self.jobs:
+            if not job.remaining:
+                job.on_complete([])
+        cond = asyncio.Condition()
+
+        async def worker():
+            while True:
+                async with cond:
+                    await cond.wait_for(lambda: self._next_job() is not None
+                                        or not any(job.queue for job in self.jobs))
+                    job = self._next_job()
+                    if job is None:
+                        return
+                    index, (tokens, factory) = job.queue.popleft()
+                    job.in_flight += 1
+                try:
+                    job.results[index] = await factory()
+                finally:
+                    async with cond:
+                        job.in_flight -= 1
+                        cond.notify_all()
+                job.remaining -= 1
+                progress.update(tokens)
+                if not job.remaining:
+                    job.on_complete(job.results)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return progress